@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+"""
+End-to-end crew benchmark against a local stub of the LM Studio API
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Keep benchmark runs offline and free of telemetry noise
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.model_stats import percentile
+
+STUB_CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+{endpoints}
+api_key = "stub"
+
+[models.stub]
+name = "stub-model"
+timeout = 60
+description = "Local benchmark stub"
+"""
+
+def summarize(values):
+    """Latency summary in seconds"""
+    
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(statistics.mean(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4),
+    }
+
+def _kickoff(crew, topic):
+    """Kick off a crew quietly, returning its per-task durations"""
+    
+    crew.verbose = False
+    for agent in crew.agents:
+        agent.verbose = False
+    crew.kickoff(inputs={"topic": topic, "current_year": str(datetime.now().year)})
+    return {
+        (task.name or f"task_{i}"): task.execution_duration
+        for i, task in enumerate(crew.tasks)
+    }
+
+def run_once(config_path, topic, pool=None):
+    """Build (or check out of `pool`) and kick off one crew, returning its wall time and per-task durations"""
+    
+    from hello_crewai.crew import HelloCrewai
+    
+    start = time.perf_counter()
+    if pool is not None:
+        with pool.crew() as crew:
+            tasks = _kickoff(crew, topic)
+    else:
+        tasks = _kickoff(HelloCrewai(config_path=config_path).crew(), topic)
+    return time.perf_counter() - start, tasks
+
+def measure_construction(config_path, runs=20):
+    """Mean milliseconds to get a crew ready: built from scratch, cloned from a template, and from a pool"""
+    
+    from hello_crewai.crew import HelloCrewai
+    from hello_crewai.crew_pool import CrewPool, CrewTemplate
+    
+    def mean_ms(make):
+        start = time.perf_counter()
+        for _ in range(runs):
+            make()
+        return round((time.perf_counter() - start) / runs * 1000, 3)
+    
+    template = CrewTemplate(config_path)
+    pool = CrewPool(template, size=1)
+    
+    def pooled():
+        with pool.crew():
+            pass
+    
+    return {
+        "runs": runs,
+        "fresh_ms": mean_ms(lambda: HelloCrewai(config_path=config_path).crew()),
+        "clone_ms": mean_ms(template.clone),
+        "pooled_ms": mean_ms(pooled),
+    }
+
+def run_level(config_path, concurrency, runs, pooled=False):
+    """Run `runs` crews with `concurrency` in flight and collect latency stats"""
+    
+    walls = []
+    task_latencies = {}
+    errors = []
+    pool = None
+    if pooled:
+        from hello_crewai.crew_pool import CrewPool, CrewTemplate
+        pool = CrewPool(CrewTemplate(config_path), size=concurrency)
+    
+    def job(i):
+        return run_once(config_path, f"benchmark topic {i}", pool)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(job, i) for i in range(runs)]
+        for future in futures:
+            try:
+                wall, tasks = future.result()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            walls.append(wall)
+            for name, duration in tasks.items():
+                if duration is not None:
+                    task_latencies.setdefault(name, []).append(duration)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "pooled": pooled,
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "elapsed_s": round(elapsed, 4),
+        "throughput_crews_per_s": round(len(walls) / elapsed, 4) if elapsed else None,
+        "crew_latency_s": summarize(walls),
+        "task_latency_s": {name: summarize(values) for name, values in task_latencies.items()},
+    }
+
+def stub_endpoints_config(stubs):
+    """[lm_studio] lines pointing at one stub, or at several as load balanced endpoints"""
+    
+    if len(stubs) == 1:
+        return f'base_url = "{stubs[0].base_url}"'
+    return "endpoints = [" + ", ".join(f'{{ base_url = "{stub.base_url}" }}' for stub in stubs) + "]"
+
+def run_benchmark(
+    levels, runs_per_level, latency, tokens_per_sec, completion_tokens, failure_rate, seed=0, endpoints=1, slots=None,
+    pooled=False, construction_runs=0,
+):
+    """Run the real crew against stub servers at each concurrency level
+    
+    With `pooled`, each level reuses pre-built crews from a CrewPool instead of
+    building one per run. With `construction_runs`, crew construction time is
+    also measured for fresh, cloned and pooled crews.
+    """
+    
+    from contextlib import ExitStack, redirect_stdout
+    
+    # Import crewAI up front so the first level doesn't pay for it
+    import hello_crewai.crew  # noqa: F401
+    
+    stubs = [
+        StubLMStudio(
+            latency=latency,
+            tokens_per_sec=tokens_per_sec,
+            completion_tokens=completion_tokens,
+            failure_rate=failure_rate,
+            seed=seed + i,
+            slots=slots,
+        )
+        for i in range(endpoints)
+    ]
+    results = []
+    original_cwd = os.getcwd()
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as workdir:
+        for stub in stubs:
+            stack.enter_context(stub)
+        config_path = Path(workdir) / ".env.toml"
+        config_path.write_text(STUB_CONFIG.format(endpoints=stub_endpoints_config(stubs)))
+        # reporting_task writes report.md into the working directory
+        os.chdir(workdir)
+        try:
+            for concurrency in levels:
+                runs = runs_per_level or concurrency * 2
+                print(f"* Concurrency {concurrency}: {runs} runs...", file=sys.stderr)
+                with redirect_stdout(sys.stderr):
+                    results.append(run_level(str(config_path), concurrency, runs, pooled))
+            if construction_runs:
+                print(f"* Crew construction: {construction_runs} runs...", file=sys.stderr)
+                with redirect_stdout(sys.stderr):
+                    construction = measure_construction(str(config_path), construction_runs)
+        finally:
+            os.chdir(original_cwd)
+        stub_stats = [dict(stub.stats) for stub in stubs]
+    
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stub": {
+            "latency_s": latency,
+            "tokens_per_sec": tokens_per_sec,
+            "completion_tokens": completion_tokens,
+            "failure_rate": failure_rate,
+            "endpoints": endpoints,
+            "slots": slots,
+            "requests": stub_stats[0] if endpoints == 1 else stub_stats,
+        },
+        "levels": results,
+    }
+    if construction_runs:
+        report["construction"] = construction
+    return report
+
+def print_report(report):
+    """Print a human readable summary table"""
+    
+    endpoints = report["stub"].get("endpoints", 1)
+    print(f"# Crew benchmark (stub LM Studio{f' x{endpoints}' if endpoints > 1 else ''})")
+    print()
+    print(f"{'conc':>5} {'runs':>5} {'err':>4} {'crews/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for level in report["levels"]:
+        crew = level["crew_latency_s"]
+        print(
+            f"{level['concurrency']:>5} {level['runs']:>5} {level['errors']:>4} "
+            f"{level['throughput_crews_per_s'] or 0:>8.2f} "
+            f"{crew.get('p50') or 0:>8.3f} {crew.get('p95') or 0:>8.3f} {crew.get('p99') or 0:>8.3f}"
+        )
+    print()
+    
+    construction = report.get("construction")
+    if construction:
+        print(f"# Crew construction (mean of {construction['runs']})")
+        print()
+        print(f"{'fresh':>10} {'clone':>10} {'pooled':>10}")
+        print(
+            f"{construction['fresh_ms']:>8.2f}ms {construction['clone_ms']:>8.2f}ms "
+            f"{construction['pooled_ms']:>8.2f}ms"
+        )
+        print()
+
+def compare_reports(previous, current):
+    """Print p50/p95/throughput changes between two reports, per concurrency level"""
+    
+    previous_levels = {level["concurrency"]: level for level in previous.get("levels", [])}
+    print("# Change vs previous run")
+    print()
+    print(f"{'conc':>5} {'p50':>9} {'p95':>9} {'crews/s':>9}")
+    for level in current["levels"]:
+        before = previous_levels.get(level["concurrency"])
+        if before is None:
+            print(f"{level['concurrency']:>5} {'(new level)':>29}")
+            continue
+        
+        def change(old, new):
+            if not old or new is None:
+                return "n/a"
+            return f"{(new - old) / old * 100:+.1f}%"
+        
+        print(
+            f"{level['concurrency']:>5} "
+            f"{change(before['crew_latency_s'].get('p50'), level['crew_latency_s'].get('p50')):>9} "
+            f"{change(before['crew_latency_s'].get('p95'), level['crew_latency_s'].get('p95')):>9} "
+            f"{change(before['throughput_crews_per_s'], level['throughput_crews_per_s']):>9}"
+        )
+    print()
+
+def main():
+    """Main CLI interface"""
+    
+    parser = argparse.ArgumentParser(description="Benchmark the HelloCrewai crew against a local LM Studio stub")
+    parser.add_argument("--concurrency", default="1,2,4", help="Comma separated concurrency levels (default: 1,2,4)")
+    parser.add_argument("--runs", type=int, default=0, help="Crews per level (default: 2x concurrency)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub time to first token in seconds")
+    parser.add_argument("--tps", type=float, default=200.0, help="Stub tokens per second")
+    parser.add_argument("--tokens", type=int, default=40, help="Stub tokens per completion")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of stub completions that fail")
+    parser.add_argument("--endpoints", type=int, default=1, help="Stub servers to load balance across")
+    parser.add_argument("--slots", type=int, default=None, help="Completions each stub generates at once")
+    parser.add_argument("--pooled", action="store_true", help="Reuse pre-built crews from a pool instead of building one per run")
+    parser.add_argument("--construction", type=int, default=0, metavar="N",
+                        help="Also time crew construction (fresh, cloned, pooled) over N runs")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+    
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    report = run_benchmark(
+        levels, args.runs, args.latency, args.tps, args.tokens, args.failure_rate,
+        endpoints=args.endpoints, slots=args.slots, pooled=args.pooled, construction_runs=args.construction,
+    )
+    
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    print_report(report)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare_reports(json.load(f), report)
+    print(f"+ Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark for the CLI commands, based on `python -X importtime`
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules that must never be imported by commands that don't run a crew
+HEAVY_MODULES = ("crewai", "litellm", "openai", "chromadb", "opentelemetry")
+
+# Commands that only read config or print help, as (name, python argv)
+LIGHT_COMMANDS = (
+    ("hello_crewai --help", ["-c", "import sys; sys.argv = ['hello_crewai', '--help']; from hello_crewai.main import run; run()"]),
+    ("show_config --help", ["-c", "import sys; sys.argv = ['show_config', '--help']; from hello_crewai.main import show_config; show_config()"]),
+    ("run_batch --help", ["-c", "import sys; sys.argv = ['run_batch', '--help']; from hello_crewai.main import run_batch; run_batch()"]),
+    ("train --help", ["-c", "import sys; sys.argv = ['train', '--help']; from hello_crewai.main import train; train()"]),
+    ("test --help", ["-c", "import sys; sys.argv = ['test', '--help']; from hello_crewai.main import test; test()"]),
+    ("serve --help", ["-c", "import sys; sys.argv = ['serve', '--help']; from hello_crewai.main import serve; serve()"]),
+    ("import config_loader", ["-c", "import hello_crewai.config_loader"]),
+    ("switch_model.py --help", [str(PROJECT_ROOT / "scripts" / "switch_model.py"), "--help"]),
+    ("switch_model.py list", [str(PROJECT_ROOT / "scripts" / "switch_model.py"), "list"]),
+)
+
+def parse_importtime(stderr):
+    """Return {module: (cumulative microseconds, nesting depth)} from -X importtime output"""
+    
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            modules[name.strip()] = (int(cumulative), depth)
+        except ValueError:
+            continue
+    return modules
+
+def measure(argv, repeat=5):
+    """Run a command `repeat` times and summarize wall time and imports"""
+    
+    walls = []
+    modules = {}
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+        modules = parse_importtime(result.stderr)
+    
+    heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY_MODULES})
+    top_level = [(name, us) for name, (us, depth) in modules.items() if depth == 0]
+    slowest = sorted(top_level, key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "wall_ms_median": round(statistics.median(walls), 1),
+        "wall_ms_min": round(min(walls), 1),
+        "import_ms_total": round(sum(us for _, us in top_level) / 1000, 1),
+        "heavy_modules": heavy,
+        "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+def run_checks(repeat=5, budget_ms=None):
+    """Measure every light command; returns (results, failures)"""
+    
+    results = {}
+    failures = []
+    for name, argv in LIGHT_COMMANDS:
+        result = measure(argv, repeat)
+        results[name] = result
+        if result["heavy_modules"]:
+            failures.append(f"{name} imported {', '.join(result['heavy_modules'])}")
+        if budget_ms is not None and result["wall_ms_median"] > budget_ms:
+            failures.append(f"{name} took {result['wall_ms_median']}ms (budget {budget_ms}ms)")
+    return results, failures
+
+def main():
+    """Main CLI interface"""
+    
+    parser = argparse.ArgumentParser(description="Guard CLI cold-start time and heavy imports")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command (default: 5)")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Median wall time budget per command")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    results, failures = run_checks(args.repeat, args.budget_ms)
+    
+    print("# CLI cold start")
+    print()
+    for name, result in results.items():
+        heavy = f"  ! imports {', '.join(result['heavy_modules'])}" if result["heavy_modules"] else ""
+        print(f"  {name:<26} {result['wall_ms_median']:>7.1f}ms  (imports {result['import_ms_total']:.1f}ms){heavy}")
+    print()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    
+    if failures:
+        for failure in failures:
+            print(f"* ERROR: {failure}")
+        return 1
+    
+    print("+ All commands within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the LM Studio OpenAI-compatible API, for benchmarks and offline tests
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# CrewAI agents stop parsing once they see a final answer in this format
+ANSWER_PREFIX = "Thought: I now can give a great answer\nFinal Answer: "
+
+WORDS = (
+    "large language models continue to improve in reasoning efficiency and "
+    "tool use while local inference makes private agents practical"
+).split()
+
+class StubLMStudio:
+    """Threaded HTTP server implementing /v1/models, /v1/chat/completions and /v1/embeddings
+    
+    Each completion waits `latency` seconds before the first token, then emits
+    `completion_tokens` tokens at `tokens_per_sec`. A `failure_rate` fraction of
+    completions fail with HTTP 500. With `slots`, at most that many completions
+    are generated at once and the rest queue, like a single GPU host. The first
+    completion for each model also waits `load_latency` seconds, like LM Studio
+    loading the model on demand. `model_latency` overrides `latency` per model.
+    """
+    
+    def __init__(
+        self,
+        models=("stub-model",),
+        latency=0.05,
+        tokens_per_sec=200.0,
+        completion_tokens=40,
+        failure_rate=0.0,
+        host="127.0.0.1",
+        port=0,
+        seed=None,
+        slots=None,
+        load_latency=0.0,
+        model_latency=None,
+    ):
+        self.models = list(models)
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = completion_tokens
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(slots) if slots else None
+        self.load_latency = load_latency
+        self.model_latency = dict(model_latency or {})
+        self._loaded = set()
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.stats = {"connections": 0, "models": 0, "completions": 0, "embeddings": 0, "failures": 0, "active": 0, "peak_active": 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._server.handle_error = self._handle_error
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    def start(self):
+        """Serve requests on a background thread"""
+        
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down and wait for the serving thread"""
+        
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _handle_error(self, request, client_address):
+        # Clients hanging up mid-request (e.g. cancelled hedges) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            ThreadingHTTPServer.handle_error(self._server, request, client_address)
+    
+    def _count(self, key, delta=1):
+        with self._lock:
+            self.stats[key] += delta
+            if key == "active":
+                self.stats["peak_active"] = max(self.stats["peak_active"], self.stats["active"])
+    
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.failure_rate
+    
+    def _load(self, model):
+        """Wait for a model to load; concurrent first requests all wait for the same load"""
+        
+        if model in self._loaded:
+            return
+        with self._load_lock:
+            if model not in self._loaded:
+                time.sleep(self.load_latency)
+                self._loaded.add(model)
+    
+    def completion_text(self, messages):
+        """Deterministic answer text for a message list"""
+        
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+        words = [WORDS[(digest[i % len(digest)] + i) % len(WORDS)] for i in range(self.completion_tokens)]
+        return ANSWER_PREFIX + " ".join(words)
+    
+    def embedding(self, text, dimensions=16):
+        """Deterministic unit vector for a text"""
+        
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        vector = [digest[i] - 127.5 for i in range(dimensions)]
+        norm = sum(v * v for v in vector) ** 0.5
+        return [v / norm for v in vector]
+    
+    def _make_handler(stub):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def setup(self):
+                super().setup()
+                stub._count("connections")
+            
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                if self.path.rstrip("/") != "/v1/models":
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                stub._count("models")
+                self._send_json(200, {
+                    "object": "list",
+                    "data": [{"id": model, "object": "model", "owned_by": "stub"} for model in stub.models],
+                })
+            
+            def do_POST(self):
+                path = self.path.rstrip("/")
+                if path not in ("/v1/chat/completions", "/v1/embeddings"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if path == "/v1/embeddings":
+                    self._embed(request)
+                    return
+                stub._count("completions")
+                if stub._slots is not None:
+                    stub._slots.acquire()
+                stub._count("active")
+                try:
+                    self._complete(request)
+                finally:
+                    stub._count("active", -1)
+                    if stub._slots is not None:
+                        stub._slots.release()
+            
+            def _embed(self, request):
+                inputs = request.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                stub._count("embeddings", len(inputs))
+                self._send_json(200, {
+                    "object": "list",
+                    "model": request.get("model", ""),
+                    "data": [
+                        {"object": "embedding", "index": i, "embedding": stub.embedding(text)}
+                        for i, text in enumerate(inputs)
+                    ],
+                })
+            
+            def _complete(self, request):
+                model = request.get("model", "")
+                if model not in stub.models and model.split("/", 1)[-1] not in stub.models:
+                    self._send_json(404, {"error": {"message": f"Model '{model}' not found"}})
+                    return
+                
+                stub._load(model.split("/", 1)[-1])
+                time.sleep(stub.model_latency.get(model.split("/", 1)[-1], stub.latency))
+                if stub._should_fail():
+                    stub._count("failures")
+                    self._send_json(500, {"error": {"message": "Injected stub failure"}})
+                    return
+                
+                messages = request.get("messages", [])
+                text = stub.completion_text(messages)
+                max_tokens = request.get("max_tokens")
+                tokens = text.split(" ")
+                if max_tokens:
+                    tokens = tokens[:max_tokens]
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                }
+                
+                if request.get("stream"):
+                    self._stream(model, tokens, usage)
+                    return
+                
+                if stub.tokens_per_sec:
+                    time.sleep(len(tokens) / stub.tokens_per_sec)
+                self._send_json(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(tokens)},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": usage,
+                })
+            
+            def _stream(self, model, tokens, usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                
+                def send(payload):
+                    self.wfile.write(f"data: {payload}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                
+                for i, token in enumerate(tokens):
+                    if i and stub.tokens_per_sec:
+                        time.sleep(1 / stub.tokens_per_sec)
+                    send(json.dumps({
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token}, "finish_reason": None}],
+                    }))
+                send(json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "usage": usage,
+                }))
+                send("[DONE]")
+        
+        return Handler
+
+def main():
+    """Run the stub server in the foreground"""
+    
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for LM Studio")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--model", action="append", dest="models", help="Model id to serve (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--tps", type=float, default=200.0, help="Generated tokens per second")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens per completion")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of completions that fail")
+    parser.add_argument("--slots", type=int, default=None, help="Completions generated at once (default: unlimited)")
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Extra seconds for each model's first completion")
+    args = parser.parse_args()
+    
+    stub = StubLMStudio(
+        models=args.models or ["stub-model"],
+        latency=args.latency,
+        tokens_per_sec=args.tps,
+        completion_tokens=args.tokens,
+        failure_rate=args.failure_rate,
+        port=args.port,
+        slots=args.slots,
+        load_latency=args.load_latency,
+    )
+    print(f"+ Stub LM Studio serving {stub.models} on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print("+ Stopped")
+    finally:
+        stub._server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
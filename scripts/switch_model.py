@@ -10,7 +10,16 @@ from pathlib import Path
 # Add src directory to path to import config_loader
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'hello_crewai'))
 
-from config_loader import list_available_models, get_current_model
+from config_loader import list_available_models, get_current_model, load_config, invalidate_config_cache
+from config_loader import get_config_section, get_endpoints, get_model_config, load_config_snapshot
+
+# Sort keys for `list --sort`: (profile field, fastest first when descending)
+SORT_KEYS = {
+    "tps": ("tokens_per_sec", True),
+    "ttft": ("ttft_s", False),
+    "load": ("load_s", False),
+    "timeout": ("timeout", False),
+}
 
 def switch_model(model_name: str):
     """Switch the default model in .env.toml"""
@@ -20,9 +29,8 @@ def switch_model(model_name: str):
         print("* ERROR: .env.toml not found!")
         return False
     
-    # Load current config
-    with open(config_file, 'r') as f:
-        config = toml.load(f)
+    # Load current config (a mutable copy of the cached parse)
+    config = load_config(str(config_file))
     
     # Check if model exists
     available_models = config.get("models", {})
@@ -40,6 +48,7 @@ def switch_model(model_name: str):
     # Save config
     with open(config_file, 'w') as f:
         toml.dump(config, f)
+    invalidate_config_cache(str(config_file))
     
     model_info = available_models[model_name]
     print(f"+ Switched to model: {model_name}")
@@ -49,20 +58,93 @@ def switch_model(model_name: str):
     
     return True
 
-def list_models():
-    """List all available models with numbers"""
+def warm_model(model_name: str = None, samples: int = 3):
+    """Preload a model (the current default if none given) on every endpoint serving it
+    
+    Reports the cold start (first completion, including the model load) separately
+    from the steady-state latency of `samples` further completions.
+    """
+    
+    # Imported here so list/switch don't pay for the HTTP stack
+    from transport import get_transport
+    from warmup import warm_model as warm, warmup_targets
+    
+    model_name = model_name or get_current_model()
+    try:
+        model_config = get_model_config(model_name)
+    except ValueError as e:
+        print(f"* ERROR: {e}")
+        return False
+    
+    transport = get_transport(get_config_section("http"))
+    targets = warmup_targets({model_name: model_config}, get_endpoints())
+    if not targets:
+        print(f"* ERROR: No endpoint serves {model_config['name']}")
+        return False
+    
+    print(f"# Warming up {model_name} ({model_config['name']})")
+    all_ok = True
+    for target in targets:
+        args = (target["model_name"], target["base_url"], target["api_key"], transport, target["timeout"])
+        cold = warm(*args)
+        if not cold["ok"]:
+            print(f"- {target['base_url']}: failed ({cold['error']})")
+            all_ok = False
+            continue
+        
+        steady = sorted(warm(*args)["latency_s"] for _ in range(samples))
+        print(f"+ {target['base_url']}")
+        print(f"   Cold start: {cold['latency_s']:.2f}s")
+        if steady:
+            print(f"   Steady state: {steady[len(steady) // 2]:.2f}s (median of {len(steady)})")
+    
+    return all_ok
+
+def format_profile(model_config):
+    """Speed figures measured by sync_models.py, or an empty string"""
+    
+    parts = []
+    if model_config.get("tokens_per_sec"):
+        parts.append(f"{model_config['tokens_per_sec']:.1f} tok/s")
+    if model_config.get("ttft_s") is not None:
+        parts.append(f"TTFT {model_config['ttft_s']:.2f}s")
+    if model_config.get("load_s") is not None:
+        parts.append(f"load {model_config['load_s']:.1f}s")
+    if not parts:
+        return ""
+    parts.append(f"timeout {model_config.get('timeout', 'N/A')}s")
+    return f" [{', '.join(parts)}]"
+
+def list_models(sort: str = None, min_tps: float = None, max_ttft: float = None):
+    """List all available models with numbers, optionally sorted/filtered by speed
+    
+    Numbers always follow the config order so they can be passed to switch.
+    Models that were never profiled sort last and are dropped by the filters.
+    """
     
     try:
         models = list_available_models()
         current = get_current_model()
+        model_configs = load_config_snapshot().get("models", {})
         
         print("# Available models:")
         print()
         
         model_list = list(models.items())
-        for i, (model_name, description) in enumerate(model_list, 1):
+        rows = [(i, name, description, model_configs.get(name, {})) for i, (name, description) in enumerate(model_list, 1)]
+        if min_tps is not None:
+            rows = [row for row in rows if (row[3].get("tokens_per_sec") or 0) >= min_tps]
+        if max_ttft is not None:
+            rows = [row for row in rows if row[3].get("ttft_s") is not None and row[3]["ttft_s"] <= max_ttft]
+        if sort:
+            field, descending = SORT_KEYS[sort]
+            measured = [row for row in rows if row[3].get(field) is not None]
+            unmeasured = [row for row in rows if row[3].get(field) is None]
+            rows = sorted(measured, key=lambda row: row[3][field], reverse=descending) + unmeasured
+        
+        for i, model_name, description, model_config in rows:
             marker = ">" if model_name == current else " "
-            print(f"{marker} {i}. {model_name}: {description}")
+            print(f"{marker} {i}. {model_name}: {description}{format_profile(model_config)}")
         
         print()
         print(f"Current default: {current}")
@@ -72,25 +154,80 @@ def list_models():
         print(f"* ERROR: {e}")
         return []
 
+def parse_list_options(args):
+    """Parse `list` options into keyword arguments for list_models()"""
+    
+    options = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg not in ["--sort", "--min-tps", "--max-ttft"]:
+            raise ValueError(f"Unknown option '{arg}'")
+        if i + 1 >= len(args):
+            raise ValueError(f"'{arg}' requires a value")
+        value = args[i + 1]
+        i += 2
+        
+        if arg == "--sort":
+            if value not in SORT_KEYS:
+                raise ValueError(f"Sort must be one of: {', '.join(SORT_KEYS)}")
+            options["sort"] = value
+            continue
+        try:
+            options["min_tps" if arg == "--min-tps" else "max_ttft"] = float(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a valid number")
+    
+    return options
+
+def print_help():
+    """Print help information"""
+    print("# CrewAI Model Switcher")
+    print()
+    print("Usage:")
+    print("  python switch_model.py list              - List available models")
+    print("  python switch_model.py list --sort tps   - Sort by speed (tps, ttft, load, timeout)")
+    print("  python switch_model.py list --min-tps <n> --max-ttft <s> - Only models at least this fast")
+    print("  python switch_model.py <number>          - Switch to model by number")
+    print("  python switch_model.py warm [number]     - Preload the current (or given) model")
+    print()
+
 def main():
     """Main CLI interface"""
     
     if len(sys.argv) == 1:
-        print("# CrewAI Model Switcher")
-        print()
-        print("Usage:")
-        print("  python switch_model.py list              - List available models")
-        print("  python switch_model.py <number>          - Switch to model by number")
-        print()
+        print_help()
         list_models()
         return
     
     command = sys.argv[1]
     
     if command == "list":
-        list_models()
+        try:
+            options = parse_list_options(sys.argv[2:])
+        except ValueError as e:
+            print(f"* ERROR: {e}")
+            print()
+            print_help()
+            return
+        list_models(**options)
     elif command in ["help", "--help", "-h"]:
-        main()
+        print_help()
+    elif command == "warm":
+        model_name = None
+        if len(sys.argv) > 2:
+            try:
+                model_list = list(list_available_models().items())
+                model_number = int(sys.argv[2])
+                if not 1 <= model_number <= len(model_list):
+                    raise ValueError
+                model_name = model_list[model_number - 1][0]
+            except ValueError:
+                print(f"* ERROR: '{sys.argv[2]}' is not a valid model number")
+                print()
+                list_models()
+                return
+        warm_model(model_name)
     else:
         # Parse as number only
         try:
@@ -101,6 +238,7 @@ def main():
                 model_name = model_list[model_number - 1][0]  # Get model name from list
                 if switch_model(model_name):
                     print()
+                    print("> Preload it with: uv run python scripts/switch_model.py warm")
                     print("> You can now run: uv run hello_crewai")
             else:
                 print(f"* ERROR: Number must be between 1 and {len(model_list)}")
@@ -4,59 +4,80 @@ Model sync utility for CrewAI - automatically detect models from LM Studio
 """
 import sys
 import os
+import json
+import math
+import time
 import toml
-import requests
+import httpx
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Add src directory to path to import config_loader
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'hello_crewai'))
 
+from config_loader import load_config, invalidate_config_cache, get_endpoints, get_config_section
+from transport import get_transport
+
+def shared_transport():
+    """The pooled transport described by [http] in .env.toml"""
+    
+    config_file = Path(__file__).parent.parent / ".env.toml"
+    http_config = get_config_section("http", str(config_file)) if config_file.exists() else {}
+    return get_transport(http_config)
+
 def get_lm_studio_models():
-    """Get available models from LM Studio API"""
+    """Get available models from LM Studio API (merged across all configured endpoints)"""
     
     config_file = Path(__file__).parent.parent / ".env.toml"
     if not config_file.exists():
         print("* ERROR: .env.toml not found!")
         return []
     
-    # Load config to get LM Studio URL
-    with open(config_file, 'r') as f:
-        config = toml.load(f)
-    
-    base_url = config.get("lm_studio", {}).get("base_url", "http://localhost:1234/v1")
-    
-    try:
-        # Query LM Studio for available models
-        response = requests.get(f"{base_url}/models", timeout=10)
-        response.raise_for_status()
-        
-        models_data = response.json()
-        models = []
+    transport = shared_transport()
+    models = []
+    by_id = {}
+    for endpoint in get_endpoints(str(config_file)):
+        base_url = endpoint["base_url"]
+        try:
+            # Query LM Studio for available models
+            response = transport.client(base_url).get(
+                f"{base_url}/models",
+                headers={"Authorization": f"Bearer {endpoint['api_key']}"},
+            )
+            response.raise_for_status()
+            models_data = response.json()
+        except httpx.ConnectError:
+            print(f"* ERROR: Cannot connect to LM Studio at {base_url}. Is it running?")
+            continue
+        except httpx.HTTPError as e:
+            print(f"* ERROR: Failed to get models from LM Studio at {base_url}: {e}")
+            continue
         
         for model in models_data.get("data", []):
             model_id = model.get("id", "")
+            if model_id in by_id:
+                by_id[model_id]["endpoints"].append(endpoint)
+                continue
+            
             # Clean up the model ID for display
             clean_name = model_id.replace("openai/", "").replace("/", "-")
-            models.append({
+            by_id[model_id] = {
                 "id": model_id,
                 "clean_name": clean_name,
-                "raw_data": model
-            })
-        
-        return models
-        
-    except requests.exceptions.ConnectionError:
-        print("* ERROR: Cannot connect to LM Studio. Is it running on localhost:1234?")
-        return []
-    except requests.exceptions.RequestException as e:
-        print(f"* ERROR: Failed to get models from LM Studio: {e}")
-        return []
+                "raw_data": model,
+                "endpoints": [endpoint]
+            }
+            models.append(by_id[model_id])
+    
+    return models
 
-def validate_model(model_id, base_url, api_key):
+def validate_model(model_id, base_url, api_key, session=None):
     """Test if a model actually works for LLM calls"""
+    transport = shared_transport()
+    http = session or transport.client(base_url)
     try:
         # Simple test completion request
-        response = requests.post(
+        response = http.post(
             f"{base_url}/chat/completions",
             headers={"Authorization": f"Bearer {api_key}"},
             json={
@@ -65,7 +86,7 @@ def validate_model(model_id, base_url, api_key):
                 "max_tokens": 5,
                 "temperature": 0
             },
-            timeout=15
+            timeout=transport.timeout(15)
         )
         
         if response.status_code == 200:
@@ -76,6 +97,202 @@ def validate_model(model_id, base_url, api_key):
     except Exception:
         return False
 
+def timed_validate_model(model_id, base_url, api_key, session=None, clock=time.perf_counter):
+    """Validate a model and return (passed, latency in seconds)"""
+    
+    start = clock()
+    passed = validate_model(model_id, base_url, api_key, session)
+    return passed, clock() - start
+
+def validate_models(model_ids, base_url, api_key, concurrency=1, targets=None):
+    """Validate models, up to `concurrency` at a time
+    
+    Returns a dict mapping model_id -> (passed, latency). Results are reported
+    as they finish; callers should iterate `model_ids` to keep a stable order.
+    `targets` optionally maps a model_id to the (base_url, api_key) serving it.
+    """
+    
+    return _for_each_model(
+        timed_validate_model, model_ids, base_url, api_key, concurrency, targets,
+        lambda model_id, result: _print_validation(model_id, *result),
+    )
+
+def profile_models(model_ids, base_url, api_key, concurrency=1, targets=None):
+    """Profile models like validate_models(), returning model_id -> profile_model() result
+    
+    Models sharing an endpoint compete for it when profiled concurrently, which
+    makes their figures (and so their derived timeouts) pessimistic.
+    """
+    
+    return _for_each_model(profile_model, model_ids, base_url, api_key, concurrency, targets, _print_profile)
+
+def _for_each_model(check, model_ids, base_url, api_key, concurrency, targets, report):
+    """Run `check(model_id, base_url, api_key, client)` for each model, up to `concurrency` at a time"""
+    
+    results = {}
+    if not model_ids:
+        return results
+    
+    targets = targets or {}
+    transport = shared_transport()
+    
+    def run(model_id):
+        target_url, target_key = targets.get(model_id, (base_url, api_key))
+        # Requests to the same endpoint share its pooled keep-alive connections
+        return check(model_id, target_url, target_key, transport.client(target_url))
+    
+    concurrency = max(1, min(concurrency, len(model_ids)))
+    if concurrency == 1:
+        for model_id in model_ids:
+            print(f"* Testing model: {model_id}...")
+            results[model_id] = run(model_id)
+            report(model_id, results[model_id])
+        return results
+    
+    print(f"* Testing {len(model_ids)} models ({concurrency} at a time)...")
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(run, model_id): model_id for model_id in model_ids}
+        for future in as_completed(futures):
+            model_id = futures[future]
+            results[model_id] = future.result()
+            report(model_id, results[model_id])
+    
+    return results
+
+def _print_validation(model_id, passed, latency):
+    """Print the outcome of a single model validation"""
+    
+    if passed:
+        print(f"+ Model validation passed: {model_id} ({latency:.2f}s)")
+    else:
+        print(f"- Model failed validation: {model_id} ({latency:.2f}s)")
+
+# Profiling prompt: long enough that time-to-first-token includes some prompt processing
+PROFILE_PROMPT = "Summarize the following notes in a few sentences.\n" + " ".join(
+    f"Note {i}: local language models trade speed for quality depending on size and quantization."
+    for i in range(20)
+)
+PROFILE_MAX_TOKENS = 64
+
+# Derived timeout: load + prompt processing (crew prompts are far longer than the
+# probe) + a long answer, doubled for headroom and clamped to a sane range
+TIMEOUT_TTFT_FACTOR = 10
+TIMEOUT_OUTPUT_TOKENS = 2048
+TIMEOUT_SAFETY = 2.0
+MIN_TIMEOUT = 30
+MAX_TIMEOUT = 900
+DEFAULT_TIMEOUT = 300
+
+def measure_stream(model_id, base_url, api_key, session, clock=time.perf_counter):
+    """Stream one completion and return (ttft_s, tokens_per_sec), or None if it failed"""
+    
+    transport = shared_transport()
+    start = clock()
+    first = last = None
+    chunks = 0
+    tokens = None
+    try:
+        with session.stream(
+            "POST",
+            f"{base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {api_key}"},
+            json={
+                "model": model_id,
+                "messages": [{"role": "user", "content": PROFILE_PROMPT}],
+                "max_tokens": PROFILE_MAX_TOKENS,
+                "temperature": 0,
+                "stream": True,
+                "stream_options": {"include_usage": True}
+            },
+            timeout=transport.timeout(60)
+        ) as response:
+            if response.status_code != 200:
+                return None
+            for line in response.iter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                chunk = json.loads(line[6:])
+                if chunk.get("usage"):
+                    tokens = chunk["usage"].get("completion_tokens")
+                choices = chunk.get("choices") or [{}]
+                if choices[0].get("delta", {}).get("content"):
+                    last = clock()
+                    first = first or last
+                    chunks += 1
+    except (httpx.HTTPError, ValueError):
+        return None
+    
+    if first is None:
+        return None
+    tokens = tokens or chunks
+    tokens_per_sec = (tokens - 1) / (last - first) if tokens > 1 and last > first else None
+    return first - start, tokens_per_sec
+
+def profile_model(model_id, base_url, api_key, session=None, clock=time.perf_counter):
+    """Validate a model, then measure its load time, time-to-first-token and tokens/sec
+    
+    The validation call is the model's first completion, so whatever it takes
+    beyond a warm time-to-first-token is counted as load time. Timings are read
+    from `clock`.
+    """
+    
+    session = session or shared_transport().client(base_url)
+    passed, first_latency = timed_validate_model(model_id, base_url, api_key, session, clock)
+    profile = {"passed": passed, "latency": first_latency}
+    if not passed:
+        return profile
+    
+    measured = measure_stream(model_id, base_url, api_key, session, clock)
+    if measured is None:
+        return profile
+    
+    ttft, tokens_per_sec = measured
+    profile.update({
+        "load_s": round(max(0.0, first_latency - ttft), 2),
+        "ttft_s": round(ttft, 3),
+        "tokens_per_sec": round(tokens_per_sec, 1) if tokens_per_sec else None,
+    })
+    return profile
+
+def derive_timeout(profile):
+    """Timeout in seconds for a profiled model (DEFAULT_TIMEOUT if it couldn't be measured)"""
+    
+    if not profile.get("tokens_per_sec") or profile.get("ttft_s") is None:
+        return DEFAULT_TIMEOUT
+    
+    seconds = (
+        profile["load_s"]
+        + profile["ttft_s"] * TIMEOUT_TTFT_FACTOR
+        + TIMEOUT_OUTPUT_TOKENS / profile["tokens_per_sec"]
+    )
+    return int(min(MAX_TIMEOUT, max(MIN_TIMEOUT, math.ceil(seconds * TIMEOUT_SAFETY))))
+
+def apply_profile(model_config, profile):
+    """Store profile figures and the derived timeout in a [models.*] entry"""
+    
+    for key in ("load_s", "ttft_s", "tokens_per_sec"):
+        if profile.get(key) is not None:
+            model_config[key] = profile[key]
+    model_config["timeout"] = derive_timeout(profile)
+    return model_config
+
+def _print_profile(model_id, profile):
+    """Print the outcome of a single model profile"""
+    
+    if not profile["passed"]:
+        _print_validation(model_id, False, profile["latency"])
+        return
+    if profile.get("ttft_s") is None:
+        print(f"+ Model validation passed: {model_id} ({profile['latency']:.2f}s, not profiled)")
+        return
+    
+    tokens_per_sec = f"{profile['tokens_per_sec']:.1f} tok/s" if profile.get("tokens_per_sec") else "? tok/s"
+    print(
+        f"+ Model validation passed: {model_id} "
+        f"(load {profile['load_s']:.2f}s, TTFT {profile['ttft_s']:.2f}s, {tokens_per_sec}, "
+        f"timeout {derive_timeout(profile)}s)"
+    )
+
 def list_lm_studio_models():
     """List all models available in LM Studio"""
     
@@ -88,19 +305,26 @@ def list_lm_studio_models():
         print("No models found or LM Studio not accessible.")
         return
     
+    multiple_endpoints = len({e["base_url"] for m in models for e in m["endpoints"]}) > 1
     for i, model in enumerate(models, 1):
         print(f"  {i}. {model['clean_name']}")
         print(f"     ID: {model['id']}")
+        if multiple_endpoints:
+            print(f"     Endpoints: {', '.join(e['base_url'] for e in model['endpoints'])}")
         print()
 
-def sync_models_to_config():
-    """Sync LM Studio models to .env.toml configuration"""
+def sync_models_to_config(concurrency=1, reprofile=False):
+    """Sync LM Studio models to .env.toml configuration
+    
+    New models are profiled and get a timeout derived from the measurements.
+    Kept models are profiled too if they have no figures yet, or always with
+    `reprofile`.
+    """
     
     config_file = Path(__file__).parent.parent / ".env.toml"
     
-    # Load current config
-    with open(config_file, 'r') as f:
-        config = toml.load(f)
+    # Load current config (parsed once, shared with get_lm_studio_models)
+    config = load_config(str(config_file))
     
     # Get models from LM Studio
     lm_models = get_lm_studio_models()
@@ -131,44 +355,67 @@ def sync_models_to_config():
     base_url = config.get("lm_studio", {}).get("base_url", "http://localhost:1234/v1")
     api_key = config.get("lm_studio", {}).get("api_key", "lm-studio")
     
+    # Collect models that still need to be validated, in LM Studio order
+    candidates = []
     for lm_model in lm_models:
         model_id = lm_model["id"]
-        clean_name = lm_model["clean_name"]
         
         # Skip embedding models
         if "embedding" in model_id.lower():
             print(f"- Skipped embedding model: {model_id}")
             continue
         
-        # Check if this model is already configured
+        # Check if this model is already configured (or already queued)
         already_exists = any(
             model_config.get("name") == model_id 
             for model_config in new_models.values()
-        )
+        ) or any(candidate["id"] == model_id for candidate in candidates)
         
         if not already_exists:
-            # Test if model actually works
-            print(f"* Testing model: {model_id}...")
-            if not validate_model(model_id, base_url, api_key):
-                print(f"- Model failed validation: {model_id}")
-                continue
-            
-            print(f"+ Model validation passed: {model_id}")
-            
-            # Generate a unique key
-            model_key = clean_name.lower().replace("-", "_").replace(".", "_")
-            counter = 1
-            original_key = model_key
-            while model_key in new_models:
-                model_key = f"{original_key}_{counter}"
-                counter += 1
-            
-            new_models[model_key] = {
-                "name": model_id,
-                "timeout": 300,
-                "description": f"Validated: {clean_name}"
-            }
-            print(f"+ Added validated model: {model_key} ({model_id})")
+            candidates.append(lm_model)
+    
+    # Kept models without measurements are profiled along with the new ones
+    to_refresh = {
+        model_config["name"]: model_key
+        for model_key, model_config in new_models.items()
+        if reprofile or "tokens_per_sec" not in model_config
+    }
+    
+    # Test if models actually work and how fast they are, each on an endpoint that serves it
+    profiled = [m for m in lm_models if m["id"] in to_refresh] + candidates
+    targets = {
+        m["id"]: (m["endpoints"][0]["base_url"], m["endpoints"][0]["api_key"])
+        for m in profiled
+    }
+    results = profile_models([m["id"] for m in profiled], base_url, api_key, concurrency, targets)
+    
+    for model_id, model_key in to_refresh.items():
+        if results[model_id].get("ttft_s") is not None:
+            apply_profile(new_models[model_key], results[model_id])
+            print(f"+ Updated profile: {model_key} (timeout {new_models[model_key]['timeout']}s)")
+    
+    # Add validated models in the original order so keys are assigned deterministically
+    for lm_model in candidates:
+        model_id = lm_model["id"]
+        clean_name = lm_model["clean_name"]
+        
+        if not results[model_id]["passed"]:
+            continue
+        
+        # Generate a unique key
+        model_key = clean_name.lower().replace("-", "_").replace(".", "_")
+        counter = 1
+        original_key = model_key
+        while model_key in new_models:
+            model_key = f"{original_key}_{counter}"
+            counter += 1
+        
+        new_models[model_key] = apply_profile({
+            "name": model_id,
+            "timeout": DEFAULT_TIMEOUT,
+            "description": f"Validated: {clean_name}"
+        }, results[model_id])
+        print(f"+ Added validated model: {model_key} ({model_id}, timeout {new_models[model_key]['timeout']}s)")
     
     # Update config
     config["models"] = new_models
@@ -188,6 +435,7 @@ def sync_models_to_config():
     # Save updated config
     with open(config_file, 'w') as f:
         toml.dump(config, f)
+    invalidate_config_cache(str(config_file))
     
     print()
     print(f"+ Configuration updated with {len(new_models)} models")
@@ -200,6 +448,42 @@ def print_help():
     print("  python sync_models.py list    - List models available in LM Studio")
     print("  python sync_models.py sync    - Sync LM Studio models to .env.toml")
     print()
+    print("Options:")
+    print("  sync -j <n>, --concurrency <n> - Validate up to <n> models in parallel")
+    print("  sync --reprofile               - Re-measure speed and timeouts of kept models")
+    print()
+
+def parse_sync_options(args):
+    """Parse the sync command options into (concurrency, reprofile)"""
+    
+    concurrency = 1
+    reprofile = False
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--reprofile":
+            reprofile = True
+            i += 1
+            continue
+        if arg in ["-j", "--concurrency"]:
+            if i + 1 >= len(args):
+                raise ValueError(f"'{arg}' requires a number")
+            value = args[i + 1]
+            i += 2
+        elif arg.startswith("--concurrency="):
+            value = arg.split("=", 1)[1]
+            i += 1
+        else:
+            raise ValueError(f"Unknown option '{arg}'")
+        
+        try:
+            concurrency = int(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a valid number")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+    
+    return concurrency, reprofile
 
 def main():
     """Main CLI interface"""
@@ -213,7 +497,14 @@ def main():
     if command == "list":
         list_lm_studio_models()
     elif command == "sync":
-        sync_models_to_config()
+        try:
+            concurrency, reprofile = parse_sync_options(sys.argv[2:])
+        except ValueError as e:
+            print(f"* ERROR: {e}")
+            print()
+            print_help()
+            return
+        sync_models_to_config(concurrency, reprofile)
         print()
         print("You can now run:")
         print("  uv run python scripts/switch_model.py list")
@@ -0,0 +1,186 @@
+"""
+Batch kickoff: run the crew over many topics with bounded concurrency
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from .single_flight import print_coalescing
+
+def read_topics(stream: TextIO) -> Iterator[str]:
+    """Yield one topic per non-empty line, skipping '#' comments"""
+    
+    for line in stream:
+        topic = line.strip()
+        if topic and not topic.startswith("#"):
+            yield topic
+
+def default_crew_factory():
+    """Build a fresh crew for one batch item"""
+    
+    from hello_crewai.crew import HelloCrewai
+    return HelloCrewai().crew()
+
+def default_crew_pool(size: int):
+    """The shared pool of pre-built crews, built on first use"""
+    
+    from hello_crewai.crew_pool import get_crew_pool
+    return get_crew_pool(size=size)
+
+async def _run_item(
+    index: int,
+    topic: str,
+    crew_factory: Optional[Callable[[], Any]],
+    current_year: str,
+    crew_pool: Any = None,
+) -> Dict[str, Any]:
+    """Run one topic through a pooled or freshly built crew; errors are captured in the result"""
+    
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"index": index, "topic": topic}
+    inputs = {"topic": topic, "current_year": current_year}
+    try:
+        if crew_pool is not None:
+            output = await asyncio.to_thread(crew_pool.kickoff, inputs)
+        else:
+            crew = await asyncio.to_thread(crew_factory)
+            output = await crew.kickoff_async(inputs=inputs)
+        result["status"] = "ok"
+        result["output"] = getattr(output, "raw", str(output))
+        token_usage = getattr(output, "token_usage", None)
+        if token_usage is not None and hasattr(token_usage, "model_dump"):
+            result["token_usage"] = token_usage.model_dump()
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+async def run_topics(
+    topics: Iterable[str],
+    emit: Callable[[Dict[str, Any]], None],
+    crew_factory: Optional[Callable[[], Any]] = None,
+    concurrency: int = 2,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+    current_year: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the crew for each topic, passing each result to `emit` as it is ready
+    
+    At most `concurrency` crews run at once. Topics are read lazily and at most
+    `max_pending` items may be in flight or waiting to be emitted, so a slow item
+    in ordered mode stalls the reader rather than buffering unbounded results.
+    Without a `crew_factory`, crews come from a pool of `concurrency` pre-built
+    crews that are reused across topics.
+    """
+    
+    concurrency = max(1, concurrency)
+    max_pending = max(concurrency, max_pending or concurrency * 4)
+    current_year = current_year or str(datetime.now().year)
+    crew_pool = None
+    if crew_factory is None:
+        crew_pool = await asyncio.to_thread(default_crew_pool, concurrency)
+    
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    window = asyncio.Semaphore(max_pending)
+    summary = {"total": 0, "ok": 0, "error": 0}
+    buffered: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    
+    def deliver(result: Dict[str, Any]):
+        nonlocal next_index
+        if not ordered:
+            emit(result)
+            window.release()
+            return
+        
+        buffered[result["index"]] = result
+        while next_index in buffered:
+            emit(buffered.pop(next_index))
+            next_index += 1
+            window.release()
+    
+    async def produce():
+        iterator = iter(topics)
+        index = 0
+        while True:
+            # Reading may block (e.g. stdin), so keep it off the event loop
+            topic = await asyncio.to_thread(next, iterator, None)
+            if topic is None:
+                break
+            await window.acquire()
+            await queue.put((index, topic))
+            index += 1
+        for _ in range(concurrency):
+            await queue.put(None)
+    
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            result = await _run_item(item[0], item[1], crew_factory, current_year, crew_pool)
+            summary["total"] += 1
+            summary[result["status"]] += 1
+            deliver(result)
+    
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    return summary
+
+def main(argv=None):
+    """Command line interface for the run_batch entry point"""
+    
+    parser = argparse.ArgumentParser(
+        prog="run_batch",
+        description="Run the crew for every topic in a file (one per line) and write JSONL results.",
+    )
+    parser.add_argument("topics", nargs="?", default="-", help="Topics file, or '-' for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file, or '-' for stdout (default)")
+    parser.add_argument("-j", "--concurrency", type=int, default=2, help="Crews to run at once (default: 2)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Items allowed in flight or awaiting output (default: 4x concurrency)")
+    parser.add_argument("--unordered", action="store_true", help="Write results as they finish instead of in input order")
+    parser.add_argument("--year", default=None, help="Value for {current_year} (default: this year)")
+    args = parser.parse_args(argv)
+    
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    
+    topics_file = sys.stdin if args.topics == "-" else open(args.topics, "r")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    
+    def emit(result: Dict[str, Any]):
+        output_file.write(json.dumps(result) + "\n")
+        output_file.flush()
+    
+    async def run():
+        # kickoff_async runs crews in the default executor, so size it to the concurrency limit
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency + 1))
+        return await run_topics(
+            read_topics(topics_file),
+            emit,
+            concurrency=args.concurrency,
+            ordered=not args.unordered,
+            max_pending=args.max_pending,
+            current_year=args.year,
+        )
+    
+    try:
+        # Crew logs go to stderr so stdout carries only JSONL
+        with redirect_stdout(sys.stderr):
+            summary = asyncio.run(run())
+    finally:
+        if topics_file is not sys.stdin:
+            topics_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    
+    print(f"+ Batch complete: {summary['ok']} ok, {summary['error']} failed, {summary['total']} total", file=sys.stderr)
+    print_coalescing(sys.stderr)
+    return summary
@@ -0,0 +1,164 @@
+"""
+Content-hashed task checkpoints: skip tasks whose inputs are unchanged since the last run
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskStartedEvent
+
+# Set to "1" to re-run every task for a run (fresh outputs are still stored)
+BYPASS_ENV_VAR = "HELLO_CREWAI_CHECKPOINTS_BYPASS"
+
+def checkpoint_key(task: Task, agent: Any, context: Optional[str]) -> str:
+    """Hash of everything that determines a task's output
+    
+    That is the rendered task, the agent's rendered config, tools and model, and
+    the upstream task outputs crewAI passes in as `context`.
+    """
+    
+    llm = getattr(agent, "llm", None)
+    payload = {
+        "task": {
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "output_json": getattr(task.output_json, "__name__", None),
+            "output_pydantic": getattr(task.output_pydantic, "__name__", None),
+        },
+        "agent": {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "tools": sorted(tool.name for tool in (task.tools or agent.tools or [])),
+        },
+        "model": {
+            "name": getattr(llm, "model", str(llm)),
+            "temperature": getattr(llm, "temperature", None),
+        },
+        "context": context or "",
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class CheckpointStore:
+    """Task outputs stored as one JSON file per checkpoint key in `directory`"""
+    
+    def __init__(self, directory: str = ".cache/checkpoints", bypass: bool = False):
+        self.directory = Path(directory)
+        self.bypass = bypass or os.environ.get(BYPASS_ENV_VAR, "") == "1"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored output record for `key`, or None"""
+        
+        record = None
+        if not self.bypass:
+            try:
+                record = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                record = None
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return record
+    
+    def put(self, key: str, record: Dict[str, Any]):
+        """Store an output record atomically"""
+        
+        path = self.directory / f"{key}.json"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(record, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+    
+    def clear(self):
+        """Remove every checkpoint"""
+        
+        for path in self.directory.glob("*.json"):
+            path.unlink()
+
+_stores: Dict[str, CheckpointStore] = {}
+_stores_lock = threading.Lock()
+
+def get_checkpoint_store(directory: str = ".cache/checkpoints") -> CheckpointStore:
+    """Return the shared store for a checkpoint directory"""
+    
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = CheckpointStore(directory)
+        return _stores[directory]
+
+class CheckpointedTask(Task):
+    """Task that reuses its stored output when its checkpoint key is unchanged
+    
+    With `checkpoint_dir` set, each run looks up checkpoint_key() first. On a hit
+    the agent is not called: the stored output is replayed through the usual task
+    events, callbacks and output file. On a miss the task runs and its output is
+    stored. Editing one task's YAML therefore only re-runs that task and the
+    tasks downstream of it.
+    """
+    
+    checkpoint_dir: Optional[str] = None
+    
+    def _execute_core(self, agent, context, tools) -> TaskOutput:
+        agent = agent or self.agent
+        if self.checkpoint_dir is None or agent is None:
+            return super()._execute_core(agent, context, tools)
+        
+        store = get_checkpoint_store(self.checkpoint_dir)
+        key = checkpoint_key(self, agent, context)
+        record = store.get(key)
+        if record is None:
+            output = super()._execute_core(agent, context, tools)
+            store.put(key, {"raw": output.raw, "json_dict": output.json_dict, "agent": output.agent})
+            return output
+        
+        print(f"+ Checkpoint: reusing output of {self.name or 'task'} ({key[:12]})")
+        return self._replay(agent, context, record)
+    
+    def _replay(self, agent, context, record: Dict[str, Any]) -> TaskOutput:
+        """Finish the task with a stored output, as if the agent had produced it"""
+        
+        self.agent = agent
+        self.prompt_context = context
+        self.start_time = datetime.datetime.now()
+        self.processed_by_agents.add(agent.role)
+        crewai_event_bus.emit(self, TaskStartedEvent(context=context, task=self))
+        
+        json_output = record.get("json_dict")
+        pydantic_output = None
+        if self.output_pydantic is not None and json_output is not None:
+            pydantic_output = self.output_pydantic.model_validate(json_output)
+        
+        self.output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=record["raw"],
+            pydantic=pydantic_output,
+            json_dict=json_output,
+            agent=record.get("agent") or agent.role,
+            output_format=self._get_output_format(),
+        )
+        self.end_time = datetime.datetime.now()
+        
+        if self.callback:
+            self.callback(self.output)
+        crew = agent.crew
+        if crew and crew.task_callback and crew.task_callback != self.callback:
+            crew.task_callback(self.output)
+        if self.output_file:
+            self._save_file(json_output if json_output else record["raw"])
+        
+        crewai_event_bus.emit(self, TaskCompletedEvent(output=self.output, task=self))
+        return self.output
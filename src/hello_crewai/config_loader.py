@@ -2,12 +2,25 @@
 Configuration loader for CrewAI models
 """
 import os
+import threading
 import toml
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 
-def load_config(config_path: str = ".env.toml") -> Dict[str, Any]:
-    """Load configuration from TOML file"""
+# Parsed configs keyed on resolved path, tagged with the (mtime_ns, size) they were read at
+_config_cache: Dict[Path, Tuple[Tuple[int, int], Mapping[str, Any]]] = {}
+# Resolved file for each (config_path, cwd) pair, so lookups don't probe the filesystem
+_path_cache: Dict[Tuple[str, str], Path] = {}
+_cache_lock = threading.Lock()
+
+def _resolve_config_path(config_path: str) -> Path:
+    """Find the config file in the current directory or project root"""
+    
+    cache_key = (config_path, os.getcwd())
+    cached = _path_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     # Try to find config file in current directory or project root
     config_file = Path(config_path)
@@ -19,12 +32,88 @@ def load_config(config_path: str = ".env.toml") -> Dict[str, Any]:
     if not config_file.exists():
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
-    return toml.load(config_file)
+    config_file = config_file.resolve()
+    _path_cache[cache_key] = config_file
+    return config_file
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts and lists into read-only equivalents"""
+    
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value: Any) -> Any:
+    """Recursively convert a frozen snapshot back into plain dicts and lists"""
+    
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+def load_config_snapshot(config_path: str = ".env.toml") -> Mapping[str, Any]:
+    """Load a cached, read-only snapshot of the TOML configuration
+    
+    The file is parsed once per process and only re-parsed when its
+    modification time or size changes.
+    """
+    
+    try:
+        config_file = _resolve_config_path(config_path)
+        stat = config_file.stat()
+    except FileNotFoundError:
+        # The file moved or was deleted since it was resolved; look again
+        _path_cache.pop((config_path, os.getcwd()), None)
+        config_file = _resolve_config_path(config_path)
+        stat = config_file.stat()
+    
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(config_file)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    with _cache_lock:
+        cached = _config_cache.get(config_file)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    
+        snapshot = _freeze(toml.load(config_file))
+        _config_cache[config_file] = (signature, snapshot)
+        return snapshot
+
+def invalidate_config_cache(config_path: Optional[str] = None):
+    """Drop cached configs so the next read re-parses the file
+    
+    Call this after writing the config file from the same process, in case the
+    write did not change the file's mtime or size.
+    """
+    
+    with _cache_lock:
+        if config_path is None:
+            _config_cache.clear()
+            _path_cache.clear()
+            return
+    
+        try:
+            _config_cache.pop(_resolve_config_path(config_path), None)
+        except FileNotFoundError:
+            pass
+
+def load_config(config_path: str = ".env.toml") -> Dict[str, Any]:
+    """Load configuration from TOML file
+    
+    Returns a mutable copy; use load_config_snapshot() for read-only access.
+    """
+    
+    return _thaw(load_config_snapshot(config_path))
 
 def get_model_config(model_name: str = None, config_path: str = ".env.toml") -> Dict[str, Any]:
     """Get configuration for a specific model"""
     
-    config = load_config(config_path)
+    config = load_config_snapshot(config_path)
     
     # Use default model if none specified
     if model_name is None:
@@ -36,13 +125,13 @@ def get_model_config(model_name: str = None, config_path: str = ".env.toml") ->
         available_models = list(models.keys())
         raise ValueError(f"Model '{model_name}' not found. Available models: {available_models}")
     
-    model_config = models[model_name].copy()
+    model_config = _thaw(models[model_name])
     
-    # Add LM Studio settings
-    lm_studio = config.get("lm_studio", {})
+    # Add LM Studio settings (the first endpoint when several are configured)
+    endpoint = get_endpoints(config_path)[0]
     model_config.update({
-        "base_url": lm_studio.get("base_url", "http://localhost:1234/v1"),
-        "api_key": lm_studio.get("api_key", "lm-studio")
+        "base_url": endpoint["base_url"],
+        "api_key": endpoint["api_key"]
     })
     
     return model_config
@@ -50,7 +139,7 @@ def get_model_config(model_name: str = None, config_path: str = ".env.toml") ->
 def list_available_models(config_path: str = ".env.toml") -> Dict[str, str]:
     """List all available models with their descriptions"""
     
-    config = load_config(config_path)
+    config = load_config_snapshot(config_path)
     models = config.get("models", {})
     
     return {
@@ -61,5 +150,31 @@ def list_available_models(config_path: str = ".env.toml") -> Dict[str, str]:
 def get_current_model(config_path: str = ".env.toml") -> str:
     """Get the current default model"""
     
-    config = load_config(config_path)
+    config = load_config_snapshot(config_path)
     return config.get("settings", {}).get("default_model", "phi3-mini")
+
+def get_config_section(section: str, config_path: str = ".env.toml") -> Dict[str, Any]:
+    """Get a copy of a top-level config table, or an empty dict if it is missing"""
+    
+    config = load_config_snapshot(config_path)
+    return _thaw(config.get(section, {}))
+
+def get_endpoints(config_path: str = ".env.toml") -> List[Dict[str, Any]]:
+    """Get the LM Studio endpoints: each [[lm_studio.endpoints]] entry, or the single base_url
+    
+    Every entry has `base_url`, `api_key` (defaulting to [lm_studio] api_key) and
+    `models`, the model ids it serves (empty means discover them from /models).
+    """
+    
+    lm_studio = load_config_snapshot(config_path).get("lm_studio", {})
+    api_key = lm_studio.get("api_key", "lm-studio")
+    endpoints = lm_studio.get("endpoints") or [{"base_url": lm_studio.get("base_url", "http://localhost:1234/v1")}]
+    
+    return [
+        {
+            "base_url": endpoint["base_url"].rstrip("/"),
+            "api_key": endpoint.get("api_key", api_key),
+            "models": list(endpoint.get("models", [])),
+        }
+        for endpoint in endpoints
+    ]
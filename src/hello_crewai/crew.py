@@ -1,21 +1,36 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, after_kickoff, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-import os
+from typing import Dict, List, Optional
 import logging
-from crewai import LLM
-from .config_loader import get_model_config, get_current_model
+from .checkpoints import CheckpointedTask
+from .config_loader import get_model_config, get_current_model, get_config_section, get_endpoints, load_config_snapshot
+from .knowledge import get_knowledge_index
+from .llm import LMStudioLLM, build_llm
+from .model_stats import get_model_stats
+from .routing import ModelRouter
+from .scheduler import DagCrew
+from .search_index import get_search_index
+from .streaming import TaskStream, get_stream_monitor, print_stream_metrics
+from .telemetry import get_telemetry
+from .training_agent import TrainingAgent
+from .tools.custom_tool import DocumentSearchTool
+from .tools.knowledge_tool import KnowledgeSearchTool
+from .tools.tool_cache import get_tool_cache
+from .warmup import Warmup, print_warmup, warmup_targets
 
-# Enable logging (minimal verbosity for better performance)
-logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-# Disable verbose logging from LiteLLM and other libraries
-logging.getLogger("LiteLLM").setLevel(logging.WARNING)
-logging.getLogger("openai").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+def configure_logging():
+    """Minimal logging verbosity for better performance; done when a crew is built, not on import"""
+    # Enable logging (minimal verbosity for better performance)
+    logging.basicConfig(level=logging.WARNING)
+    
+    # Disable verbose logging from LiteLLM and other libraries
+    logging.getLogger("LiteLLM").setLevel(logging.WARNING)
+    logging.getLogger("openai").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
@@ -28,26 +43,66 @@ class HelloCrewai():
     agents: List[BaseAgent]
     tasks: List[Task]
 
-    def __init__(self):
+    def __init__(self, config_path: str = ".env.toml", model: Optional[str] = None):
         super().__init__()
+        configure_logging()
+        self.config_path = config_path
         
-        # Load model configuration from .env.toml
-        model_config = get_model_config()
-        current_model = get_current_model()
+        # Load model configuration from .env.toml (`model` overrides default_model)
+        current_model = model or get_current_model(config_path)
+        model_config = get_model_config(current_model, config_path)
         
-        # Set environment variables for LM Studio
-        os.environ['OPENAI_API_KEY'] = model_config['api_key']
-        os.environ['OPENAI_BASE_URL'] = model_config['base_url']
+        # Create LLM instance (over the shared [http] transport, with the optional [llm_cache])
+        self.llm_config = build_llm(model_config, config_path, current_model)
+        self._llms: Dict[str, LMStudioLLM] = {current_model: self.llm_config}
         
-        # Create LLM instance
-        self.llm_config = LLM(
-            model=f"openai/{model_config['name']}",
-            base_url=model_config['base_url'],
-            api_key=model_config['api_key'],
-            timeout=model_config['timeout']
+        # Per-agent / per-task model assignment ([routing] in .env.toml)
+        self.router = ModelRouter(
+            get_config_section("routing", config_path),
+            load_config_snapshot(config_path).get("models", {}),
+            current_model,
+            get_model_stats(get_config_section("model_stats", config_path)),
         )
+        self._agent_names: Dict[str, str] = {}
+        
+        # In streaming mode task output is written as it arrives and TTFT is recorded per task
+        self.streaming = get_config_section("streaming", config_path).get("enabled", False)
+        self.stream_metrics: List[dict] = []
+        self._stream_outputs: Dict[str, Optional[str]] = {}
+        
+        # Tasks whose inputs are unchanged reuse their last output ([checkpoints] in .env.toml)
+        checkpoints_config = get_config_section("checkpoints", config_path)
+        self.checkpoint_dir: Optional[str] = None
+        if checkpoints_config.get("enabled", False):
+            self.checkpoint_dir = checkpoints_config.get("directory", ".cache/checkpoints")
+        
+        # Optional per-agent / per-task telemetry ([telemetry] in .env.toml)
+        self.telemetry = get_telemetry(get_config_section("telemetry", config_path))
         
         print(f"+ Using model: {current_model} ({model_config['name']})")
+        
+        # Repeated tool calls are served from a cache ([tool_cache] in .env.toml)
+        self.tool_cache = get_tool_cache(get_config_section("tool_cache", config_path))
+        
+        # Optional search over the files in knowledge/ ([knowledge] in .env.toml)
+        self.knowledge = get_knowledge_index(config_path)
+        self.tools = []
+        if self.knowledge is not None:
+            top_k = get_config_section("knowledge", config_path).get("top_k", 4)
+            self.tools.append(KnowledgeSearchTool(index=self.knowledge, top_k=top_k, cache=self.tool_cache))
+        
+        # Optional BM25 keyword search over a document directory ([search] in .env.toml)
+        self.search_index = get_search_index(config_path)
+        if self.search_index is not None:
+            top_k = get_config_section("search", config_path).get("top_k", 5)
+            self.tools.append(DocumentSearchTool(index=self.search_index, top_k=top_k, cache=self.tool_cache))
+        
+        # Optionally load the crew's models in the background while YAML and agents are built
+        warmup_config = get_config_section("warmup", config_path)
+        self.warmup_wait_seconds = warmup_config.get("wait_seconds", 120)
+        self.warmup: Optional[Warmup] = None
+        if warmup_config.get("enabled", False):
+            self.warmup = self._start_warmup()
 
     # Learn more about YAML configuration files here:
     # Agents: https://docs.crewai.com/concepts/agents#yaml-configuration-recommended
@@ -55,37 +110,127 @@ class HelloCrewai():
     
     # If you would like to add tools to your agents, you can learn more about it here:
     # https://docs.crewai.com/concepts/agents#agent-tools
+    def _start_warmup(self) -> Warmup:
+        """Fire a tiny completion for every model the crew routes to, on every endpoint
+        
+        The LLM's SDK clients are built alongside, so neither cost lands in the first task.
+        """
+        models = {key: get_model_config(key, self.config_path) for key in sorted(self.router.configured_models())}
+        
+        def on_result(result):
+            # Warm-up latency is the cold start; later calls measure the steady state
+            if self.router.stats is not None and result["ok"]:
+                self.router.stats.record(result["model_key"], result["latency_s"], cold=result["cold"])
+            print_warmup(result)
+        
+        targets = warmup_targets(models, get_endpoints(self.config_path))
+        return Warmup(targets, self.llm_config.transport, on_result, preload=self.llm_config.preload).start()
+
+    @before_kickoff
+    def wait_for_warmup(self, inputs):
+        """Let warm-up finish so the first task's latency isn't a model load"""
+        if self.warmup is not None and self.warmup_wait_seconds:
+            self.warmup.wait(self.warmup_wait_seconds)
+        return inputs
+
+    @after_kickoff
+    def report_tool_cache(self, output):
+        """Print tool cache hit rates when tools were used"""
+        if self.tool_cache is not None:
+            stats = self.tool_cache.stats()
+            lookups = stats["hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+            if lookups:
+                print(f"+ Tool cache: {stats['hit_rate']:.0%} hit rate ({lookups} calls, {stats['misses']} executed)")
+        return output
+
     @agent
     def researcher(self) -> Agent:
-        return Agent(
+        return self._track_agent(TrainingAgent(
             config=self.agents_config['researcher'], # type: ignore[index]
             verbose=True,
-            llm=self.llm_config
-        )
+            tools=self.tools,
+            llm=self.llm_for(self.router.model_for_agent('researcher'))
+        ), 'researcher')
 
     @agent
     def reporting_analyst(self) -> Agent:
-        return Agent(
+        return self._track_agent(TrainingAgent(
             config=self.agents_config['reporting_analyst'], # type: ignore[index]
             verbose=True,
-            llm=self.llm_config
-        )
+            tools=self.tools,
+            llm=self.llm_for(self.router.model_for_agent('reporting_analyst'))
+        ), 'reporting_analyst')
+
+    def llm_for(self, model_key: str) -> LMStudioLLM:
+        """LLM for a [models] entry, built once per crew"""
+        if model_key not in self._llms:
+            self._llms[model_key] = build_llm(get_model_config(model_key, self.config_path), self.config_path, model_key)
+        return self._llms[model_key]
+
+    def _track_agent(self, agent: Agent, name: str) -> Agent:
+        """Remember an agent's YAML key and label its telemetry with it"""
+        self._agent_names[str(agent.id)] = name
+        if self.telemetry is not None:
+            self.telemetry.register_agent(agent, name)
+        return agent
 
     # To learn more about structured task outputs,
     # task dependencies, and task callbacks, check out the documentation:
     # https://docs.crewai.com/concepts/tasks#overview-of-a-task
     @task
     def research_task(self) -> Task:
-        return Task(
+        return self._prepare_task(CheckpointedTask(
             config=self.tasks_config['research_task'], # type: ignore[index]
-        )
+            checkpoint_dir=self.checkpoint_dir
+        ), 'research_task')
 
     @task
     def reporting_task(self) -> Task:
-        return Task(
+        # In streaming mode report.md is written incrementally, then renamed into place on completion
+        return self._prepare_task(CheckpointedTask(
             config=self.tasks_config['reporting_task'], # type: ignore[index]
-            output_file='report.md'
-        )
+            output_file=None if self.streaming else 'report.md',
+            checkpoint_dir=self.checkpoint_dir
+        ), 'reporting_task', stream_output_file='report.md')
+
+    def _prepare_task(self, task: Task, name: str, stream_output_file: str = None) -> Task:
+        """Route a task to its model and attach streaming metrics"""
+        self._route_task(task, name)
+        self._stream_outputs[name] = stream_output_file
+        self._attach_stream(task, name)
+        return task
+
+    def _attach_stream(self, task: Task, name: str):
+        """Register a fresh TaskStream for the task's next execution"""
+        if not self.streaming:
+            return
+        
+        def on_finish(metrics):
+            self.stream_metrics.append(metrics)
+            print_stream_metrics(metrics)
+        
+        get_stream_monitor().register_task(task, TaskStream(name, self._stream_outputs.get(name), on_finish))
+
+    def register_copy(self, original: Task, copied: Task):
+        """Give a copy of one of this crew's tasks (and its agent) the same streaming and telemetry set-up"""
+        agent_name = self._agent_names.get(str(original.agent.id)) if original.agent is not None else None
+        if agent_name is not None and copied.agent is not None:
+            self._track_agent(copied.agent, agent_name)
+        self._attach_stream(copied, original.name)
+
+    def _route_task(self, task: Task, name: str):
+        """Give a task its own copy of its agent if it is routed to a different model"""
+        agent_name = self._agent_names.get(str(task.agent.id)) if task.agent is not None else None
+        model_key, reason = self.router.model_for_task(name, agent_name)
+        if agent_name is None or model_key == self.router.model_for_agent(agent_name):
+            if reason != "default":
+                print(f"+ Routing {name} -> {model_key} ({reason})")
+            return
+        
+        routed_agent = task.agent.copy()
+        routed_agent.llm = self.llm_for(model_key)
+        task.agent = self._track_agent(routed_agent, agent_name)
+        print(f"+ Routing {name} -> {model_key} ({reason})")
 
     @crew
     def crew(self) -> Crew:
@@ -93,6 +238,18 @@ class HelloCrewai():
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
+        # With [scheduler] enabled, tasks run as a DAG of their `context` dependencies
+        scheduler_config = get_config_section("scheduler", self.config_path)
+        if scheduler_config.get("enabled", False):
+            return DagCrew(
+                agents=self.agents,
+                tasks=self.tasks,
+                process=Process.sequential,
+                verbose=True,
+                max_parallel=scheduler_config.get("max_parallel", 4),
+                endpoint_capacity=scheduler_config.get("endpoint_capacity"),
+            )
+
         return Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
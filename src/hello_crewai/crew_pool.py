@@ -0,0 +1,215 @@
+"""
+Crew template and pool: build the crew once, then hand out cheap copies for each kickoff
+"""
+import hashlib
+import json
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from crewai import Crew
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+
+from .config_loader import get_config_section
+from .crew import HelloCrewai
+from .single_flight import SingleFlight, get_single_flight
+
+# Same placeholder syntax crewAI interpolates inputs into
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_\-]*)\}")
+
+def normalize_inputs(inputs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Inputs with whitespace runs in string values collapsed, so trivially different requests match"""
+    
+    return {
+        key: " ".join(value.split()) if isinstance(value, str) else value
+        for key, value in (inputs or {}).items()
+    }
+
+class CrewTemplate:
+    """A HelloCrewai crew built once and copied per kickoff
+    
+    Building the template reads the config, parses and validates the YAML and
+    creates the LLMs, agents and tasks. clone() only copies agents and tasks;
+    the copies share the template's response cache, stats and connection pools.
+    """
+    
+    def __init__(self, config_path: str = ".env.toml", model: Optional[str] = None):
+        self.model = model
+        self.crew_base = HelloCrewai(config_path=config_path, model=model)
+        self.crew = self.crew_base.crew()
+        self.required_inputs = self._find_inputs()
+        self.config_hash = self._hash_config()
+        self._validate()
+    
+    def _find_inputs(self) -> Set[str]:
+        """Input names referenced by the task and agent templates"""
+        
+        texts = []
+        for task in self.crew.tasks:
+            texts += [task.description, task.expected_output, task.output_file or ""]
+        for agent in self.crew.agents:
+            texts += [agent.role, agent.goal, agent.backstory]
+        return {name for text in texts for name in PLACEHOLDER.findall(text or "")}
+    
+    def _hash_config(self) -> str:
+        """Hash of the task and agent templates and the model each task runs on"""
+        
+        tasks = [
+            {
+                "name": task.name,
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "context": [context.name for context in task.context] if isinstance(task.context, list) else None,
+                "agent": [task.agent.role, task.agent.goal, task.agent.backstory] if task.agent else None,
+                "model": getattr(getattr(task.agent, "llm", None), "model", None),
+            }
+            for task in self.crew.tasks
+        ]
+        payload = json.dumps(tasks, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def kickoff_key(self, inputs: Optional[Dict[str, Any]]) -> str:
+        """Key under which identical kickoffs of this template are coalesced"""
+        
+        payload = json.dumps({"inputs": normalize_inputs(inputs), "config": self.config_hash}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _validate(self):
+        for task in self.crew.tasks:
+            if task.agent is None:
+                raise ValueError(f"Task '{task.name}' has no agent")
+    
+    def validate_inputs(self, inputs: Optional[Dict[str, Any]]):
+        """Raise ValueError if inputs are missing for any placeholder in the YAML"""
+        
+        missing = self.required_inputs - set(inputs or {})
+        if missing:
+            raise ValueError(f"Missing crew inputs: {', '.join(sorted(missing))}")
+    
+    def clone(self) -> Crew:
+        """A new crew with copies of the template's agents and tasks"""
+        
+        clone = self.crew.copy()
+        
+        # Crew.copy() matches tasks to agents by role; keep tasks routed to a
+        # different model on their own agent copy
+        crew_agents = {id(agent) for agent in self.crew.agents}
+        routed = {}
+        for original, copied in zip(self.crew.tasks, clone.tasks):
+            if original.agent is not None and id(original.agent) not in crew_agents:
+                if id(original.agent) not in routed:
+                    routed[id(original.agent)] = original.agent.copy()
+                copied.agent = routed[id(original.agent)]
+        
+        self.prepare(clone)
+        return clone
+    
+    def prepare(self, clone: Crew):
+        """Set up streaming and telemetry for a clone's next kickoff"""
+        
+        for original, copied in zip(self.crew.tasks, clone.tasks):
+            self.crew_base.register_copy(original, copied)
+
+def reset_crew(crew: Crew):
+    """Clear the per-run state crewAI keeps on agents and tasks, so a crew can run again"""
+    
+    agents = {id(agent): agent for agent in crew.agents}
+    for task in crew.tasks:
+        task.output = None
+        task.retry_count = 0
+        task.used_tools = 0
+        task.tools_errors = 0
+        task.delegations = 0
+        task.processed_by_agents = set()
+        if task.agent is not None:
+            agents[id(task.agent)] = task.agent
+    
+    for agent in agents.values():
+        agent.tools_results = []
+        agent._times_executed = 0
+        agent._token_process = TokenProcess()
+
+class CrewPool:
+    """Reuse cloned crews across kickoffs; each crew runs one kickoff at a time
+    
+    At most `size` crews exist. A crew returned to the pool is reset and reused
+    by the next kickoff instead of building a new one. With a `single_flight`,
+    a kickoff identical to one already running (same normalized inputs, task
+    templates and models) waits for it and shares its output.
+    """
+    
+    def __init__(self, template: CrewTemplate, size: int = 4, single_flight: Optional[SingleFlight] = None):
+        self.template = template
+        self.size = size
+        self.single_flight = single_flight
+        self.created = 0
+        self.reused = 0
+        self._idle: "queue.LifoQueue[Crew]" = queue.LifoQueue()
+        self._available = threading.Semaphore(size)
+        self._lock = threading.Lock()
+    
+    def grow(self, size: int):
+        """Allow up to `size` crews at once; a pool never shrinks"""
+        
+        with self._lock:
+            extra = size - self.size
+            if extra <= 0:
+                return
+            self.size = size
+        self._available.release(extra)
+    
+    @contextmanager
+    def crew(self) -> Iterator[Crew]:
+        """Check out a crew, blocking while all `size` crews are in use"""
+        
+        self._available.acquire()
+        try:
+            try:
+                crew = self._idle.get_nowait()
+                self.template.prepare(crew)
+                with self._lock:
+                    self.reused += 1
+            except queue.Empty:
+                crew = self.template.clone()
+                with self._lock:
+                    self.created += 1
+            
+            try:
+                yield crew
+            finally:
+                reset_crew(crew)
+                self._idle.put(crew)
+        finally:
+            self._available.release()
+    
+    def kickoff(self, inputs: Dict[str, Any]) -> Any:
+        """Validate inputs and run a pooled crew with them"""
+        
+        self.template.validate_inputs(inputs)
+        if self.single_flight is not None:
+            return self.single_flight.do(self.template.kickoff_key(inputs), lambda: self._kickoff(inputs))
+        return self._kickoff(inputs)
+    
+    def _kickoff(self, inputs: Dict[str, Any]) -> Any:
+        with self.crew() as crew:
+            return crew.kickoff(inputs=inputs)
+
+_pools: Dict[Tuple[str, Optional[str]], CrewPool] = {}
+_pools_lock = threading.Lock()
+
+def get_crew_pool(config_path: str = ".env.toml", size: int = 4, model: Optional[str] = None) -> CrewPool:
+    """Return the shared pool for a config file (and model), building its template on first use
+    
+    A caller asking for more crews than the pool allows grows it to `size`.
+    """
+    
+    with _pools_lock:
+        key = (config_path, model)
+        if key not in _pools:
+            single_flight = get_single_flight("crews", get_config_section("coalescing", config_path))
+            _pools[key] = CrewPool(CrewTemplate(config_path, model), size, single_flight)
+        pool = _pools[key]
+    pool.grow(size)
+    return pool
@@ -0,0 +1,178 @@
+"""
+Load balancing and failover across several OpenAI-compatible LM Studio endpoints
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from .config_loader import get_config_section, get_endpoints
+from .transport import Transport, get_transport
+
+logger = logging.getLogger(__name__)
+
+class Endpoint:
+    """One inference host and its live load / health state"""
+    
+    def __init__(self, base_url: str, api_key: str, models: Iterable[str] = ()):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.models = set(models)
+        self.discovered: Optional[set] = None
+        self.outstanding = 0
+        self.dispatched = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+    
+    def serves(self, model_name: str) -> bool:
+        """Whether this endpoint serves a model (unknown model lists serve everything)"""
+        
+        served = self.models or self.discovered
+        if not served:
+            return True
+        return model_name in served or model_name.split("/", 1)[-1] in served
+    
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "outstanding": self.outstanding,
+            "dispatched": self.dispatched,
+            "failures": self.failures,
+            "ejected": self.is_ejected(time.monotonic()),
+        }
+
+class EndpointPool:
+    """Pick endpoints by least outstanding requests, ejecting ones that keep failing
+    
+    An endpoint is ejected for `eject_seconds` after `max_failures` consecutive
+    failed requests or a failed health check, and comes back after that time or
+    as soon as a health check succeeds. If every endpoint serving a model is
+    ejected, requests are spread across them anyway rather than failing outright.
+    """
+    
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_check_interval: float = 10.0,
+        transport: Optional[Transport] = None,
+    ):
+        self.endpoints = endpoints
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.health_check_interval = health_check_interval
+        self.transport = transport or get_transport()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+    
+    def acquire(self, model_name: str, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """Reserve the least loaded endpoint serving `model_name`, or None if there is none"""
+        
+        excluded = set(map(id, exclude))
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if id(e) not in excluded and e.serves(model_name)]
+            healthy = [e for e in candidates if not e.is_ejected(now)]
+            if not candidates:
+                return None
+            
+            endpoint = min(healthy or candidates, key=lambda e: (e.outstanding, e.dispatched))
+            endpoint.outstanding += 1
+            endpoint.dispatched += 1
+            return endpoint
+    
+    def release(self, endpoint: Endpoint, ok: bool = True):
+        """Return an endpoint after a request, updating its failure count"""
+        
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.failures = 0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                self._eject(endpoint)
+    
+    def _eject(self, endpoint: Endpoint):
+        if not endpoint.is_ejected(time.monotonic()):
+            logger.warning(f"Ejecting LM Studio endpoint {endpoint.base_url} for {self.eject_seconds}s")
+        endpoint.ejected_until = time.monotonic() + self.eject_seconds
+    
+    def check_health(self):
+        """Probe every endpoint's /models, refreshing served models and ejection state"""
+        
+        for endpoint in self.endpoints:
+            try:
+                response = self.transport.client(endpoint.base_url).get(
+                    f"{endpoint.base_url}/models",
+                    headers={"Authorization": f"Bearer {endpoint.api_key}"},
+                )
+                response.raise_for_status()
+                served = {model.get("id", "") for model in response.json().get("data", [])}
+            except (httpx.HTTPError, ValueError):
+                with self._lock:
+                    self._eject(endpoint)
+                continue
+            
+            with self._lock:
+                endpoint.discovered = served
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+    
+    def start_health_checks(self):
+        """Run check_health() now and then every `health_check_interval` seconds in the background"""
+        
+        if self._health_thread is not None or self.health_check_interval <= 0:
+            return
+        
+        def loop():
+            self.check_health()
+            while not self._stop.wait(self.health_check_interval):
+                self.check_health()
+        
+        self._health_thread = threading.Thread(target=loop, name="lm-studio-health", daemon=True)
+        self._health_thread.start()
+    
+    def stop(self):
+        """Stop background health checks"""
+        
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+_pools: Dict[tuple, EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+def get_endpoint_pool(config_path: str = ".env.toml") -> Optional[EndpointPool]:
+    """Return the shared pool for [[lm_studio.endpoints]], if several endpoints are configured"""
+    
+    lm_studio = get_config_section("lm_studio", config_path)
+    if not lm_studio.get("endpoints"):
+        return None
+    
+    endpoints = get_endpoints(config_path)
+    key = tuple((e["base_url"], e["api_key"], tuple(e["models"])) for e in endpoints)
+    with _pools_lock:
+        if key not in _pools:
+            pool = EndpointPool(
+                [Endpoint(e["base_url"], e["api_key"], e["models"]) for e in endpoints],
+                max_failures=lm_studio.get("max_failures", 3),
+                eject_seconds=lm_studio.get("eject_seconds", 30.0),
+                health_check_interval=lm_studio.get("health_check_interval", 10.0),
+                transport=get_transport(get_config_section("http", config_path)),
+            )
+            pool.start_health_checks()
+            _pools[key] = pool
+        return _pools[key]
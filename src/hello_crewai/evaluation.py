@@ -0,0 +1,297 @@
+"""
+Parallel crew evaluation: run test iterations concurrently and aggregate one report
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .model_stats import percentile
+
+# The same criteria crewAI's CrewEvaluator scores against, asking for a bare JSON answer
+EVAL_PROMPT = (
+    "Based on the task description and the expected output, evaluate the performance of "
+    "the agent on this task using a score from 1 to 10 for completion, quality and overall "
+    "performance.\n"
+    "task_description: {description}\n"
+    "task_expected_output: {expected_output}\n"
+    "agent: {role}\n"
+    "Task Output: {output}\n\n"
+    'Answer only with JSON like {{"quality": 7}}.'
+)
+
+SCORE = re.compile(r"\b(10(?:\.0+)?|[0-9](?:\.[0-9]+)?)\b")
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")
+
+def iteration_seed(base_seed: int, iteration: int) -> int:
+    """Sampling seed for an iteration; the same for every model, so runs are paired"""
+    
+    return (base_seed * 1000003 + iteration) % 2**31
+
+def parse_score(text: str) -> Optional[float]:
+    """The 1-10 score in an evaluator reply ({"quality": n} or a bare number), or None"""
+    
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict) and "quality" in data:
+            return float(data["quality"])
+    except (TypeError, ValueError):
+        pass
+    match = SCORE.search(text or "")
+    return float(match.group(1)) if match else None
+
+def distribution(values: Sequence[float]) -> Dict[str, Any]:
+    """Count, mean, standard deviation and percentiles of a list of numbers"""
+    
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 4),
+        "stdev": round(statistics.stdev(values), 4) if len(values) > 1 else 0.0,
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values),
+    }
+
+def evaluation_prompt(task: Any, output: str) -> str:
+    """The evaluator prompt for one task output"""
+    
+    return EVAL_PROMPT.format(
+        description=task.description,
+        expected_output=task.expected_output,
+        role=task.agent.role if task.agent else None,
+        output=output,
+    )
+
+def score_output(eval_llm: Any, prompt: str) -> Optional[float]:
+    """Ask the evaluator LLM for a score"""
+    
+    return parse_score(eval_llm.call([{"role": "user", "content": prompt}]))
+
+def set_seed(crew: Any, seed: Optional[int]) -> Dict[int, Any]:
+    """Set the sampling seed on every LLM in a crew, returning the previous values"""
+    
+    previous = {}
+    agents = {id(agent): agent for agent in crew.agents}
+    agents.update({id(task.agent): task.agent for task in crew.tasks if task.agent is not None})
+    for agent in agents.values():
+        llm = getattr(agent, "llm", None)
+        if llm is not None and hasattr(llm, "seed") and id(llm) not in previous:
+            previous[id(llm)] = (llm, llm.seed)
+            llm.seed = seed
+    return previous
+
+class Evaluation:
+    """Run `n_iterations` of the crew for each model, `workers` at a time
+    
+    Iterations draw crews from a CrewPool per model, so concurrent iterations
+    spread over the configured LM Studio endpoints through the endpoint pool.
+    Each iteration uses the same seed for every model. Every task output is
+    scored 1-10 by `eval_llm`; report() aggregates latencies, token usage and
+    scores per model.
+    """
+    
+    def __init__(
+        self,
+        models: Sequence[str],
+        n_iterations: int,
+        eval_llm: Any,
+        inputs: Dict[str, Any],
+        workers: int = 2,
+        seed: int = 42,
+        config_path: str = ".env.toml",
+        crew_pool_factory: Optional[Callable[[str], Any]] = None,
+    ):
+        self.models = list(models)
+        self.n_iterations = n_iterations
+        self.eval_llm = eval_llm
+        self.inputs = dict(inputs)
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.config_path = config_path
+        self.crew_pool_factory = crew_pool_factory or self._default_pool
+        self.runs: List[Dict[str, Any]] = []
+    
+    def _default_pool(self, model: str):
+        from .crew_pool import get_crew_pool
+        return get_crew_pool(self.config_path, self.workers, model)
+    
+    def _iterate(self, pool: Any, model: str, iteration: int) -> Dict[str, Any]:
+        """Run and score one iteration; errors are captured in the result"""
+    
+        seed = iteration_seed(self.seed, iteration)
+        run: Dict[str, Any] = {"model": model, "iteration": iteration, "seed": seed}
+        start = time.perf_counter()
+        try:
+            with pool.crew() as crew:
+                previous = set_seed(crew, seed)
+                try:
+                    output = crew.kickoff(inputs=self.inputs)
+                finally:
+                    for llm, value in previous.values():
+                        llm.seed = value
+                # Prompts are built now; the crew goes back to the pool before scoring
+                tasks = [
+                    ({"task": task.name, "duration_s": task.execution_duration}, evaluation_prompt(task, task_output.raw))
+                    for task, task_output in zip(crew.tasks, output.tasks_output)
+                ]
+            run["elapsed_s"] = round(time.perf_counter() - start, 3)
+            token_usage = getattr(output, "token_usage", None)
+            if token_usage is not None and hasattr(token_usage, "model_dump"):
+                run["token_usage"] = token_usage.model_dump()
+            for task, prompt in tasks:
+                task["score"] = score_output(self.eval_llm, prompt)
+            run["tasks"] = [task for task, _ in tasks]
+            run["status"] = "ok"
+        except Exception as e:
+            run["elapsed_s"] = round(time.perf_counter() - start, 3)
+            run["status"] = "error"
+            run["error"] = f"{type(e).__name__}: {e}"
+        return run
+    
+    def run(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run every iteration of every model and return the report"""
+    
+        pools = {model: self.crew_pool_factory(model) for model in self.models}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="evaluation") as executor:
+            futures = [
+                executor.submit(self._iterate, pools[model], model, iteration)
+                for iteration in range(1, self.n_iterations + 1)
+                for model in self.models
+            ]
+            for future in futures:
+                run = future.result()
+                self.runs.append(run)
+                if on_result is not None:
+                    on_result(run)
+        return self.report()
+    
+    def report(self) -> Dict[str, Any]:
+        """Latency, token and score statistics per model, plus every run"""
+    
+        models = {}
+        for model in self.models:
+            runs = [run for run in self.runs if run["model"] == model]
+            ok = [run for run in runs if run["status"] == "ok"]
+            task_names = list(dict.fromkeys(task["task"] for run in ok for task in run["tasks"]))
+            crew_scores = []
+            for run in ok:
+                scores = [task["score"] for task in run["tasks"] if task["score"] is not None]
+                crew_scores.append(statistics.fmean(scores) if scores else None)
+            models[model] = {
+                "iterations": len(runs),
+                "ok": len(ok),
+                "errors": len(runs) - len(ok),
+                "latency_s": distribution([run["elapsed_s"] for run in ok]),
+                "task_latency_s": {
+                    name: distribution([task["duration_s"] for run in ok for task in run["tasks"] if task["task"] == name])
+                    for name in task_names
+                },
+                "tokens": {
+                    field: sum(run.get("token_usage", {}).get(field, 0) for run in ok) for field in TOKEN_FIELDS
+                },
+                "tokens_per_iteration": distribution([run.get("token_usage", {}).get("total_tokens") for run in ok]),
+                "scores": {
+                    name: distribution([task["score"] for run in ok for task in run["tasks"] if task["task"] == name])
+                    for name in task_names
+                },
+                "crew_score": distribution(crew_scores),
+            }
+        return {
+            "iterations": self.n_iterations,
+            "workers": self.workers,
+            "seed": self.seed,
+            "models": models,
+            "runs": sorted(self.runs, key=lambda run: (self.models.index(run["model"]), run["iteration"])),
+        }
+
+def resolve_eval_llm(eval_llm: str, config_path: str = ".env.toml") -> Any:
+    """The evaluator LLM: a [models] entry, or any model string crewAI understands"""
+    
+    from .config_loader import get_model_config, load_config_snapshot
+    
+    if eval_llm in load_config_snapshot(config_path).get("models", {}):
+        from .llm import build_llm
+        return build_llm(get_model_config(eval_llm, config_path), config_path, eval_llm)
+    
+    from crewai.utilities.llm_utils import create_llm
+    return create_llm(eval_llm)
+
+def _fmt(value: Optional[float], digits: int = 2) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+def print_report(report: Dict[str, Any], file: Any = sys.stdout):
+    """Print one summary block per model"""
+    
+    for model, stats in report["models"].items():
+        latency = stats["latency_s"]
+        crew_score = stats["crew_score"]
+        print(f"# Model: {model} ({stats['ok']}/{stats['iterations']} ok)", file=file)
+        print(
+            f"   Latency: p50 {_fmt(latency.get('p50'))}s, p95 {_fmt(latency.get('p95'))}s, "
+            f"mean {_fmt(latency.get('mean'))}s",
+            file=file,
+        )
+        print(
+            f"   Tokens: {stats['tokens']['total_tokens']} total "
+            f"({stats['tokens']['prompt_tokens']} prompt, {stats['tokens']['completion_tokens']} completion)",
+            file=file,
+        )
+        for name, scores in stats["scores"].items():
+            print(f"   Score {name}: {_fmt(scores.get('mean'), 1)} ± {_fmt(scores.get('stdev'), 1)}", file=file)
+        print(f"   Crew score: {_fmt(crew_score.get('mean'), 1)} ± {_fmt(crew_score.get('stdev'), 1)}", file=file)
+
+def main(argv=None):
+    """Command line interface for the test entry point"""
+    
+    parser = argparse.ArgumentParser(
+        prog="test",
+        description="Run the crew n times per model in parallel and score every task output.",
+    )
+    parser.add_argument("n_iterations", type=int, help="Iterations per model")
+    parser.add_argument("eval_llm", help="Evaluator: a [models] key or a model name crewAI understands")
+    parser.add_argument("-m", "--models", default=None,
+                        help="Comma-separated [models] keys to compare (default: the current model)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Iterations to run at once (default: one per LM Studio endpoint, at least 2)")
+    parser.add_argument("--seed", type=int, default=42, help="Base seed for per-iteration sampling seeds (default: 42)")
+    parser.add_argument("-o", "--output", default=None, help="Write the full JSON report to this file")
+    parser.add_argument("--topic", default="AI LLMs", help="Value for {topic} (default: AI LLMs)")
+    parser.add_argument("--year", default=None, help="Value for {current_year} (default: this year)")
+    args = parser.parse_args(argv)
+    
+    if args.n_iterations < 1:
+        parser.error("n_iterations must be at least 1")
+    
+    from .config_loader import get_current_model, get_endpoints
+    
+    models = [model.strip() for model in args.models.split(",") if model.strip()] if args.models else [get_current_model()]
+    workers = args.workers or max(2, len(get_endpoints()))
+    inputs = {"topic": args.topic, "current_year": args.year or str(datetime.now().year)}
+    
+    def on_result(run: Dict[str, Any]):
+        if run["status"] == "ok":
+            print(f"+ {run['model']} iteration {run['iteration']}: {run['elapsed_s']}s", file=sys.stderr)
+        else:
+            print(f"* ERROR: {run['model']} iteration {run['iteration']}: {run['error']}", file=sys.stderr)
+    
+    # Crew logs go to stderr so stdout carries only the report
+    with redirect_stdout(sys.stderr):
+        evaluation = Evaluation(models, args.n_iterations, resolve_eval_llm(args.eval_llm), inputs, workers, args.seed)
+        report = evaluation.run(on_result)
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1, default=str)
+        print(f"+ Report written to {args.output}")
+    return report
@@ -0,0 +1,103 @@
+"""
+Hedged completions: when a request runs unusually long, race a duplicate against it
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .model_stats import ModelStats, percentile
+
+class Hedger:
+    """Decides when to hedge a completion, and how often hedging is allowed
+    
+    A request is hedged once it has run longer than the `percentile` of the
+    model's recent latencies (never sooner than `min_delay`). Until the model
+    has `min_samples` latencies recorded, `delay` is used instead, or no hedging
+    when it is None. At most `max_rate` of the last `window` requests may be
+    hedged, so a slow server isn't flooded with duplicates.
+    """
+    
+    def __init__(
+        self,
+        model_stats: Optional[ModelStats] = None,
+        percentile: float = 95,
+        min_samples: int = 20,
+        min_delay: float = 1.0,
+        delay: Optional[float] = None,
+        max_rate: float = 0.1,
+        window: int = 100,
+    ):
+        self.model_stats = model_stats
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.delay = delay
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    def delay_for(self, model_key: Optional[str]) -> Optional[float]:
+        """Seconds to wait before hedging a request to this model, or None to never hedge"""
+        
+        latencies = self.model_stats.latencies(model_key) if self.model_stats is not None and model_key else []
+        if len(latencies) >= self.min_samples:
+            return max(self.min_delay, percentile(latencies, self.percentile))
+        if self.delay is not None:
+            return max(self.min_delay, self.delay)
+        return None
+    
+    def start_request(self):
+        with self._lock:
+            self.requests += 1
+            self._recent.append(False)
+    
+    def try_hedge(self) -> bool:
+        """Claim a hedge, if fewer than `max_rate` of the recent requests were hedged"""
+        
+        with self._lock:
+            if sum(self._recent) >= self.max_rate * len(self._recent):
+                return False
+            # Attributed to the latest request; close enough under concurrency
+            self._recent[-1] = True
+            self.hedged += 1
+            return True
+    
+    def record_win(self, hedge_won: bool):
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "hedge_wins": self.hedge_wins,
+            }
+
+_hedgers: Dict[tuple, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+def get_hedger(hedging_config: Dict[str, Any], model_stats: Optional[ModelStats] = None) -> Optional[Hedger]:
+    """Return the shared hedger described by a [hedging] config table, if enabled"""
+    
+    if not hedging_config.get("enabled", False):
+        return None
+    
+    key = (tuple(sorted(hedging_config.items())), id(model_stats))
+    with _hedgers_lock:
+        if key not in _hedgers:
+            _hedgers[key] = Hedger(
+                model_stats=model_stats,
+                percentile=hedging_config.get("percentile", 95),
+                min_samples=hedging_config.get("min_samples", 20),
+                min_delay=hedging_config.get("min_delay_s", 1.0),
+                delay=hedging_config.get("delay_s"),
+                max_rate=hedging_config.get("max_rate", 0.1),
+                window=hedging_config.get("window", 100),
+            )
+        return _hedgers[key]
@@ -0,0 +1,335 @@
+"""
+Knowledge base: chunk the files under knowledge/, embed them and search a persistent HNSW index
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import hnswlib
+import numpy as np
+
+from .config_loader import get_config_section, get_endpoints
+from .transport import get_transport
+
+TOKEN = re.compile(r"\w+")
+
+def chunk_text(text: str, chunk_chars: int = 800, overlap: int = 100) -> List[str]:
+    """Split text into chunks of about `chunk_chars`, packing whole paragraphs where they fit
+    
+    Paragraphs longer than a chunk are cut into windows that overlap by `overlap`
+    characters, broken at whitespace.
+    """
+    
+    paragraphs = [" ".join(p.split()) for p in re.split(r"\n\s*\n", text)]
+    chunks = []
+    current = ""
+    for paragraph in filter(None, paragraphs):
+        if len(paragraph) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            start = 0
+            while start < len(paragraph):
+                end = len(paragraph) if start + chunk_chars >= len(paragraph) else paragraph.rfind(" ", start + 1, start + chunk_chars)
+                if end <= start:
+                    end = min(len(paragraph), start + chunk_chars)
+                chunks.append(paragraph[start:end].strip())
+                if end >= len(paragraph):
+                    break
+                # Step back by the overlap, to the start of a word
+                next_start = paragraph.find(" ", max(start + 1, end - overlap), end)
+                start = next_start + 1 if next_start != -1 else end
+            continue
+        
+        if current and len(current) + 2 + len(paragraph) > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+class HashEmbedder:
+    """Deterministic bag-of-words embedder using feature hashing
+    
+    Needs no model or network, so indexes built with it are reproducible in offline
+    tests. It only matches shared words, not meaning.
+    """
+    
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+    
+    @property
+    def signature(self) -> str:
+        """Identifies the vector space; an index built with another signature is rebuilt"""
+        return f"hash:{self.dimensions}"
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+class LMStudioEmbedder:
+    """Embeddings from an embedding model loaded in LM Studio (/v1/embeddings)"""
+    
+    def __init__(self, model: str, base_url: str, api_key: str, transport, batch_size: int = 32, timeout: Optional[float] = None):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.transport = transport
+        self.batch_size = batch_size
+        self.timeout = timeout
+    
+    @property
+    def signature(self) -> str:
+        return f"lm_studio:{self.model}"
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.transport.client(self.base_url).post(
+                f"{self.base_url}/embeddings",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json={"model": self.model, "input": list(texts[start:start + self.batch_size])},
+                timeout=self.transport.timeout(self.timeout),
+            )
+            response.raise_for_status()
+            data = sorted(response.json()["data"], key=lambda item: item["index"])
+            vectors += [item["embedding"] for item in data]
+        return np.asarray(vectors, dtype=np.float32)
+
+def build_embedder(knowledge_config: Dict[str, Any], config_path: str = ".env.toml"):
+    """Create the embedder named by `embedder` in a [knowledge] config table"""
+    
+    name = knowledge_config.get("embedder", "hash")
+    if name == "hash":
+        return HashEmbedder(knowledge_config.get("dimensions", 256))
+    if name == "lm_studio":
+        if "embedding_model" not in knowledge_config:
+            raise ValueError("[knowledge] embedder = \"lm_studio\" needs embedding_model")
+        endpoint = get_endpoints(config_path)[0]
+        return LMStudioEmbedder(
+            knowledge_config["embedding_model"],
+            endpoint["base_url"],
+            endpoint["api_key"],
+            get_transport(get_config_section("http", config_path)),
+            batch_size=knowledge_config.get("batch_size", 32),
+        )
+    raise ValueError(f"Unknown knowledge embedder '{name}' (expected 'hash' or 'lm_studio')")
+
+class KnowledgeIndex:
+    """HNSW index over chunks of the files in `directory`, persisted in `index_dir`
+    
+    sync() re-chunks the files and embeds only chunks whose content hash is new;
+    chunks that disappeared are deleted from the index. Any object with a
+    `signature` and an `embed(texts) -> array` method can serve as the embedder;
+    changing it rebuilds the index.
+    """
+    
+    def __init__(
+        self,
+        directory: str = "knowledge",
+        index_dir: str = ".cache/knowledge",
+        embedder=None,
+        chunk_chars: int = 800,
+        chunk_overlap: int = 100,
+        patterns: Sequence[str] = ("*.txt", "*.md"),
+    ):
+        self.directory = Path(directory)
+        self.index_dir = Path(index_dir)
+        self.embedder = embedder or HashEmbedder()
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.patterns = tuple(patterns)
+        
+        self._lock = threading.Lock()
+        self._index: Optional[hnswlib.Index] = None
+        self._chunks: Dict[int, Dict[str, str]] = {}
+        self._next_label = 0
+        self._index_file: Optional[str] = None
+        self._load()
+    
+    @property
+    def _manifest_path(self) -> Path:
+        return self.index_dir / "manifest.json"
+    
+    def _tmp_path(self, path: Path) -> Path:
+        return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    
+    def _load(self):
+        """Load the saved index, unless it is missing or was built with another embedder"""
+        
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        index_path = self.index_dir / manifest.get("index_file", "index.bin")
+        if not index_path.exists():
+            return
+        # Replaced by the next save even if it can't be used here
+        self._index_file = index_path.name
+        if manifest.get("embedder") != self.embedder.signature:
+            return
+        
+        index = hnswlib.Index(space="cosine", dim=manifest["dimensions"])
+        try:
+            index.load_index(str(index_path), max_elements=manifest["max_elements"], allow_replace_deleted=False)
+        except RuntimeError:
+            # Replaced by another process's save between reading the manifest and the index
+            return
+        self._index = index
+        self._chunks = {int(label): chunk for label, chunk in manifest["chunks"].items()}
+        self._next_label = manifest["next_label"]
+    
+    def _save(self):
+        """Write the index under a new generation's name, then the manifest pointing at it
+        
+        The manifest is replaced last, so a crash or a concurrent save never leaves
+        it naming an index its chunks don't match.
+        """
+        
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.index_dir / f"index-{uuid.uuid4().hex[:16]}.bin"
+        tmp_index = self._tmp_path(index_path)
+        self._index.save_index(str(tmp_index))
+        os.replace(tmp_index, index_path)
+        
+        manifest = {
+            "index_file": index_path.name,
+            "embedder": self.embedder.signature,
+            "dimensions": self._index.dim,
+            "max_elements": self._index.get_max_elements(),
+            "next_label": self._next_label,
+            "chunks": {str(label): chunk for label, chunk in self._chunks.items()},
+        }
+        tmp_manifest = self._tmp_path(self._manifest_path)
+        tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_manifest, self._manifest_path)
+        
+        if self._index_file is not None and self._index_file != index_path.name:
+            (self.index_dir / self._index_file).unlink(missing_ok=True)
+        self._index_file = index_path.name
+    
+    def _read_chunks(self) -> Dict[tuple, str]:
+        """Current chunks of every knowledge file, keyed on (relative path, content hash)"""
+        
+        files = sorted({path for pattern in self.patterns for path in self.directory.rglob(pattern) if path.is_file()})
+        chunks = {}
+        for path in files:
+            source = path.relative_to(self.directory).as_posix()
+            for text in chunk_text(path.read_text(encoding="utf-8", errors="replace"), self.chunk_chars, self.chunk_overlap):
+                chunks[(source, hashlib.sha256(text.encode("utf-8")).hexdigest())] = text
+        return chunks
+    
+    def _add(self, vectors: np.ndarray, labels: List[int]):
+        if self._index is None:
+            self._index = hnswlib.Index(space="cosine", dim=vectors.shape[1])
+            self._index.init_index(max_elements=max(64, len(labels)), ef_construction=200, M=16)
+        needed = self._index.element_count + len(labels)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, self._index.get_max_elements() * 2))
+        self._index.add_items(vectors, labels)
+    
+    def _compact(self):
+        """Rebuild the index without deleted entries once they outnumber live ones"""
+        
+        labels = sorted(self._chunks)
+        vectors = np.asarray(self._index.get_items(labels), dtype=np.float32) if labels else None
+        self._index = None
+        if labels:
+            self._add(vectors, labels)
+    
+    def sync(self) -> Dict[str, int]:
+        """Bring the index up to date with the knowledge files, embedding only new chunks"""
+        
+        current = self._read_chunks() if self.directory.is_dir() else {}
+        with self._lock:
+            known = {(chunk["source"], chunk["hash"]): label for label, chunk in self._chunks.items()}
+            removed = [label for key, label in known.items() if key not in current]
+            new = [(key, text) for key, text in current.items() if key not in known]
+            
+            for label in removed:
+                self._index.mark_deleted(label)
+                del self._chunks[label]
+            
+            if new:
+                labels = list(range(self._next_label, self._next_label + len(new)))
+                self._add(self.embedder.embed([text for _, text in new]), labels)
+                for label, ((source, digest), text) in zip(labels, new):
+                    self._chunks[label] = {"source": source, "hash": digest, "text": text}
+                self._next_label += len(new)
+            
+            if self._index is not None and self._index.element_count - len(self._chunks) > len(self._chunks):
+                self._compact()
+            if (removed or new) and self._index is not None:
+                self._save()
+        
+        return {"chunks": len(current), "embedded": len(new), "removed": len(removed), "unchanged": len(current) - len(new)}
+    
+    def search(self, query: str, k: int = 4) -> List[Dict[str, Any]]:
+        """Top-k chunks for a query, best first, with their source file and cosine similarity"""
+        
+        vector = self.embedder.embed([query])
+        if not np.any(vector):
+            return []
+        with self._lock:
+            k = min(k, len(self._chunks))
+            if k == 0:
+                return []
+            self._index.set_ef(max(50, k))
+            labels, distances = self._index.knn_query(vector, k=k)
+            return [
+                {
+                    "source": self._chunks[int(label)]["source"],
+                    "text": self._chunks[int(label)]["text"],
+                    "score": round(1.0 - float(distance), 4),
+                }
+                for label, distance in zip(labels[0], distances[0])
+            ]
+    
+    @property
+    def version(self) -> str:
+        """Changes whenever chunks are added or removed"""
+        return f"{self._next_label}:{len(self._chunks)}"
+    
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+_indexes: Dict[str, KnowledgeIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_knowledge_index(config_path: str = ".env.toml") -> Optional[KnowledgeIndex]:
+    """Return the shared index described by the [knowledge] table, if enabled
+    
+    The index is synced with the knowledge files when it is first created in a process.
+    """
+    
+    knowledge_config = get_config_section("knowledge", config_path)
+    if not knowledge_config.get("enabled", False):
+        return None
+    
+    index_dir = knowledge_config.get("index_dir", ".cache/knowledge")
+    with _indexes_lock:
+        if index_dir not in _indexes:
+            index = KnowledgeIndex(
+                directory=knowledge_config.get("directory", "knowledge"),
+                index_dir=index_dir,
+                embedder=build_embedder(knowledge_config, config_path),
+                chunk_chars=knowledge_config.get("chunk_chars", 800),
+                chunk_overlap=knowledge_config.get("chunk_overlap", 100),
+                patterns=knowledge_config.get("patterns", ("*.txt", "*.md")),
+            )
+            result = index.sync()
+            print(f"+ Knowledge: {result['chunks']} chunks ({result['embedded']} embedded, {result['removed']} removed)")
+            _indexes[index_dir] = index
+        return _indexes[index_dir]
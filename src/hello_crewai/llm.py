@@ -0,0 +1,419 @@
+"""
+LLM used by the crew, with LM Studio specific behaviour layered on top of crewAI's LLM
+"""
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from crewai import LLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallType, LLMStreamChunkEvent
+from crewai.utilities.exceptions.context_window_exceeding_exception import LLMContextLengthExceededException
+from litellm.exceptions import BadRequestError, UnprocessableEntityError
+from openai import APITimeoutError
+
+from . import telemetry
+from .config_loader import get_config_section, get_model_config
+from .endpoints import EndpointPool, get_endpoint_pool
+from .hedging import Hedger, get_hedger
+from .llm_cache import ResponseCache, get_response_cache, make_cache_key
+from .model_stats import ModelStats, get_model_stats
+from .single_flight import SingleFlight, get_single_flight
+from .streaming import get_stream_monitor
+from .timeouts import AdaptiveTimeouts, UsageCapture, get_adaptive_timeouts
+from .transport import Transport, get_transport
+from .warmup import claim_first_call, release_first_call
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the request itself; retrying on another endpoint would fail the same way
+NO_FAILOVER_ERRORS = (LLMContextLengthExceededException, BadRequestError, UnprocessableEntityError)
+
+# Errors raised when a completion runs past its deadline (litellm's Timeout is an APITimeoutError)
+TIMEOUT_ERRORS = (APITimeoutError, httpx.TimeoutException)
+
+# The cancel flag of the hedged attempt running on this thread, if any
+_attempt = threading.local()
+
+def _cancelled() -> bool:
+    event = getattr(_attempt, "cancelled", None)
+    return event is not None and event.is_set()
+
+class LMStudioLLM(LLM):
+    """crewAI LLM that can serve repeated completions from a response cache
+    
+    Calls are also annotated for telemetry: the point where a request leaves the
+    process is marked, and token usage is captured for sampled tasks. Latencies of
+    completions served by LM Studio are recorded in `model_stats` under `model_key`.
+    With an `endpoint_pool`, each request goes to the least loaded endpoint serving
+    the model and fails over to the next one if that endpoint errors. With a
+    `transport`, requests reuse its pooled keep-alive connections. With a `hedger`,
+    a non-streaming completion that runs past the hedge delay is duplicated on
+    another endpoint (or `hedge_model`); both go over connections of their own,
+    the first success wins, and the loser's connection is closed. With
+    `adaptive_timeouts`, each request's deadline comes from the model's latency
+    histogram, capped at `timeout`.
+    With a `single_flight`, an identical non-streaming completion already in
+    flight is shared instead of being sent again.
+    """
+    
+    def __init__(
+        self,
+        *args,
+        response_cache: Optional[ResponseCache] = None,
+        model_key: Optional[str] = None,
+        model_stats: Optional[ModelStats] = None,
+        endpoint_pool: Optional[EndpointPool] = None,
+        transport: Optional[Transport] = None,
+        hedger: Optional[Hedger] = None,
+        hedge_model: Optional[str] = None,
+        adaptive_timeouts: Optional[AdaptiveTimeouts] = None,
+        single_flight: Optional[SingleFlight] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.response_cache = response_cache
+        self.model_key = model_key
+        self.model_stats = model_stats
+        self.endpoint_pool = endpoint_pool
+        self.transport = transport
+        self.hedger = hedger
+        self.hedge_model = hedge_model
+        self.adaptive_timeouts = adaptive_timeouts
+        self.single_flight = single_flight
+    
+    def preload(self):
+        """Build the pooled SDK clients ahead of the first completion
+    
+        The OpenAI SDK imports most of itself on first use, which otherwise lands
+        in the first task's latency.
+        """
+    
+        if self.transport is None:
+            return
+        endpoints = self.endpoint_pool.endpoints if self.endpoint_pool is not None else [self]
+        for endpoint in endpoints:
+            self.transport.openai_client(endpoint.base_url, endpoint.api_key).chat.completions
+    
+    def _route(self, params: Dict[str, Any], base_url: str, api_key: str, attempt: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Point a completion at an endpoint, over the shared transport if there is one
+    
+        A hedged `attempt` gets a connection of its own, so it can be cancelled.
+        """
+    
+        routed = dict(params, api_base=base_url, base_url=base_url, api_key=api_key)
+        if self.transport is not None:
+            if attempt is not None:
+                routed["client"], http_client = self.transport.dedicated_openai_client(base_url, api_key)
+                attempt["clients"].append((base_url, api_key, routed["client"], http_client))
+                # The SDK would retry an aborted request after backing off; a racing attempt fails fast
+                routed["max_retries"] = 0
+            else:
+                routed["client"] = self.transport.openai_client(base_url, api_key)
+            routed["timeout"] = self.transport.timeout(params.get("timeout"))
+        return routed
+    
+    def _dispatch(self, handler, params, callbacks, available_functions, exclude=(), attempt=None, can_fail_over=None):
+        """Send a completion to LM Studio, failing over between pooled endpoints
+        
+        `can_fail_over`, if given, is asked after an error whether the request
+        may still be retried on another endpoint.
+        """
+    
+        if self.endpoint_pool is None:
+            routed = self._route(params, self.base_url, self.api_key, attempt)
+            return self._timed(handler, routed, callbacks, available_functions)
+    
+        # The model id as the server sees it, without litellm's provider prefix
+        model_name = params["model"].split("/", 1)[-1]
+        tried = list(exclude)
+        last_error = None
+        while True:
+            endpoint = self.endpoint_pool.acquire(model_name, exclude=tried)
+            if endpoint is None:
+                if last_error is not None:
+                    raise last_error
+                raise RuntimeError(f"No LM Studio endpoint serves model '{model_name}'")
+            if attempt is not None:
+                attempt["endpoint"] = endpoint
+    
+            routed = self._route(params, endpoint.base_url, endpoint.api_key, attempt)
+            try:
+                response = self._timed(handler, routed, callbacks, available_functions)
+            except NO_FAILOVER_ERRORS:
+                self.endpoint_pool.release(endpoint, ok=True)
+                raise
+            except Exception as e:
+                if _cancelled():
+                    # Abandoned by the hedger; the endpoint did nothing wrong
+                    self.endpoint_pool.release(endpoint, ok=True)
+                    raise
+                self.endpoint_pool.release(endpoint, ok=False)
+                if can_fail_over is not None and not can_fail_over():
+                    raise
+                logger.warning(f"LM Studio endpoint {endpoint.base_url} failed ({e}), trying the next one")
+                tried.append(endpoint)
+                last_error = e
+                continue
+    
+            self.endpoint_pool.release(endpoint, ok=True)
+            return response
+    
+    def _timed(self, handler, params, callbacks, available_functions):
+        """Run a completion handler, recording its latency for the model"""
+    
+        base_url, model_name = params.get("base_url") or "", params["model"].split("/", 1)[-1]
+        cold = claim_first_call(base_url, model_name)
+        # A hedge sent to the fallback model is not a sample of this model
+        own_model = bool(self.model_key) and params["model"] == self.model
+        record = self.model_stats is not None and own_model
+    
+        usage = deadline = None
+        max_tokens = params.get("max_tokens") or params.get("max_completion_tokens")
+        if self.adaptive_timeouts is not None and own_model:
+            usage = UsageCapture()
+            callbacks = list(callbacks or []) + [usage]
+            # A cold start may include loading the model, so it keeps the static timeout
+            if not cold:
+                deadline = self.adaptive_timeouts.deadline(self.model_key, self.timeout, max_tokens)
+                params["timeout"] = self.transport.timeout(deadline) if self.transport is not None else deadline
+                # The SDK would retry a timed out request on the same endpoint; fail over instead
+                params["max_retries"] = 0
+                if params.get("client") is not None:
+                    params["client"] = params["client"].with_options(max_retries=0)
+    
+        telemetry.mark_dispatch()
+        start = time.perf_counter()
+        try:
+            response = handler(params, telemetry.with_usage_callback(callbacks), available_functions)
+        except Exception as e:
+            if cold:
+                release_first_call(base_url, model_name)
+            if record and not _cancelled():
+                self.model_stats.record(self.model_key, time.perf_counter() - start, ok=False)
+            if deadline is not None and isinstance(e, TIMEOUT_ERRORS) and not _cancelled():
+                self.adaptive_timeouts.record_timeout(self.model_key, deadline, max_tokens)
+            raise
+        latency = time.perf_counter() - start
+        if record:
+            self.model_stats.record(self.model_key, latency, cold=cold)
+        if usage is not None and not cold and isinstance(response, str):
+            # Roughly four characters per token when the server reports no usage
+            tokens = usage.completion_tokens or len(response) // 4
+            self.adaptive_timeouts.record(self.model_key, latency, tokens)
+        return response
+    
+    def _hedge_target(self, params: Dict[str, Any], primary: Dict[str, Any]):
+        """Params and excluded endpoints for a duplicate of a slow request, or None"""
+    
+        if self.endpoint_pool is not None and primary.get("endpoint") is not None:
+            model_name = params["model"].split("/", 1)[-1]
+            others = [
+                endpoint for endpoint in self.endpoint_pool.endpoints
+                if endpoint is not primary["endpoint"] and endpoint.serves(model_name) and not endpoint.is_ejected(time.monotonic())
+            ]
+            if others:
+                return params, [primary["endpoint"]]
+        if self.hedge_model and self.hedge_model != params["model"]:
+            return dict(params, model=self.hedge_model), []
+        return None
+    
+    def _hedged(self, handler, params, callbacks, available_functions):
+        """Send a completion, racing a duplicate against it once it runs past the hedge delay
+    
+        The primary request runs on the calling thread; a timer starts the hedge on
+        a thread of its own, so a busy process never delays (or falsely hedges) a
+        primary. Both go over dedicated connections, and the loser's is closed.
+        """
+    
+        delay = self.hedger.delay_for(self.model_key)
+        if delay is None:
+            return self._dispatch(handler, params, callbacks, available_functions)
+        self.hedger.start_request()
+    
+        lock = threading.Lock()
+        race: Dict[str, Any] = {"winner": None, "hedge": None, "closed": False}
+    
+        def new_attempt():
+            return {"clients": [], "endpoint": None, "cancelled": threading.Event(), "done": threading.Event()}
+    
+        def run(attempt, attempt_params, exclude):
+            previous = getattr(_attempt, "cancelled", None)
+            _attempt.cancelled = attempt["cancelled"]
+            try:
+                return self._dispatch(handler, attempt_params, callbacks, available_functions, exclude, attempt)
+            finally:
+                _attempt.cancelled = previous
+                # Connections the attempt wasn't cancelled on stay warm for the next one
+                for base_url, api_key, openai_client, http_client in attempt["clients"]:
+                    self.transport.release_dedicated(base_url, api_key, openai_client, http_client)
+    
+        def cancel(attempt):
+            attempt["cancelled"].set()
+            for _, _, _, http_client in attempt["clients"]:
+                http_client.abort()
+    
+        def finish(name, attempt, loser) -> bool:
+            """Declare `name` the winner unless the other attempt already is, cancelling the loser"""
+            with lock:
+                if race["winner"] is None:
+                    race["winner"] = name
+            if race["winner"] == name and loser is not None:
+                cancel(loser)
+            return race["winner"] == name
+    
+        primary = new_attempt()
+    
+        def start_hedge():
+            hedge = new_attempt()
+            with lock:
+                # Once the primary has finished no hedge may start
+                if race["closed"]:
+                    return
+                target = self._hedge_target(params, primary)
+                if target is None or not self.hedger.try_hedge():
+                    return
+                race["hedge"] = hedge
+            logger.info(f"Hedging {params['model']} after {delay:.1f}s")
+            try:
+                hedge["result"] = run(hedge, *target)
+                finish("hedge", hedge, primary)
+            except BaseException as e:
+                hedge["error"] = e
+            finally:
+                hedge["done"].set()
+    
+        timer = threading.Timer(delay, contextvars.copy_context().run, args=(start_hedge,))
+        timer.daemon = True
+        timer.start()
+        try:
+            result = run(primary, params, [])
+            primary_error = None
+        except Exception as e:
+            result, primary_error = None, e
+        finally:
+            timer.cancel()
+    
+        with lock:
+            race["closed"] = True
+            hedge = race["hedge"]
+        if primary_error is None and finish("primary", primary, hedge):
+            if hedge is not None:
+                self.hedger.record_win(False)
+            return result
+        if hedge is None:
+            raise primary_error
+    
+        # The primary failed or was cancelled for a hedge that has (or will have) the answer
+        hedge["done"].wait()
+        if "error" in hedge:
+            raise primary_error or hedge["error"]
+        self.hedger.record_win(True)
+        return hedge["result"]
+    
+    def _cache_key(self, params: Dict[str, Any], available_functions: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Return the cache key for a completion, or None if it must not be cached"""
+    
+        # Tool calls have side effects, so only plain text completions are cached
+        if self.response_cache is None or params.get("tools") or available_functions:
+            return None
+        return make_cache_key(params["model"], params["messages"], params)
+    
+    def _flight_key(self, params: Dict[str, Any], available_functions: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Return the key identical in-flight completions share, or None if this one must run alone"""
+    
+        if self.single_flight is None or params.get("tools") or available_functions:
+            return None
+        return make_cache_key(params["model"], params["messages"], params)
+    
+    def _handle_non_streaming_response(
+        self,
+        params: Dict[str, Any],
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        key = self._cache_key(params, available_functions)
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._handle_emit_call_events(cached, LLMCallType.LLM_CALL)
+                return cached
+    
+        # Streamed chunks can't be un-emitted, so only non-streaming completions are hedged
+        dispatch = self._hedged if self.hedger is not None else self._dispatch
+        handler = super()._handle_non_streaming_response
+        flight_key = self._flight_key(params, available_functions)
+        if flight_key is None:
+            response = dispatch(handler, params, callbacks, available_functions)
+        else:
+            leader = []
+    
+            def call():
+                leader.append(True)
+                return dispatch(handler, params, callbacks, available_functions)
+    
+            response = self.single_flight.do(flight_key, call)
+            if not leader:
+                # The leader's call emitted its own events; report the shared answer to this caller too
+                self._handle_emit_call_events(response, LLMCallType.LLM_CALL)
+    
+        if key is not None and isinstance(response, str) and response.strip():
+            self.response_cache.put(key, params["model"], response)
+        return response
+    
+    def _handle_streaming_response(
+        self,
+        params: Dict[str, Any],
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        key = self._cache_key(params, available_functions)
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                # Replay the cached text as a single chunk so stream listeners still see it
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=cached))
+                self._handle_emit_call_events(cached, LLMCallType.LLM_CALL)
+                return cached
+    
+        # Chunks already streamed can't be taken back, so a stream that broke after
+        # its first chunk is not restarted on another endpoint
+        monitor = get_stream_monitor()
+        chunks = monitor.chunks_seen()
+        response = self._dispatch(
+            super()._handle_streaming_response, params, callbacks, available_functions,
+            can_fail_over=lambda: monitor.chunks_seen() == chunks,
+        )
+    
+        if key is not None and isinstance(response, str) and response.strip():
+            self.response_cache.put(key, params["model"], response)
+        return response
+
+def build_llm(model_config: Dict[str, Any], config_path: str = ".env.toml", model_key: Optional[str] = None) -> LMStudioLLM:
+    """Create the crew LLM for a model entry returned by get_model_config()"""
+    
+    model_stats = get_model_stats(get_config_section("model_stats", config_path))
+    hedging_config = get_config_section("hedging", config_path)
+    hedge_model = None
+    if hedging_config.get("fallback_model"):
+        hedge_model = f"openai/{get_model_config(hedging_config['fallback_model'], config_path)['name']}"
+    
+    return LMStudioLLM(
+        model=f"openai/{model_config['name']}",
+        base_url=model_config['base_url'],
+        api_key=model_config['api_key'],
+        timeout=model_config['timeout'],
+        stream=get_config_section("streaming", config_path).get("enabled", False),
+        response_cache=get_response_cache(get_config_section("llm_cache", config_path)),
+        model_key=model_key,
+        model_stats=model_stats,
+        endpoint_pool=get_endpoint_pool(config_path),
+        transport=get_transport(get_config_section("http", config_path)),
+        hedger=get_hedger(hedging_config, model_stats),
+        hedge_model=hedge_model,
+        adaptive_timeouts=get_adaptive_timeouts(get_config_section("adaptive_timeouts", config_path)),
+        single_flight=get_single_flight("llm", get_config_section("coalescing", config_path)),
+    )
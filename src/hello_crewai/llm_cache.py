@@ -0,0 +1,227 @@
+"""
+Persistent, content-addressed cache for LLM completions
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Completion parameters that change the output and therefore belong in the key
+SAMPLING_PARAMS = (
+    "temperature",
+    "top_p",
+    "n",
+    "stop",
+    "max_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "logit_bias",
+    "seed",
+    "reasoning_effort",
+)
+
+# Set to "1" to skip cache reads for a run (fresh results are still stored)
+BYPASS_ENV_VAR = "HELLO_CREWAI_LLM_CACHE_BYPASS"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+def normalize_messages(messages: Any) -> List[Dict[str, str]]:
+    """Normalize a message list so equivalent prompts produce the same key"""
+    
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    
+    normalized = []
+    for message in messages:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True)
+        content = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").split("\n")).strip()
+        normalized.append({"role": message.get("role", "user"), "content": content})
+    return normalized
+
+def make_cache_key(model: str, messages: Any, params: Dict[str, Any]) -> str:
+    """Build a content hash from the model, normalized messages and sampling parameters"""
+    
+    sampling = {}
+    for name in SAMPLING_PARAMS:
+        value = params.get(name)
+        if value is None or value == []:
+            continue
+        if name == "stop":
+            value = sorted(value)
+        sampling[name] = value
+    
+    payload = json.dumps(
+        {"model": model, "messages": normalize_messages(messages), "params": sampling},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """SQLite-backed LLM response cache with LRU eviction by count, size and age"""
+    
+    def __init__(
+        self,
+        path: str = ".cache/llm_responses.sqlite",
+        max_entries: int = 10000,
+        max_bytes: int = 100 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+        bypass: bool = False,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass or os.environ.get(BYPASS_ENV_VAR, "") == "1"
+    
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+    
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss"""
+    
+        if self.bypass:
+            self.misses += 1
+            return None
+    
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+    
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                row = None
+    
+            if row is None:
+                self.misses += 1
+                return None
+    
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, model: str, response: str):
+        """Store a response and evict old entries if the cache is over its limits"""
+    
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self.stores += 1
+            self._evict(now)
+    
+    def clear(self):
+        """Remove every cached response"""
+    
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size"""
+    
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+    
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+    
+    def close(self):
+        """Close the underlying database connection"""
+    
+        with self._lock:
+            self._conn.close()
+    
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+    
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until within limits"""
+    
+        if self.max_age_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.max_age_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+    
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+    
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            entries -= 1
+            total_bytes -= size
+    
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+def get_response_cache(cache_config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """Return the shared cache described by an [llm_cache] config table, if enabled"""
+    
+    if not cache_config.get("enabled", False):
+        return None
+    
+    path = cache_config.get("path", ".cache/llm_responses.sqlite")
+    with _caches_lock:
+        if path not in _caches:
+            max_age_days = cache_config.get("max_age_days", 30)
+            _caches[path] = ResponseCache(
+                path=path,
+                max_entries=cache_config.get("max_entries", 10000),
+                max_bytes=cache_config.get("max_megabytes", 100) * 1024 * 1024,
+                max_age_seconds=max_age_days * 24 * 3600 if max_age_days else None,
+                bypass=cache_config.get("bypass", False),
+            )
+        return _caches[path]
@@ -5,7 +5,8 @@ import os
 from datetime import datetime
 from dotenv import load_dotenv
 
-from hello_crewai.crew import HelloCrewai
+# crewAI (and litellm) take seconds to import, so the crew is imported inside
+# the commands that run it; --help and config commands stay fast.
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,10 +18,64 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+USAGE = """hello_crewai - CrewAI + LM Studio
+
+Commands:
+  hello_crewai / run_crew          Run the crew once
+  run_batch <topics> [options]     Run the crew for each topic, writing JSONL (see run_batch --help)
+  serve [options]                  Queue crew runs over HTTP on warm crews (see serve --help)
+  train <n_iterations> <filename>  Train the crew, iterations in parallel (see train --help)
+  replay <task_id>                 Replay the crew from a task
+  test <n_iterations> <eval_llm>   Test the crew in parallel and score the results (see test --help)
+  show_config                      Print the active model and settings from .env.toml
+"""
+
+def _wants_help() -> bool:
+    """True if the command was invoked with -h/--help"""
+    return any(arg in ("-h", "--help", "help") for arg in sys.argv[1:2])
+
+
+def show_config():
+    """
+    Print the active model and settings from .env.toml.
+    """
+    if _wants_help():
+        print(USAGE)
+        return
+    
+    from hello_crewai.config_loader import get_current_model, get_endpoints, get_model_config, load_config_snapshot
+    
+    config = load_config_snapshot()
+    current = get_current_model()
+    model_config = get_model_config(current)
+    
+    print(f"# Model: {current} ({model_config['name']})")
+    endpoints = get_endpoints()
+    if len(endpoints) > 1:
+        print(f"   Endpoints: {', '.join(endpoint['base_url'] for endpoint in endpoints)}")
+    else:
+        print(f"   Base URL: {model_config['base_url']}")
+    print(f"   Timeout: {model_config.get('timeout', 'N/A')}s")
+    print()
+    for section, values in config.items():
+        if section in ("settings", "models", "lm_studio"):
+            continue
+        enabled = values.get("enabled") if hasattr(values, "get") else None
+        state = "" if enabled is None else (" (enabled)" if enabled else " (disabled)")
+        print(f"[{section}]{state}")
+    print(f"Models configured: {', '.join(config.get('models', {}).keys())}")
+
+
 def run():
     """
     Run the crew.
     """
+    if _wants_help():
+        print(USAGE)
+        return
+    
+    from hello_crewai.crew import HelloCrewai
+    
     inputs = {
         'topic': 'AI LLMs',
         'current_year': str(datetime.now().year)
@@ -32,17 +87,38 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
-def train():
+def run_batch():
     """
-    Train the crew for a given number of iterations.
+    Run the crew for every topic in a file (or stdin) and stream JSONL results.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        'current_year': str(datetime.now().year)
-    }
+    from hello_crewai.batch import main as batch_main
+    
     try:
-        HelloCrewai().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        batch_main(sys.argv[1:])
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
 
+
+def serve():
+    """
+    Serve crew runs over HTTP from a long-running process with warm, pooled crews.
+    """
+    from hello_crewai.service import main as service_main
+    
+    try:
+        service_main(sys.argv[1:])
+    except Exception as e:
+        raise Exception(f"An error occurred while serving the crew: {e}")
+
+
+def train():
+    """
+    Train the crew, running iterations in parallel and resuming an interrupted run.
+    """
+    from hello_crewai.training import main as training_main
+    
+    try:
+        training_main(sys.argv[1:])
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
@@ -50,6 +126,12 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    if _wants_help():
+        print(USAGE)
+        return
+    
+    from hello_crewai.crew import HelloCrewai
+    
     try:
         HelloCrewai().crew().replay(task_id=sys.argv[1])
 
@@ -58,15 +140,11 @@ def replay():
 
 def test():
     """
-    Test the crew execution and returns the results.
+    Test the crew in parallel iterations (optionally across several models) and score the results.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        "current_year": str(datetime.now().year)
-    }
+    from hello_crewai.evaluation import main as evaluation_main
     
     try:
-        HelloCrewai().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
-
+        evaluation_main(sys.argv[1:])
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
@@ -0,0 +1,122 @@
+"""
+Recorded per-model latency statistics, shared across runs through a JSON file
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers"""
+    
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class ModelStats:
+    """Rolling window of recent completion latencies per model key
+    
+    Samples are kept in memory and written back to `path` every `flush_every`
+    records and at interpreter exit, so recording stays cheap on the hot path.
+    """
+    
+    def __init__(self, path: str = ".cache/model_stats.json", window: int = 200, flush_every: int = 20):
+        self.path = Path(path)
+        self.window = window
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self._models = data.get("models", {})
+    
+    def _entry(self, model_key: str) -> Dict[str, Any]:
+        return self._models.setdefault(model_key, {"latencies": [], "calls": 0, "failures": 0})
+    
+    def record(self, model_key: str, latency_s: float, ok: bool = True, cold: bool = False):
+        """Record one completion (failed calls count towards the failure rate only)
+        
+        Cold starts (the first call to a model, which may include loading it) are
+        kept apart so they don't skew the steady-state percentiles.
+        """
+        
+        with self._lock:
+            entry = self._entry(model_key)
+            entry["calls"] += 1
+            if ok and cold:
+                cold_starts = entry.setdefault("cold_starts", [])
+                cold_starts.append(round(latency_s, 4))
+                del cold_starts[:-self.window]
+            elif ok:
+                entry["latencies"].append(round(latency_s, 4))
+                del entry["latencies"][:-self.window]
+            else:
+                entry["failures"] += 1
+            entry["updated_at"] = time.time()
+            self._dirty += 1
+            should_flush = self._dirty >= self.flush_every
+        if should_flush:
+            self.save()
+    
+    def latencies(self, model_key: str) -> List[float]:
+        with self._lock:
+            return list(self._models.get(model_key, {}).get("latencies", []))
+    
+    def summary(self, model_key: str) -> Dict[str, Any]:
+        """Sample count, steady-state p50/p95 latency, cold start latency and failure rate"""
+        
+        with self._lock:
+            entry = dict(self._models.get(model_key, {}))
+        latencies = entry.get("latencies", [])
+        cold_starts = entry.get("cold_starts", [])
+        calls = entry.get("calls", 0)
+        return {
+            "samples": len(latencies),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "cold_samples": len(cold_starts),
+            "cold_start_p50": percentile(cold_starts, 50),
+            "failure_rate": entry.get("failures", 0) / calls if calls else 0.0,
+        }
+    
+    def save(self):
+        """Write the samples to disk atomically"""
+        
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"models": self._models}, indent=1)
+            self._dirty = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+_stats: Dict[str, ModelStats] = {}
+_stats_lock = threading.Lock()
+
+def get_model_stats(stats_config: Dict[str, Any]) -> Optional[ModelStats]:
+    """Return the shared stats store described by a [model_stats] table, if enabled"""
+    
+    if not stats_config.get("enabled", False):
+        return None
+    
+    path = stats_config.get("path", ".cache/model_stats.json")
+    with _stats_lock:
+        if path not in _stats:
+            _stats[path] = ModelStats(path=path, window=stats_config.get("window", 200))
+            atexit.register(_stats[path].save)
+        return _stats[path]
@@ -0,0 +1,91 @@
+"""
+Per-agent / per-task model routing across the configured [models] table
+"""
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+
+from .model_stats import ModelStats
+
+class ModelRouter:
+    """Decide which [models] entry each agent and task runs on
+    
+    Resolution order for a task: [routing.tasks], then [routing.agents] for the
+    task's agent, then the automatic router (if enabled), then the default model.
+    """
+    
+    def __init__(
+        self,
+        routing_config: Mapping[str, Any],
+        models: Mapping[str, Mapping[str, Any]],
+        default_model: str,
+        stats: Optional[ModelStats] = None,
+    ):
+        self.models = models
+        self.default_model = default_model
+        self.stats = stats
+        self.agent_routes = dict(routing_config.get("agents", {}))
+        self.task_routes = dict(routing_config.get("tasks", {}))
+        self.auto = dict(routing_config.get("auto", {}))
+        
+        for name, model_key in list(self.agent_routes.items()) + list(self.task_routes.items()):
+            if model_key not in models:
+                raise ValueError(
+                    f"Routing for '{name}' uses unknown model '{model_key}'. Available models: {list(models.keys())}"
+                )
+    
+    def configured_models(self) -> Set[str]:
+        """Models the crew is known to use: the default plus every explicit route"""
+        
+        return {self.default_model, *self.agent_routes.values(), *self.task_routes.values()}
+    
+    def model_for_agent(self, agent_name: str) -> str:
+        """Model an agent uses unless one of its tasks is routed elsewhere"""
+        
+        return self.agent_routes.get(agent_name, self.default_model)
+    
+    def model_for_task(self, task_name: str, agent_name: Optional[str]) -> Tuple[str, str]:
+        """Return (model key, reason) for a task"""
+        
+        if task_name in self.task_routes:
+            return self.task_routes[task_name], "routing.tasks"
+        if agent_name in self.agent_routes:
+            return self.agent_routes[agent_name], "routing.agents"
+        
+        selected = self.select_automatically(task_name)
+        if selected is not None:
+            return selected, "auto"
+        return self.default_model, "default"
+    
+    def select_automatically(self, task_name: str) -> Optional[str]:
+        """Cheapest model whose recorded p95 latency and quality meet the target
+        
+        Targets come from [routing.auto] and may be overridden per task in
+        [routing.auto.tasks.<task_name>]. Models without recorded samples are not
+        considered, so the default model is used until stats exist.
+        """
+        
+        if not self.auto.get("enabled", False) or self.stats is None:
+            return None
+        
+        target = dict(self.auto)
+        target.update(self.auto.get("tasks", {}).get(task_name, {}))
+        max_latency = target.get("max_latency_s")
+        min_quality = target.get("min_quality", 0)
+        max_failure_rate = target.get("max_failure_rate", 0.5)
+        min_samples = target.get("min_samples", 3)
+        
+        candidates = []
+        for model_key, model_config in self.models.items():
+            if model_config.get("quality", 0) < min_quality:
+                continue
+            summary = self.stats.summary(model_key)
+            if summary["samples"] < min_samples or summary["failure_rate"] > max_failure_rate:
+                continue
+            if max_latency is not None and summary["p95"] > max_latency:
+                continue
+            # Explicit cost wins; otherwise the faster model is the cheaper one
+            cost = model_config.get("cost", summary["p50"])
+            candidates.append((cost, summary["p50"], model_key))
+        
+        if not candidates:
+            return None
+        return min(candidates)[2]
@@ -0,0 +1,207 @@
+"""
+DAG scheduling for crews: run tasks as soon as the tasks they depend on have finished
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.utilities.constants import NOT_SPECIFIED
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs, aggregate_raw_outputs_from_tasks
+from pydantic import field_validator
+
+def build_dag(tasks: List[Task]) -> List[Set[int]]:
+    """Dependencies of each task, as indices into `tasks`
+    
+    A task with an explicit `context` depends on exactly those tasks (none for
+    `context: []`). Without one it depends on every earlier task, which is what
+    crewAI's sequential process passes it as context.
+    """
+    
+    positions = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = []
+    for i, task in enumerate(tasks):
+        if task.context is NOT_SPECIFIED or task.context is None:
+            dependencies.append(set(range(i)))
+            continue
+        deps = set()
+        for upstream in task.context:
+            if id(upstream) not in positions:
+                raise ValueError(f"Task '{task.name}' depends on a task that is not in the crew")
+            deps.add(positions[id(upstream)])
+        dependencies.append(deps)
+    
+    # Reject cycles (possible when a task names a later one as context)
+    state: Dict[int, int] = {}
+    
+    def visit(i):
+        if state.get(i) == 1:
+            raise ValueError(f"Task dependencies form a cycle through '{tasks[i].name}'")
+        if state.get(i) != 2:
+            state[i] = 1
+            for dep in dependencies[i]:
+                visit(dep)
+            state[i] = 2
+    
+    for i in range(len(tasks)):
+        visit(i)
+    return dependencies
+
+def critical_path(dependencies: List[Set[int]], durations: List[float]) -> Tuple[float, List[int]]:
+    """Length and task indices of the longest chain of dependent tasks"""
+    
+    finish: Dict[int, float] = {}
+    previous: Dict[int, Optional[int]] = {}
+    
+    def earliest_finish(i):
+        if i not in finish:
+            before = max(dependencies[i], key=earliest_finish, default=None)
+            previous[i] = before
+            finish[i] = durations[i] + (finish[before] if before is not None else 0.0)
+        return finish[i]
+    
+    if not durations:
+        return 0.0, []
+    end = max(range(len(durations)), key=earliest_finish)
+    path = []
+    node: Optional[int] = end
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return finish[end], path[::-1]
+
+class DagCrew(Crew):
+    """Crew whose sequential process runs independent tasks concurrently
+    
+    Up to `max_parallel` tasks run at once. With `endpoint_capacity`, at most that
+    many tasks run against each LM Studio endpoint (per endpoint serving the model
+    when requests are load balanced). The last run's timings, including the
+    critical path, are kept in `schedule`.
+    """
+    
+    max_parallel: int = 4
+    endpoint_capacity: Optional[int] = None
+    schedule: Dict[str, Any] = {}
+    
+    @field_validator("max_parallel", "endpoint_capacity")
+    @classmethod
+    def _at_least_one(cls, value: Optional[int], info) -> Optional[int]:
+        if value is not None and value < 1:
+            raise ValueError(f"{info.field_name} must be at least 1, got {value}")
+        return value
+    
+    def copy(self) -> "DagCrew":
+        copied = super().copy()
+        fields = {name: getattr(copied, name) for name in copied.model_fields_set}
+        return type(self)(**fields, max_parallel=self.max_parallel, endpoint_capacity=self.endpoint_capacity)
+    
+    def _run_sequential_process(self) -> CrewOutput:
+        if any(isinstance(task, ConditionalTask) or task.async_execution for task in self.tasks):
+            # Conditional and async tasks rely on crewAI's own ordering
+            return super()._run_sequential_process()
+        return self._execute_dag(self.tasks)
+    
+    def _capacity(self, task: Task) -> Tuple[Any, Optional[int]]:
+        """Key and task limit of the endpoint capacity a task uses"""
+        
+        if self.endpoint_capacity is None:
+            return None, None
+        llm = getattr(self._get_agent_to_use(task), "llm", None)
+        pool = getattr(llm, "endpoint_pool", None)
+        if pool is not None:
+            model_name = llm.model.split("/", 1)[-1]
+            serving = sum(1 for endpoint in pool.endpoints if endpoint.serves(model_name))
+            return ("pool", model_name), self.endpoint_capacity * max(1, serving)
+        return getattr(llm, "base_url", None), self.endpoint_capacity
+    
+    def _run_task(self, index: int, task: Task, context: str):
+        agent = self._get_agent_to_use(task)
+        if agent is None:
+            raise ValueError(
+                f"No agent available for task: {task.description}. Ensure that either the task has an assigned agent or a manager agent is provided."
+            )
+        tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+        self._log_task_start(task, agent.role)
+        return task.execute_sync(agent=agent, context=context, tools=tools)
+    
+    def _execute_dag(self, tasks: List[Task]) -> CrewOutput:
+        dependencies = build_dag(tasks)
+        outputs: Dict[int, Any] = {}
+        durations = [0.0] * len(tasks)
+        started: Dict[int, float] = {}
+        capacity = [self._capacity(task) for task in tasks]
+        in_use: Dict[Any, int] = {}
+        log_lock = threading.Lock()
+        running = {}
+        peak = 0
+        error: Optional[BaseException] = None
+        
+        def context_for(i):
+            task = tasks[i]
+            if task.context is NOT_SPECIFIED or task.context is None:
+                return aggregate_raw_outputs_from_task_outputs([outputs[dep] for dep in sorted(dependencies[i])])
+            return aggregate_raw_outputs_from_tasks(task.context) if task.context else ""
+        
+        def ready():
+            return [i for i in range(len(tasks)) if i not in started and dependencies[i] <= outputs.keys()]
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="crew-task") as executor:
+            while len(outputs) < len(tasks):
+                if error is None:
+                    for i in ready():
+                        if len(running) >= self.max_parallel:
+                            break
+                        key, limit = capacity[i]
+                        if limit is not None:
+                            if in_use.get(key, 0) >= limit:
+                                continue
+                            in_use[key] = in_use.get(key, 0) + 1
+                        started[i] = time.perf_counter()
+                        # Each task thread sees the caller's context (telemetry spans, etc.)
+                        future = executor.submit(contextvars.copy_context().run, self._run_task, i, tasks[i], context_for(i))
+                        running[future] = i
+                    peak = max(peak, len(running))
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    durations[i] = time.perf_counter() - started[i]
+                    key, limit = capacity[i]
+                    if limit is not None:
+                        in_use[key] -= 1
+                    try:
+                        outputs[i] = future.result()
+                    except BaseException as e:
+                        error = error or e
+                        continue
+                    with log_lock:
+                        self._process_task_result(tasks[i], outputs[i])
+                        self._store_execution_log(tasks[i], outputs[i], i, False)
+        
+        if error is not None:
+            raise error
+        if len(outputs) < len(tasks):
+            waiting = [tasks[i].name or f"task_{i}" for i in range(len(tasks)) if i not in outputs]
+            raise RuntimeError(f"Task schedule stalled with {', '.join(waiting)} unable to start")
+        
+        path_s, path = critical_path(dependencies, durations)
+        self.schedule = {
+            "wall_s": round(time.perf_counter() - start, 4),
+            "critical_path_s": round(path_s, 4),
+            "critical_path": [tasks[i].name or f"task_{i}" for i in path],
+            "serial_s": round(sum(durations), 4),
+            "peak_parallel": peak,
+            "tasks": {tasks[i].name or f"task_{i}": round(durations[i], 4) for i in range(len(tasks))},
+        }
+        print(
+            f"+ Schedule: {self.schedule['wall_s']:.2f}s wall, critical path {path_s:.2f}s "
+            f"({' -> '.join(self.schedule['critical_path'])}), {self.schedule['serial_s']:.2f}s if run serially"
+        )
+        return self._create_crew_output([outputs[i] for i in range(len(tasks))])
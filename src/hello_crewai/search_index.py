@@ -0,0 +1,279 @@
+"""
+On-disk BM25 index over a document directory, with memory-mapped postings
+"""
+import json
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config_loader import get_config_section
+from .knowledge import chunk_text
+
+TOKEN = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# One posting: the document id and how often the term occurs in it
+POSTING = np.dtype([("doc", "<u4"), ("tf", "<u4")])
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords"""
+    
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+class SearchIndex:
+    """BM25 search over chunks of the files in `directory`, stored in `index_dir`
+    
+    Postings live in one file, grouped by term and memory-mapped for reads; the
+    term dictionary, document table and the postings file's name and size are
+    kept in a JSON manifest. sync()
+    re-reads only files whose size or modification time changed and rewrites
+    the postings file, dropping documents of changed or deleted files.
+    """
+    
+    def __init__(
+        self,
+        directory: str = "knowledge",
+        index_dir: str = ".cache/search",
+        chunk_chars: int = 800,
+        chunk_overlap: int = 100,
+        patterns: Sequence[str] = ("*.txt", "*.md"),
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.directory = Path(directory)
+        self.index_dir = Path(index_dir)
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.patterns = tuple(patterns)
+        self.k1 = k1
+        self.b = b
+        
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._lexicon: Dict[str, List[int]] = {}
+        self._next_doc = 0
+        self._postings_file: Optional[str] = None
+        self._postings = np.empty(0, dtype=POSTING)
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._avg_length = 0.0
+        self._load()
+    
+    @property
+    def _manifest_path(self) -> Path:
+        return self.index_dir / "manifest.json"
+    
+    def _tmp_path(self, path: Path) -> Path:
+        return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    
+    def _load(self):
+        """Load the saved index, unless its postings file is not the one the manifest describes"""
+        
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+            postings_path = self.index_dir / manifest["postings_file"]
+            if postings_path.stat().st_size != manifest["postings_bytes"]:
+                return
+        except (OSError, ValueError, KeyError):
+            # Missing, or from before postings files were named; sync() indexes everything again
+            return
+        self._postings_file = postings_path.name
+        self._files = manifest["files"]
+        self._docs = {int(doc_id): doc for doc_id, doc in manifest["docs"].items()}
+        self._lexicon = manifest["lexicon"]
+        self._next_doc = manifest["next_doc"]
+        self._open()
+    
+    def _open(self):
+        """Map the postings file and derive the document length table"""
+        
+        postings_path = self.index_dir / self._postings_file if self._postings_file else None
+        if postings_path is not None and postings_path.stat().st_size:
+            self._postings = np.memmap(postings_path, dtype=POSTING, mode="r")
+        else:
+            self._postings = np.empty(0, dtype=POSTING)
+        
+        self._lengths = np.zeros(self._next_doc, dtype=np.float32)
+        for doc_id, doc in self._docs.items():
+            self._lengths[doc_id] = doc["length"]
+        self._avg_length = float(self._lengths.sum() / len(self._docs)) if self._docs else 0.0
+    
+    def _scan(self) -> Dict[str, Dict[str, int]]:
+        """Size and modification time of every document file, keyed on relative path"""
+        
+        paths = {path for pattern in self.patterns for path in self.directory.rglob(pattern) if path.is_file()}
+        files = {}
+        for path in sorted(paths):
+            stat = path.stat()
+            files[path.relative_to(self.directory).as_posix()] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        return files
+    
+    def sync(self) -> Dict[str, int]:
+        """Bring the index up to date with the document directory"""
+        
+        with self._lock:
+            current = self._scan() if self.directory.is_dir() else {}
+            changed = {
+                source: signature
+                for source, signature in current.items()
+                if {key: self._files.get(source, {}).get(key) for key in signature} != signature
+            }
+            removed = [source for source in self._files if source not in current]
+            if not changed and not removed:
+                return {"documents": len(self._docs), "files_indexed": 0, "files_removed": 0}
+            
+            dead = set()
+            for source in list(changed) + removed:
+                if source in self._files:
+                    dead.update(self._files.pop(source)["docs"])
+            for doc_id in dead:
+                del self._docs[doc_id]
+            
+            # Postings for the new versions of changed files
+            added: Dict[str, List[tuple]] = {}
+            for source, signature in changed.items():
+                text = (self.directory / source).read_text(encoding="utf-8", errors="replace")
+                doc_ids = []
+                for chunk in chunk_text(text, self.chunk_chars, self.chunk_overlap):
+                    tokens = tokenize(chunk)
+                    if not tokens:
+                        continue
+                    doc_id = self._next_doc
+                    self._next_doc += 1
+                    self._docs[doc_id] = {"source": source, "text": chunk, "length": len(tokens)}
+                    doc_ids.append(doc_id)
+                    for term, tf in Counter(tokens).items():
+                        added.setdefault(term, []).append((doc_id, tf))
+                self._files[source] = dict(signature, docs=doc_ids)
+            
+            self._write(added, dead)
+            return {"documents": len(self._docs), "files_indexed": len(changed), "files_removed": len(removed)}
+    
+    def _write(self, added: Dict[str, List[tuple]], dead: set):
+        """Merge existing and new postings into a new generation's postings file, then the manifest
+        
+        The manifest is replaced last, so a crash or a concurrent write never leaves
+        it describing postings its lexicon doesn't match.
+        """
+        
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        dead_ids = np.fromiter(dead, dtype=np.uint32, count=len(dead))
+        lexicon = {}
+        offset = 0
+        postings_path = self.index_dir / f"postings-{uuid.uuid4().hex[:16]}.bin"
+        tmp_postings = self._tmp_path(postings_path)
+        with open(tmp_postings, "wb") as f:
+            for term in sorted(set(self._lexicon) | set(added)):
+                parts = []
+                if term in self._lexicon:
+                    start, count = self._lexicon[term]
+                    old = self._postings[start:start + count]
+                    parts.append(old[~np.isin(old["doc"], dead_ids)] if len(dead_ids) else old)
+                if term in added:
+                    parts.append(np.array(added[term], dtype=POSTING))
+                postings = np.concatenate(parts) if len(parts) > 1 else np.asarray(parts[0])
+                if not len(postings):
+                    continue
+                f.write(postings.tobytes())
+                lexicon[term] = [offset, len(postings)]
+                offset += len(postings)
+        os.replace(tmp_postings, postings_path)
+        
+        self._lexicon = lexicon
+        manifest = {
+            "postings_file": postings_path.name,
+            "postings_bytes": offset * POSTING.itemsize,
+            "next_doc": self._next_doc,
+            "files": self._files,
+            "docs": {str(doc_id): doc for doc_id, doc in self._docs.items()},
+            "lexicon": lexicon,
+        }
+        tmp_manifest = self._tmp_path(self._manifest_path)
+        tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_manifest, self._manifest_path)
+        
+        previous, self._postings_file = self._postings_file, postings_path.name
+        self._open()
+        if previous is not None:
+            try:
+                (self.index_dir / previous).unlink(missing_ok=True)
+            except OSError:
+                # Still mapped by another reader on Windows; it is only a stale file
+                pass
+    
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k documents by BM25 score, best first, with their source file"""
+        
+        terms = set(tokenize(query))
+        with self._lock:
+            if not self._docs or not terms:
+                return []
+            scores = np.zeros(self._next_doc, dtype=np.float32)
+            total = len(self._docs)
+            for term in terms:
+                entry = self._lexicon.get(term)
+                if entry is None:
+                    continue
+                postings = self._postings[entry[0]:entry[0] + entry[1]]
+                df = len(postings)
+                idf = np.log(1.0 + (total - df + 0.5) / (df + 0.5))
+                tf = postings["tf"].astype(np.float32)
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[postings["doc"]] / self._avg_length)
+                scores[postings["doc"]] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+            
+            k = min(k, int(np.count_nonzero(scores)))
+            if k == 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                {"source": self._docs[int(doc_id)]["source"], "text": self._docs[int(doc_id)]["text"], "score": round(float(scores[doc_id]), 4)}
+                for doc_id in top
+            ]
+    
+    @property
+    def version(self) -> str:
+        """Changes whenever documents are added or removed"""
+        return f"{self._next_doc}:{len(self._docs)}"
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_search_index(config_path: str = ".env.toml") -> Optional[SearchIndex]:
+    """Return the shared index described by the [search] table, if enabled
+    
+    The index is synced with the document directory when it is first created in a process.
+    """
+    
+    search_config = get_config_section("search", config_path)
+    if not search_config.get("enabled", False):
+        return None
+    
+    index_dir = search_config.get("index_dir", ".cache/search")
+    with _indexes_lock:
+        if index_dir not in _indexes:
+            index = SearchIndex(
+                directory=search_config.get("directory", "knowledge"),
+                index_dir=index_dir,
+                chunk_chars=search_config.get("chunk_chars", 800),
+                chunk_overlap=search_config.get("chunk_overlap", 100),
+                patterns=search_config.get("patterns", ("*.txt", "*.md")),
+                k1=search_config.get("k1", 1.2),
+                b=search_config.get("b", 0.75),
+            )
+            result = index.sync()
+            print(f"+ Search index: {result['documents']} documents ({result['files_indexed']} files indexed, {result['files_removed']} removed)")
+            _indexes[index_dir] = index
+        return _indexes[index_dir]
@@ -0,0 +1,322 @@
+"""
+Crew service: a long-running local HTTP server that queues crew jobs on warm, pooled crews
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .single_flight import coalescing_stats
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+}
+
+MAX_BODY_BYTES = 1024 * 1024
+
+class Job:
+    """One crew kickoff requested over HTTP"""
+    
+    def __init__(self, inputs: Dict[str, Any], priority: int):
+        self.id = uuid.uuid4().hex
+        self.inputs = inputs
+        self.priority = priority
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.output: Optional[str] = None
+        self.error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "inputs": self.inputs,
+            "submitted_at": self.submitted_at,
+        }
+        if self.started_at is not None:
+            data["queue_wait_s"] = round(self.started_at - self.submitted_at, 3)
+        if self.finished_at is not None:
+            data["run_s"] = round(self.finished_at - self.started_at, 3)
+        if self.output is not None:
+            data["output"] = self.output
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+class CrewService:
+    """Run crew jobs from a bounded priority queue on `workers` pooled crews
+    
+    Jobs with a higher `priority` run first, in submission order within a
+    priority. When `max_queue` jobs are already waiting, new jobs are refused
+    with 429 and a Retry-After estimate instead of piling up. The last
+    `max_results` finished jobs stay available from GET /jobs/<id>.
+    
+    Endpoints: POST /jobs, GET /jobs/<id>, GET /health.
+    """
+    
+    def __init__(
+        self,
+        crew_pool: Any = None,
+        workers: int = 2,
+        max_queue: int = 100,
+        max_results: int = 1000,
+        config_path: str = ".env.toml",
+    ):
+        if max_queue < 1:
+            raise ValueError(f"max_queue must be at least 1, got {max_queue}")
+        self.crew_pool = crew_pool
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_results = max_results
+        self.config_path = config_path
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._run_seconds = 0.0
+        self._sequence = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._worker_tasks = []
+    
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        """Build the crew pool (if none was given), start the workers and listen"""
+    
+        if self.crew_pool is None:
+            from .crew_pool import get_crew_pool
+            self.crew_pool = await asyncio.to_thread(get_crew_pool, self.config_path, self.workers)
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue)
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self
+    
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+    
+    def submit(self, payload: Any) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Validate and queue a job; returns (status, body, extra headers)"""
+    
+        if not isinstance(payload, dict) or not isinstance(payload.get("topic"), str) or not payload["topic"].strip():
+            return 400, {"error": "Expected a JSON object with a non-empty 'topic'"}, {}
+        try:
+            priority = int(payload.get("priority", 0))
+        except (TypeError, ValueError):
+            return 400, {"error": "'priority' must be an integer"}, {}
+    
+        inputs = {
+            "topic": payload["topic"].strip(),
+            "current_year": str(payload.get("current_year") or datetime.now().year),
+        }
+        template = getattr(self.crew_pool, "template", None)
+        if template is not None:
+            try:
+                template.validate_inputs(inputs)
+            except ValueError as e:
+                return 400, {"error": str(e)}, {}
+    
+        job = Job(inputs, priority)
+        try:
+            self._queue.put_nowait((-priority, next(self._sequence), job))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            return 429, {"error": "Queue is full", "retry_after_s": retry_after}, {"Retry-After": str(retry_after)}
+    
+        self.jobs[job.id] = job
+        return 202, {"id": job.id, "status": job.status, "queued": self._queue.qsize()}, {"Location": f"/jobs/{job.id}"}
+    
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up: one average run spread over the workers"""
+    
+        finished = self.completed + self.failed
+        average = self._run_seconds / finished if finished else 1.0
+        return max(1, math.ceil(average / self.workers))
+    
+    def health(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "average_run_s": round(self._run_seconds / finished, 3) if finished else None,
+            "coalescing": coalescing_stats(),
+        }
+    
+    async def _work(self):
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                output = await asyncio.to_thread(self.crew_pool.kickoff, job.inputs)
+                job.output = getattr(output, "raw", str(output))
+                job.status = "done"
+                self.completed += 1
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "error"
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                self._run_seconds += job.finished_at - job.started_at
+                self.running -= 1
+                self._forget_old_jobs()
+    
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond `max_results`"""
+    
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - self.max_results)]:
+            del self.jobs[job_id]
+    
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Dispatch one request; returns (status, body, extra headers)"""
+    
+        path = path.split("?", 1)[0].rstrip("/")
+        if path == "/jobs":
+            if method != "POST":
+                return 405, {"error": "Use POST /jobs"}, {"Allow": "POST"}
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Body is not valid JSON"}, {}
+            return self.submit(payload)
+        if path.startswith("/jobs/"):
+            if method != "GET":
+                return 405, {"error": "Use GET /jobs/<id>"}, {"Allow": "GET"}
+            job = self.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                return 404, {"error": "Unknown job"}, {}
+            return 200, job.to_dict(), {}
+        if path == "/health" and method == "GET":
+            return 200, self.health(), {}
+        return 404, {"error": "Not found"}, {}
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+    
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, {}, close=True)
+                    break
+    
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+    
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, {}, close=True)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"}, {}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+    
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                status, payload, extra = self.route(method.upper(), path, body)
+                await self._respond(writer, status, payload, extra, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], headers: Dict[str, str], close: bool):
+        body = json.dumps(payload).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        if close:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+def main(argv=None):
+    """Command line interface for the serve entry point"""
+    
+    from .config_loader import get_config_section
+    
+    try:
+        service_config = get_config_section("service")
+    except FileNotFoundError:
+        # Still show --help; starting the crews reports the missing file
+        service_config = {}
+    parser = argparse.ArgumentParser(
+        prog="serve",
+        description="Serve crew runs over HTTP from warm, pooled crews ([service] in .env.toml).",
+    )
+    parser.add_argument("--host", default=service_config.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=service_config.get("port", 8765))
+    parser.add_argument("-j", "--workers", type=int, default=service_config.get("workers", 2),
+                        help="Crews running at once")
+    parser.add_argument("--max-queue", type=int, default=service_config.get("max_queue", 100),
+                        help="Jobs allowed to wait before new ones get 429")
+    args = parser.parse_args(argv)
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_queue < 1:
+        parser.error("--max-queue must be at least 1")
+    
+    service = CrewService(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        max_results=service_config.get("max_results", 1000),
+    )
+    
+    async def run():
+        await service.start(args.host, args.port)
+        print(f"+ Serving crews on http://{args.host}:{service.port} ({service.workers} workers, queue {service.max_queue})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("- Stopped")
@@ -0,0 +1,104 @@
+"""
+Single-flight coalescing: identical calls made while one is already running share its result
+"""
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, TextIO
+
+class SingleFlight:
+    """Run at most one call per key at a time; callers arriving meanwhile wait for it
+    
+    The leader's result (or exception) is handed to every caller that joined
+    while it ran. `coalesced` counts those callers and `saved_seconds` adds up
+    the run time each of them would otherwise have spent on a duplicate.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.executions = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+    
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        """Return call(), or the result of the identical call already running"""
+    
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.executions += 1
+            else:
+                self.coalesced += 1
+    
+        if not leader:
+            result, elapsed = future.result()
+            with self._lock:
+                self.saved_seconds += elapsed
+            return result
+    
+        start = time.perf_counter()
+        try:
+            result = call()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result((result, time.perf_counter() - start))
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self.executions + self.coalesced
+            return {
+                "calls": calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / calls if calls else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "in_flight": len(self._in_flight),
+            }
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+def shared_single_flight(name: str) -> SingleFlight:
+    """Return the process-wide coalescer for `name`, creating it on first use"""
+    
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+def get_single_flight(name: str, coalescing_config: Dict[str, Any]) -> Optional[SingleFlight]:
+    """Return the shared coalescer for `name` ("crews" or "llm") if [coalescing] enables it"""
+    
+    if not coalescing_config.get("enabled", False) or not coalescing_config.get(name, True):
+        return None
+    return shared_single_flight(name)
+
+def coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every coalescer created in this process, by name"""
+    
+    with _flights_lock:
+        flights = list(_flights.values())
+    return {flight.name: flight.stats() for flight in flights}
+
+def print_coalescing(file: TextIO = sys.stdout):
+    """Print how much duplicate work coalescing saved, if any calls went through it"""
+    
+    for name, stats in coalescing_stats().items():
+        if stats["calls"]:
+            print(
+                f"+ Coalesced {name}: {stats['coalesced']} of {stats['calls']} calls "
+                f"shared a running one (saved {stats['saved_seconds']:.1f}s)",
+                file=file,
+            )
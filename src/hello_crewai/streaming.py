@@ -0,0 +1,242 @@
+"""
+Streaming mode: incremental task output files and time-to-first-token metrics
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallStartedEvent, LLMStreamChunkEvent
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+# Agents think out loud before this marker; only the text after it is the task output
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+class IncrementalFileWriter:
+    """Append streamed text to a temporary file, then atomically move it into place"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{id(self)}.partial")
+        self._file = None
+    
+    def write(self, text: str):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.tmp_path, "w", encoding="utf-8")
+        self._file.write(text)
+        self._file.flush()
+    
+    def reset(self):
+        """Discard what was streamed so far (the agent is starting a new attempt)"""
+        
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+    
+    def commit(self, final_text: str):
+        """Replace the streamed draft with the final text and rename it over the target"""
+        
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.tmp_path, "w", encoding="utf-8")
+        self.reset()
+        self._file.write(final_text)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self.tmp_path, self.path)
+    
+    def abort(self):
+        """Remove the partial file without touching the target"""
+        
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+
+class TaskStream:
+    """Stream state for one task: timing metrics and an optional incremental output file"""
+    
+    def __init__(
+        self,
+        task_name: str,
+        output_file: Optional[str] = None,
+        on_finish: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.task_name = task_name
+        self.writer = IncrementalFileWriter(output_file) if output_file else None
+        self.on_finish = on_finish
+        
+        self.started_at: Optional[float] = None
+        self.llm_calls = 0
+        self.chunks = 0
+        self.ttfts: List[float] = []
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        
+        self._call_started_at: Optional[float] = None
+        self._call_has_chunk = False
+        self._buffer = ""
+        self._answer_started = False
+    
+    def on_task_started(self, now: float):
+        self.started_at = now
+    
+    def on_call_started(self, now: float):
+        self.llm_calls += 1
+        self._call_started_at = now
+        self._call_has_chunk = False
+        self._buffer = ""
+        if self._answer_started and self.writer is not None:
+            self.writer.reset()
+        self._answer_started = False
+    
+    def on_chunk(self, chunk: str, now: float):
+        if not chunk:
+            return
+        
+        self.chunks += 1
+        if not self._call_has_chunk:
+            self._call_has_chunk = True
+            if self._call_started_at is not None:
+                self.ttfts.append(now - self._call_started_at)
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+        self.last_chunk_at = now
+        
+        if self.writer is None:
+            return
+        if self._answer_started:
+            self.writer.write(chunk)
+            return
+        
+        self._buffer += chunk
+        marker_at = self._buffer.find(FINAL_ANSWER_MARKER)
+        if marker_at != -1:
+            self._answer_started = True
+            answer = self._buffer[marker_at + len(FINAL_ANSWER_MARKER):].lstrip()
+            self._buffer = ""
+            if answer:
+                self.writer.write(answer)
+    
+    def metrics(self, now: float) -> Dict[str, Any]:
+        """Time-to-first-token and generation speed for the task"""
+        
+        generation_s = None
+        tokens_per_sec = None
+        if self.first_chunk_at is not None and self.last_chunk_at is not None:
+            generation_s = self.last_chunk_at - self.first_chunk_at
+            if generation_s > 0:
+                tokens_per_sec = (self.chunks - 1) / generation_s
+        
+        return {
+            "task": self.task_name,
+            "llm_calls": self.llm_calls,
+            "ttft_s": self.ttfts[0] if self.ttfts else None,
+            "ttft_mean_s": sum(self.ttfts) / len(self.ttfts) if self.ttfts else None,
+            "tokens": self.chunks,
+            "generation_s": generation_s,
+            "tokens_per_sec": tokens_per_sec,
+            "duration_s": now - self.started_at if self.started_at is not None else None,
+        }
+    
+    def finish(self, final_output: Optional[str], now: float):
+        if self.writer is not None:
+            if final_output is None:
+                self.writer.abort()
+            else:
+                self.writer.commit(final_output)
+        if self.on_finish is not None:
+            self.on_finish(self.metrics(now))
+
+class StreamMonitor:
+    """Routes crewAI stream events to the TaskStream of the task running on each thread
+    
+    Registered on the event bus once per process; crews register their tasks
+    with register_task() and streams are dropped when their task finishes.
+    """
+    
+    def __init__(self):
+        self._streams: Dict[str, TaskStream] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+        crewai_event_bus.register_handler(TaskStartedEvent, self._on_task_started)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, self._on_call_started)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, self._on_chunk)
+        crewai_event_bus.register_handler(TaskCompletedEvent, self._on_task_completed)
+        crewai_event_bus.register_handler(TaskFailedEvent, self._on_task_failed)
+    
+    def register_task(self, task: Any, stream: TaskStream):
+        with self._lock:
+            self._streams[str(task.id)] = stream
+    
+    def _current(self) -> Optional[TaskStream]:
+        return getattr(self._local, "stream", None)
+    
+    def chunks_seen(self) -> int:
+        """Non-empty chunks streamed on this thread so far"""
+        
+        return getattr(self._local, "chunks", 0)
+    
+    def _on_task_started(self, source, event):
+        task = event.task
+        stream = self._streams.get(str(task.id)) if task is not None else None
+        self._local.stream = stream
+        if stream is not None:
+            stream.on_task_started(time.perf_counter())
+    
+    def _on_call_started(self, source, event):
+        stream = self._current()
+        if stream is not None:
+            stream.on_call_started(time.perf_counter())
+    
+    def _on_chunk(self, source, event):
+        if event.chunk:
+            self._local.chunks = self.chunks_seen() + 1
+        stream = self._current()
+        if stream is not None:
+            stream.on_chunk(event.chunk or "", time.perf_counter())
+    
+    def _finish(self, event, final_output: Optional[str]):
+        task = event.task
+        if task is None:
+            return
+        with self._lock:
+            stream = self._streams.pop(str(task.id), None)
+        if self._current() is stream:
+            self._local.stream = None
+        if stream is not None:
+            stream.finish(final_output, time.perf_counter())
+    
+    def _on_task_completed(self, source, event):
+        self._finish(event, event.output.raw)
+    
+    def _on_task_failed(self, source, event):
+        self._finish(event, None)
+
+_monitor: Optional[StreamMonitor] = None
+_monitor_lock = threading.Lock()
+
+def get_stream_monitor() -> StreamMonitor:
+    """Return the process-wide stream monitor, registering it on first use"""
+    
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = StreamMonitor()
+        return _monitor
+
+def print_stream_metrics(metrics: Dict[str, Any]):
+    """Print a one-line streaming summary for a finished task"""
+    
+    ttft = metrics["ttft_s"]
+    tokens_per_sec = metrics["tokens_per_sec"]
+    ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+    speed_text = f"{tokens_per_sec:.1f} tokens/s" if tokens_per_sec is not None else "n/a"
+    print(f"+ {metrics['task']}: first token after {ttft_text}, {speed_text}")
@@ -0,0 +1,305 @@
+"""
+Per-agent / per-task performance telemetry, exported as JSONL spans and Prometheus metrics
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.utilities.events.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+# Counters exported per (agent, task, model), as (metric name, help text)
+COUNTERS = (
+    ("llm_calls", "LLM calls made"),
+    ("llm_failures", "LLM calls that failed and were retried by the agent"),
+    ("prompt_tokens", "Prompt tokens sent to the model"),
+    ("completion_tokens", "Completion tokens generated by the model"),
+    ("queue_wait_seconds", "Time LLM calls waited before being dispatched"),
+    ("network_seconds", "Time LLM calls spent waiting on the endpoint"),
+    ("tool_calls", "Tool invocations"),
+    ("tool_seconds", "Time spent running tools"),
+)
+
+# The sampled span of the task running in this context; copied contexts (hedged
+# attempts, scheduled tasks) see it too
+_span: contextvars.ContextVar[Optional["TaskSpan"]] = contextvars.ContextVar("telemetry_span", default=None)
+
+class TaskSpan:
+    """Measurements for one sampled task execution"""
+    
+    def __init__(self, task: Any, agent_name: str, trace_id: str):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.task = task.name or str(task.id)
+        self.agent = agent_name
+        self.model = ""
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.counters = {name: 0.0 for name, _ in COUNTERS}
+        self.llm_spans: List[Dict[str, Any]] = []
+        
+        self._call_started: Optional[float] = None
+        self._dispatched: Optional[float] = None
+        self._call_usage: Dict[str, int] = {}
+    
+    def call_started(self, model: str):
+        self.model = model or self.model
+        self._call_started = time.perf_counter()
+        self._dispatched = None
+        self._call_usage = {}
+    
+    def call_dispatched(self):
+        self._dispatched = time.perf_counter()
+    
+    def record_usage(self, usage: Any):
+        get = usage.get if isinstance(usage, dict) else lambda key, default=0: getattr(usage, key, default)
+        self._call_usage = {
+            "prompt_tokens": int(get("prompt_tokens", 0) or 0),
+            "completion_tokens": int(get("completion_tokens", 0) or 0),
+        }
+    
+    def call_finished(self, failed: bool):
+        if self._call_started is None:
+            return
+        now = time.perf_counter()
+        dispatched = self._dispatched or self._call_started
+        queue_wait = dispatched - self._call_started
+        network = now - dispatched
+        
+        self.counters["llm_calls"] += 1
+        self.counters["llm_failures"] += 1 if failed else 0
+        self.counters["queue_wait_seconds"] += queue_wait
+        self.counters["network_seconds"] += network
+        self.counters["prompt_tokens"] += self._call_usage.get("prompt_tokens", 0)
+        self.counters["completion_tokens"] += self._call_usage.get("completion_tokens", 0)
+        self.llm_spans.append({
+            "kind": "llm_call",
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": self.span_id,
+            "task": self.task,
+            "agent": self.agent,
+            "model": self.model,
+            "status": "error" if failed else "ok",
+            "start_offset_s": round(self._call_started - self.started, 6),
+            "queue_wait_s": round(queue_wait, 6),
+            "network_s": round(network, 6),
+            **self._call_usage,
+        })
+        self._call_started = None
+    
+    def tool_finished(self, seconds: float):
+        self.counters["tool_calls"] += 1
+        self.counters["tool_seconds"] += seconds
+    
+    def to_dict(self, status: str) -> Dict[str, Any]:
+        counters = {name: round(value, 6) if name.endswith("seconds") else int(value) for name, value in self.counters.items()}
+        return {
+            "kind": "task",
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "task": self.task,
+            "agent": self.agent,
+            "model": self.model,
+            "status": status,
+            "start_time": self.started_at,
+            "duration_s": round(time.perf_counter() - self.started, 6),
+            "retries": int(self.counters["llm_failures"]),
+            **counters,
+        }
+
+class UsageCallback:
+    """LLM callback that copies token usage into the current span"""
+    
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        span = current_span()
+        usage = (response_obj or {}).get("usage") if isinstance(response_obj, dict) else None
+        if span is not None and usage:
+            span.record_usage(usage)
+
+_usage_callback = UsageCallback()
+
+def current_span() -> Optional[TaskSpan]:
+    """The sampled task span running in this context, if any"""
+    
+    return _span.get()
+
+def mark_dispatch():
+    """Record that the current LLM call is leaving the process (ends its queue wait)"""
+    
+    span = current_span()
+    if span is not None:
+        span.call_dispatched()
+
+def with_usage_callback(callbacks: Optional[List[Any]]) -> Optional[List[Any]]:
+    """Add the token usage callback when the current task is being sampled"""
+    
+    if current_span() is None:
+        return callbacks
+    return list(callbacks or []) + [_usage_callback]
+
+class TelemetryCollector:
+    """Samples task executions from the crewAI event bus and exports them"""
+    
+    def __init__(self, spans_file: str, metrics_file: str, sample_rate: float = 1.0):
+        self.spans_file = Path(spans_file)
+        self.metrics_file = Path(metrics_file)
+        self.sample_rate = sample_rate
+        self.agent_names: Dict[str, str] = {}
+        self.tasks_seen = 0
+        self.tasks_sampled = 0
+        self.metrics: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+        self.task_durations: Dict[Tuple[str, str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        
+        crewai_event_bus.register_handler(TaskStartedEvent, self._on_task_started)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, self._on_call_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, self._on_call_completed)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, self._on_call_failed)
+        crewai_event_bus.register_handler(ToolUsageFinishedEvent, self._on_tool_finished)
+        crewai_event_bus.register_handler(ToolUsageErrorEvent, self._on_tool_error)
+        crewai_event_bus.register_handler(TaskCompletedEvent, self._on_task_completed)
+        crewai_event_bus.register_handler(TaskFailedEvent, self._on_task_failed)
+    
+    def register_agent(self, agent: Any, name: str):
+        """Label spans for `agent` with its YAML key instead of its role"""
+        
+        self.agent_names[str(agent.id)] = name
+    
+    def _on_task_started(self, source, event):
+        task = event.task
+        with self._lock:
+            self.tasks_seen += 1
+            sampled = task is not None and self._random.random() < self.sample_rate
+            if sampled:
+                self.tasks_sampled += 1
+        if not sampled:
+            _span.set(None)
+            return
+        
+        agent = task.agent
+        agent_name = self.agent_names.get(str(agent.id), agent.role.strip()) if agent is not None else ""
+        crew = getattr(agent, "crew", None) if agent is not None else None
+        trace_id = str(crew.id) if crew is not None else str(task.id)
+        _span.set(TaskSpan(task, agent_name, trace_id.replace("-", "")))
+    
+    def _on_call_started(self, source, event):
+        span = current_span()
+        if span is not None:
+            span.call_started(getattr(source, "model", ""))
+    
+    def _on_call_completed(self, source, event):
+        span = current_span()
+        if span is not None:
+            span.call_finished(failed=False)
+    
+    def _on_call_failed(self, source, event):
+        span = current_span()
+        if span is not None:
+            span.call_finished(failed=True)
+    
+    def _on_tool_finished(self, source, event):
+        span = current_span()
+        if span is not None:
+            span.tool_finished((event.finished_at - event.started_at).total_seconds())
+    
+    def _on_tool_error(self, source, event):
+        span = current_span()
+        if span is not None:
+            span.tool_finished(0.0)
+    
+    def _on_task_completed(self, source, event):
+        self._finish("ok")
+    
+    def _on_task_failed(self, source, event):
+        self._finish("error")
+    
+    def _finish(self, status: str):
+        span = current_span()
+        _span.set(None)
+        if span is None:
+            return
+        
+        record = span.to_dict(status)
+        key = (span.agent, span.task, span.model)
+        with self._lock:
+            totals = self.metrics.setdefault(key, {name: 0.0 for name, _ in COUNTERS})
+            for name, _ in COUNTERS:
+                totals[name] += span.counters[name]
+            self.task_durations.setdefault(key, []).append(record["duration_s"])
+            self._append_spans(span.llm_spans + [record])
+            self._write_metrics()
+    
+    def _append_spans(self, records: List[Dict[str, Any]]):
+        self.spans_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spans_file, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    
+    def render_metrics(self) -> str:
+        """Prometheus text exposition of everything collected so far"""
+        
+        lines = [
+            "# HELP hello_crewai_telemetry_sample_rate Fraction of task executions recorded",
+            "# TYPE hello_crewai_telemetry_sample_rate gauge",
+            f"hello_crewai_telemetry_sample_rate {self.sample_rate}",
+            "# HELP hello_crewai_tasks_seen_total Task executions observed (sampled or not)",
+            "# TYPE hello_crewai_tasks_seen_total counter",
+            f"hello_crewai_tasks_seen_total {self.tasks_seen}",
+        ]
+        for name, help_text in COUNTERS:
+            metric = f"hello_crewai_{name}_total"
+            lines.append(f"# HELP {metric} {help_text} (sampled tasks)")
+            lines.append(f"# TYPE {metric} counter")
+            for key, totals in sorted(self.metrics.items()):
+                lines.append(f"{metric}{{{_labels(key)}}} {_number(totals[name])}")
+        
+        metric = "hello_crewai_task_duration_seconds"
+        lines.append(f"# HELP {metric} Task wall time (sampled tasks)")
+        lines.append(f"# TYPE {metric} summary")
+        for key, durations in sorted(self.task_durations.items()):
+            lines.append(f"{metric}_sum{{{_labels(key)}}} {_number(sum(durations))}")
+            lines.append(f"{metric}_count{{{_labels(key)}}} {len(durations)}")
+        return "\n".join(lines) + "\n"
+    
+    def _write_metrics(self):
+        # Written atomically so a textfile collector never reads a half-written file
+        self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.metrics_file.with_name(f".{self.metrics_file.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render_metrics(), encoding="utf-8")
+        os.replace(tmp_path, self.metrics_file)
+
+def _labels(key: Tuple[str, str, str]) -> str:
+    agent, task, model = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ") for value in key)
+    return f'agent="{agent}",task="{task}",model="{model}"'
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+_collector: Optional[TelemetryCollector] = None
+_collector_lock = threading.Lock()
+
+def get_telemetry(telemetry_config: Dict[str, Any]) -> Optional[TelemetryCollector]:
+    """Return the process-wide collector described by a [telemetry] table, if enabled"""
+    
+    global _collector
+    if not telemetry_config.get("enabled", False):
+        return None
+    
+    with _collector_lock:
+        if _collector is None:
+            _collector = TelemetryCollector(
+                spans_file=telemetry_config.get("spans_file", ".cache/telemetry/spans.jsonl"),
+                metrics_file=telemetry_config.get("metrics_file", ".cache/telemetry/hello_crewai.prom"),
+                sample_rate=float(telemetry_config.get("sample_rate", 1.0)),
+            )
+        return _collector
@@ -0,0 +1,215 @@
+"""
+Adaptive completion deadlines, derived from per-model latency histograms kept on disk
+"""
+import atexit
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Histogram buckets grow geometrically: bucket i holds values up to BUCKET_BASE * BUCKET_GROWTH ** i
+BUCKET_BASE = 1e-4
+BUCKET_GROWTH = 1.1
+
+class LatencyHistogram:
+    """Log-bucketed histogram of positive values (about 10% resolution)
+    
+    Counts are halved once they pass `max_count`, so old runs fade out and the
+    histogram follows a model whose speed changed (new hardware, quantization).
+    """
+    
+    def __init__(self, counts: Optional[Dict[int, int]] = None, max_count: int = 5000):
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.max_count = max_count
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+    
+    def add(self, value: float):
+        index = max(0, math.ceil(math.log(max(value, BUCKET_BASE) / BUCKET_BASE, BUCKET_GROWTH)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if self.total > self.max_count:
+            self.counts = {index: count // 2 for index, count in self.counts.items() if count // 2}
+    
+    def quantile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the `pct` percentile, or None if empty"""
+    
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, math.ceil(pct / 100 * total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return BUCKET_BASE * BUCKET_GROWTH ** index
+        return BUCKET_BASE * BUCKET_GROWTH ** max(self.counts)
+    
+    def to_dict(self) -> Dict[str, int]:
+        return {str(index): count for index, count in sorted(self.counts.items())}
+
+class UsageCapture:
+    """LLM callback that keeps the completion token count of the call it was passed to"""
+    
+    def __init__(self):
+        self.completion_tokens: Optional[int] = None
+    
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = (response_obj or {}).get("usage") if isinstance(response_obj, dict) else None
+        if usage:
+            get = usage.get if isinstance(usage, dict) else lambda key, default=None: getattr(usage, key, default)
+            self.completion_tokens = get("completion_tokens", None)
+
+class AdaptiveTimeouts:
+    """Per-model deadlines from the observed `percentile` of seconds per output token
+    
+    The deadline for a request is that percentile times the requested
+    `max_tokens` (or the percentile of observed output lengths when none is
+    set), times `margin`, clamped between `min_timeout` and the model's static
+    timeout. Until a model has `min_samples` completions recorded, its static
+    timeout is used. A request that hits its deadline is recorded as having
+    taken at least that long, so deadlines that are too tight loosen themselves.
+    Histograms are written back to `path` every `flush_every` records and at
+    interpreter exit.
+    """
+    
+    def __init__(
+        self,
+        path: str = ".cache/latency_histograms.json",
+        percentile: float = 99,
+        min_samples: int = 20,
+        margin: float = 2.0,
+        min_timeout: float = 30,
+        max_count: int = 5000,
+        flush_every: int = 20,
+    ):
+        self.path = Path(path)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.max_count = max_count
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for model_key, entry in data.get("models", {}).items():
+            self._models[model_key] = {
+                "seconds_per_token": self._histogram(entry.get("seconds_per_token")),
+                "output_tokens": self._histogram(entry.get("output_tokens")),
+                "timeouts": entry.get("timeouts", 0),
+            }
+    
+    def _histogram(self, counts: Optional[Dict[str, int]] = None) -> LatencyHistogram:
+        return LatencyHistogram({int(index): count for index, count in (counts or {}).items()}, self.max_count)
+    
+    def _entry(self, model_key: str) -> Dict[str, Any]:
+        return self._models.setdefault(
+            model_key,
+            {"seconds_per_token": self._histogram(), "output_tokens": self._histogram(), "timeouts": 0},
+        )
+    
+    def deadline(self, model_key: str, ceiling: Optional[float], max_tokens: Optional[int] = None) -> Optional[float]:
+        """Seconds to allow a completion of up to `max_tokens`, never more than `ceiling`"""
+    
+        with self._lock:
+            entry = self._models.get(model_key)
+            if entry is None or entry["seconds_per_token"].total < self.min_samples:
+                return ceiling
+            per_token = entry["seconds_per_token"].quantile(self.percentile)
+            tokens = max_tokens or entry["output_tokens"].quantile(self.percentile)
+    
+        seconds = max(self.min_timeout, self.margin * per_token * tokens)
+        return min(ceiling, seconds) if ceiling else seconds
+    
+    def record(self, model_key: str, latency_s: float, completion_tokens: int):
+        """Record one successful completion"""
+    
+        tokens = max(1, completion_tokens)
+        with self._lock:
+            entry = self._entry(model_key)
+            entry["seconds_per_token"].add(latency_s / tokens)
+            entry["output_tokens"].add(tokens)
+            self._dirty += 1
+            should_flush = self._dirty >= self.flush_every
+        if should_flush:
+            self.save()
+    
+    def record_timeout(self, model_key: str, deadline_s: float, max_tokens: Optional[int] = None):
+        """Record a completion cut off at `deadline_s` as a (lower bound) sample"""
+    
+        with self._lock:
+            entry = self._entry(model_key)
+            entry["timeouts"] += 1
+            tokens = max_tokens or entry["output_tokens"].quantile(self.percentile) or 1
+            entry["seconds_per_token"].add(deadline_s / tokens)
+            self._dirty += 1
+    
+    def summary(self, model_key: str) -> Dict[str, Any]:
+        """Sample count, seconds-per-token and output length percentiles, and timeouts"""
+    
+        with self._lock:
+            entry = self._models.get(model_key)
+            if entry is None:
+                return {"samples": 0, "seconds_per_token": None, "output_tokens": None, "timeouts": 0}
+            return {
+                "samples": entry["seconds_per_token"].total,
+                "seconds_per_token": entry["seconds_per_token"].quantile(self.percentile),
+                "output_tokens": entry["output_tokens"].quantile(self.percentile),
+                "timeouts": entry["timeouts"],
+            }
+    
+    def save(self):
+        """Write the histograms to disk atomically"""
+    
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({
+                "models": {
+                    model_key: {
+                        "seconds_per_token": entry["seconds_per_token"].to_dict(),
+                        "output_tokens": entry["output_tokens"].to_dict(),
+                        "timeouts": entry["timeouts"],
+                    }
+                    for model_key, entry in self._models.items()
+                }
+            }, indent=1)
+            self._dirty = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+_timeouts: Dict[str, AdaptiveTimeouts] = {}
+_timeouts_lock = threading.Lock()
+
+def get_adaptive_timeouts(timeouts_config: Dict[str, Any]) -> Optional[AdaptiveTimeouts]:
+    """Return the shared histograms described by an [adaptive_timeouts] table, if enabled"""
+    
+    if not timeouts_config.get("enabled", False):
+        return None
+    
+    path = timeouts_config.get("path", ".cache/latency_histograms.json")
+    with _timeouts_lock:
+        if path not in _timeouts:
+            _timeouts[path] = AdaptiveTimeouts(
+                path=path,
+                percentile=timeouts_config.get("percentile", 99),
+                min_samples=timeouts_config.get("min_samples", 20),
+                margin=timeouts_config.get("margin", 2.0),
+                min_timeout=timeouts_config.get("min_timeout_s", 30),
+            )
+            atexit.register(_timeouts[path].save)
+        return _timeouts[path]
@@ -1,19 +1,10 @@
-from crewai.tools import BaseTool
-from typing import Type
-from pydantic import BaseModel, Field
+from .index_search_tool import IndexSearchTool
 
 
-class MyCustomToolInput(BaseModel):
-    """Input schema for MyCustomTool."""
-    argument: str = Field(..., description="Description of the argument.")
-
-class MyCustomTool(BaseTool):
-    name: str = "Name of my tool"
+class DocumentSearchTool(IndexSearchTool):
+    name: str = "Search documents"
     description: str = (
-        "Clear description for what this tool is useful for, your agent will need this information to use it."
+        "Keyword search (BM25) over the local document collection. "
+        "Returns the best matching passages, each with its source file."
     )
-    args_schema: Type[BaseModel] = MyCustomToolInput
-
-    def _run(self, argument: str) -> str:
-        # Implementation goes here
-        return "this is an example of a tool output, ignore it and move along."
+    top_k: int = 5
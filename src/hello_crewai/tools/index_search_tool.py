@@ -0,0 +1,34 @@
+from crewai.tools import BaseTool
+from typing import Any, Type
+from pydantic import BaseModel, Field
+
+from .tool_cache import cached_run
+
+
+class IndexSearchToolInput(BaseModel):
+    """Input schema for IndexSearchTool."""
+    query: str = Field(..., description="What to search for.")
+
+class IndexSearchTool(BaseTool):
+    """Search tool over any index with `search(query, k)` and a `version`
+
+    Subclasses only set the name, description and default top_k.
+    """
+    name: str = "Search index"
+    description: str = "Returns the best matching passages, each with its source file."
+    args_schema: Type[BaseModel] = IndexSearchToolInput
+    index: Any = Field(default=None, exclude=True)
+    cache: Any = Field(default=None, exclude=True)
+    top_k: int = 5
+
+    @property
+    def cache_version(self):
+        # Cached results are only valid for the index contents they came from
+        return f"{self.index.version}:{self.top_k}" if self.index is not None else None
+
+    @cached_run()
+    def _run(self, query: str) -> str:
+        results = self.index.search(query, self.top_k) if self.index is not None else []
+        if not results:
+            return "No matching passages found."
+        return "\n\n".join(f"[{result['source']}] {result['text']}" for result in results)
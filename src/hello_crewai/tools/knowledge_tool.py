@@ -0,0 +1,10 @@
+from .index_search_tool import IndexSearchTool
+
+
+class KnowledgeSearchTool(IndexSearchTool):
+    name: str = "Search knowledge base"
+    description: str = (
+        "Look up facts in the local knowledge base (files under knowledge/). "
+        "Returns the most relevant passages, each with its source file."
+    )
+    top_k: int = 4
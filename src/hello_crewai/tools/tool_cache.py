@@ -0,0 +1,252 @@
+"""
+Memoized tool execution: in-memory LRU with per-tool TTLs, an optional SQLite tier and single-flight misses
+"""
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from ..single_flight import SingleFlight, shared_single_flight
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at);
+"""
+
+def make_tool_key(tool_name: str, arguments: Dict[str, Any], version: Any = None) -> str:
+    """Content hash of a tool name, its validated arguments and the tool's data version"""
+    
+    payload = json.dumps({"tool": tool_name, "args": arguments, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ToolCache:
+    """Cache of tool results keyed on tool name and arguments
+    
+    Results live in an LRU of `max_entries` and, with a `path`, in SQLite as well
+    so they survive restarts (only JSON-serializable results are written there).
+    Entries expire after the tool's TTL: `ttls[tool name]`, else the TTL given by
+    the tool, else `ttl`; a TTL of 0 disables caching for that tool. Concurrent
+    misses with the same key go through `single_flight`, so they wait for the
+    first one instead of running the tool again.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 300.0,
+        path: Optional[str] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        max_disk_entries: int = 10000,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_disk_entries = max_disk_entries
+        
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.single_flight = single_flight or SingleFlight("tools")
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        
+        self._conn = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+    
+    def _count(self, tool_name: str, counter: str):
+        counters = self._counters.setdefault(tool_name, {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0})
+        counters[counter] += 1
+    
+    def ttl_for(self, tool_name: str, tool_ttl: Optional[float] = None) -> float:
+        if tool_name in self.ttls:
+            return self.ttls[tool_name]
+        return self.ttl if tool_ttl is None else tool_ttl
+    
+    def get_or_call(self, tool_name: str, arguments: Dict[str, Any], call: Callable[[], Any], ttl: Optional[float] = None, version: Any = None) -> Any:
+        """Return the cached result for these arguments, or run `call` once and cache it"""
+        
+        ttl = self.ttl_for(tool_name, ttl)
+        if ttl <= 0:
+            return call()
+        
+        key = make_tool_key(tool_name, arguments, version)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._count(tool_name, "hits")
+                return entry[1]
+        
+        leader = []
+        
+        def load():
+            leader.append(True)
+            return self._load(key, tool_name, call, ttl, now)
+        
+        value = self.single_flight.do(key, load)
+        if not leader:
+            with self._lock:
+                self._count(tool_name, "coalesced")
+        return value
+    
+    def _load(self, key: str, tool_name: str, call: Callable[[], Any], ttl: float, now: float) -> Any:
+        """Fill a miss from SQLite or by running the tool, and keep the result in memory"""
+        
+        with self._lock:
+            # A call that finished just before this one became the leader may have filled it
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._count(tool_name, "hits")
+                return entry[1]
+        
+        found, value, expires_at = self._disk_get(key, now)
+        if found:
+            with self._lock:
+                self._count(tool_name, "disk_hits")
+        else:
+            value = call()
+            expires_at = time.time() + ttl
+            with self._lock:
+                self._count(tool_name, "misses")
+            self._disk_put(key, tool_name, value, expires_at)
+        
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def _disk_get(self, key: str, now: float) -> tuple:
+        if self._conn is None:
+            return False, None, 0.0
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return False, None, 0.0
+        return True, json.loads(row[0]), row[1]
+    
+    def _disk_put(self, key: str, tool_name: str, value: Any, expires_at: float):
+        if self._conn is None:
+            return
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, tool_name, encoded, expires_at),
+            )
+            cursor = self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self.evictions += max(cursor.rowcount, 0)
+            count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_disk_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY expires_at ASC LIMIT ?)",
+                    (count - self.max_disk_entries,),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+    
+    def clear(self):
+        """Drop every cached result"""
+        
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters overall and per tool"""
+        
+        def summarize(counters):
+            lookups = sum(counters.values())
+            served = counters["hits"] + counters["disk_hits"] + counters["coalesced"]
+            return dict(counters, hit_rate=served / lookups if lookups else 0.0)
+        
+        with self._lock:
+            tools = {name: dict(counters) for name, counters in self._counters.items()}
+            entries = len(self._memory)
+        
+        total = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+        for counters in tools.values():
+            for name, value in counters.items():
+                total[name] += value
+        return dict(
+            summarize(total),
+            entries=entries,
+            evictions=self.evictions,
+            tools={name: summarize(counters) for name, counters in tools.items()},
+        )
+
+def cached_run(ttl: Optional[float] = None):
+    """Decorator for a tool's `_run` that serves repeated calls from the tool's `cache`
+    
+    The key is the tool name plus the arguments validated by its `args_schema`,
+    and the tool's `cache_version` if it has one. Without a `cache` the tool runs
+    as usual.
+    """
+    
+    def decorate(run):
+        parameters = list(inspect.signature(run).parameters)[1:]
+        
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return run(self, *args, **kwargs)
+            
+            arguments = dict(zip(parameters, args), **kwargs)
+            schema = getattr(self, "args_schema", None)
+            if schema is not None:
+                arguments = schema(**arguments).model_dump(mode="json")
+            return cache.get_or_call(
+                self.name,
+                arguments,
+                lambda: run(self, *args, **kwargs),
+                ttl=ttl,
+                version=getattr(self, "cache_version", None),
+            )
+        
+        return wrapper
+    
+    return decorate
+
+_caches: Dict[str, ToolCache] = {}
+_caches_lock = threading.Lock()
+
+def get_tool_cache(cache_config: Dict[str, Any]) -> Optional[ToolCache]:
+    """Return the shared cache described by a [tool_cache] config table, if enabled"""
+    
+    if not cache_config.get("enabled", False):
+        return None
+    
+    key = json.dumps(cache_config, sort_keys=True)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ToolCache(
+                max_entries=cache_config.get("max_entries", 512),
+                ttl=cache_config.get("ttl_seconds", 300),
+                path=cache_config.get("path"),
+                ttls=cache_config.get("ttls", {}),
+                max_disk_entries=cache_config.get("max_disk_entries", 10000),
+                single_flight=shared_single_flight("tools"),
+            )
+        return _caches[key]
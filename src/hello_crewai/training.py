@@ -0,0 +1,248 @@
+"""
+Parallel crew training: concurrent iterations with their own feedback, merged in order and resumable
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .evaluation import iteration_seed, set_seed
+
+class IterationRecorder:
+    """Training data of one iteration: initial output, feedback and improved output per agent role
+    
+    `feedback`, if given, is called as feedback(iteration, role, output) instead
+    of prompting on the terminal.
+    """
+    
+    def __init__(self, iteration: int, feedback: Optional[Callable[[int, str, str], str]] = None):
+        self.iteration = iteration
+        self.feedback = feedback
+        self.data: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, role: str, output: str, human_feedback: Optional[str] = None):
+        with self._lock:
+            if human_feedback is not None:
+                self.data[role] = {"initial_output": output, "human_feedback": human_feedback}
+            elif role in self.data:
+                self.data[role]["improved_output"] = output
+
+def _crew_agents(crew: Any) -> List[Any]:
+    """Every agent in a crew, including per-task routed copies"""
+    
+    agents = {id(agent): agent for agent in crew.agents}
+    agents.update({id(task.agent): task.agent for task in crew.tasks if task.agent is not None})
+    return list(agents.values())
+
+def evaluate_agent(agent: Any, training_data: Dict[str, Any], role: str) -> Dict[str, Any]:
+    """crewAI's evaluation of an agent's training data into suggestions and a quality score"""
+    
+    from crewai.utilities.evaluators.task_evaluator import TaskEvaluator
+    return TaskEvaluator(agent).evaluate_training_data(training_data=training_data, agent_id=role).model_dump()
+
+class ParallelTrainer:
+    """Run training iterations `workers` at a time and merge them into `filename`
+    
+    Each iteration runs on its own clone of the crew with its own recorder and
+    sampling seed. A finished iteration is written to `state_dir` right away, so
+    an interrupted run resumes with only the missing iterations. Once all are
+    done, the feedback is merged in iteration order, each agent's data is
+    evaluated, and the results are saved to `filename` in crewAI's format.
+    """
+    
+    def __init__(
+        self,
+        n_iterations: int,
+        filename: str,
+        inputs: Dict[str, Any],
+        workers: int = 2,
+        seed: int = 42,
+        config_path: str = ".env.toml",
+        state_dir: Optional[str] = None,
+        feedback: Optional[Callable[[int, str, str], str]] = None,
+        evaluate: Callable[[Any, Dict[str, Any], str], Dict[str, Any]] = evaluate_agent,
+        template: Any = None,
+    ):
+        self.n_iterations = n_iterations
+        self.filename = filename
+        self.inputs = dict(inputs)
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.config_path = config_path
+        self.state_dir = Path(state_dir or f"{filename}.iterations")
+        self.feedback = feedback
+        self.evaluate = evaluate
+        self._template = template
+    
+    @property
+    def template(self):
+        if self._template is None:
+            from .crew_pool import CrewTemplate
+            self._template = CrewTemplate(self.config_path)
+        return self._template
+    
+    def _iteration_path(self, iteration: int) -> Path:
+        return self.state_dir / f"iteration-{iteration:04d}.json"
+    
+    def _write_json(self, path: Path, data: Any):
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+    
+    def _check_run(self):
+        """Start or resume the run in `state_dir`; refuse to mix in iterations run with other inputs"""
+    
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.state_dir / "run.json"
+        manifest = {"inputs": self.inputs, "seed": self.seed}
+        if manifest_path.exists():
+            existing = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if existing != json.loads(json.dumps(manifest)):
+                raise ValueError(
+                    f"{self.state_dir} holds iterations run with other inputs or seed; "
+                    "delete it (or pass --fresh) to start over"
+                )
+        else:
+            self._write_json(manifest_path, manifest)
+    
+    def completed(self) -> Dict[int, Dict[str, Any]]:
+        """Training data of the iterations already finished, by iteration"""
+    
+        done = {}
+        for iteration in range(self.n_iterations):
+            path = self._iteration_path(iteration)
+            if path.exists():
+                done[iteration] = json.loads(path.read_text(encoding="utf-8"))
+        return done
+    
+    def _run_iteration(self, iteration: int) -> Dict[str, Any]:
+        """Run one iteration on a fresh clone and store its training data"""
+    
+        from .training_agent import TrainingAgent
+    
+        recorder = IterationRecorder(iteration, self.feedback)
+        crew = self.template.clone()
+        crew._train = True
+        crew._train_iteration = iteration
+        for task in crew.tasks:
+            task.human_input = True
+            # A replayed checkpoint would skip the agent, and with it the feedback
+            if hasattr(task, "checkpoint_dir"):
+                task.checkpoint_dir = None
+        for agent in _crew_agents(crew):
+            if not isinstance(agent, TrainingAgent):
+                raise TypeError(f"Agent '{agent.role}' must be a TrainingAgent to train in parallel")
+            agent.allow_delegation = False
+            agent._training_recorder = recorder
+        set_seed(crew, iteration_seed(self.seed, iteration))
+    
+        crew.kickoff(inputs=self.inputs)
+        self._write_json(self._iteration_path(iteration), recorder.data)
+        return recorder.data
+    
+    def merge(self, iterations: Dict[int, Dict[str, Any]]) -> Dict[str, Dict[int, Dict[str, str]]]:
+        """Per-role training data in crewAI's {role: {iteration: data}} shape, in iteration order"""
+    
+        merged: Dict[str, Dict[int, Dict[str, str]]] = {}
+        for iteration in sorted(iterations):
+            for role in sorted(iterations[iteration]):
+                merged.setdefault(role, {})[iteration] = iterations[iteration][role]
+        return merged
+    
+    def save(self, merged: Dict[str, Dict[int, Dict[str, str]]]) -> Dict[str, Dict[str, Any]]:
+        """Evaluate each agent's merged data (concurrently) and save the results to `filename`"""
+    
+        from crewai.utilities.training_handler import CrewTrainingHandler
+    
+        crew = self.template.clone()
+        crew._interpolate_inputs(self.inputs)
+        agents = {agent.role: agent for agent in _crew_agents(crew)}
+        roles = [role for role in sorted(merged) if role in agents]
+    
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {role: executor.submit(self.evaluate, agents[role], merged, role) for role in roles}
+            results = {role: futures[role].result() for role in roles}
+    
+        handler = CrewTrainingHandler(self.filename)
+        handler.initialize_file()
+        for role in roles:
+            handler.save_trained_data(agent_id=role, trained_data=results[role])
+        return results
+    
+    def run(self, on_iteration: Optional[Callable[[int, Optional[Exception]], None]] = None) -> Dict[str, Any]:
+        """Run the missing iterations, then merge and save; returns a summary"""
+    
+        self._check_run()
+        iterations = self.completed()
+        pending = [iteration for iteration in range(self.n_iterations) if iteration not in iterations]
+    
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="training") as executor:
+            futures = {executor.submit(self._run_iteration, iteration): iteration for iteration in pending}
+            for future in as_completed(futures):
+                iteration = futures[future]
+                try:
+                    iterations[iteration] = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    if on_iteration is not None:
+                        on_iteration(iteration, e)
+                    continue
+                if on_iteration is not None:
+                    on_iteration(iteration, None)
+        if errors:
+            # Finished iterations are kept; running again resumes with the failed ones
+            raise errors[0]
+    
+        results = self.save(self.merge(iterations))
+        return {
+            "iterations": self.n_iterations,
+            "resumed": self.n_iterations - len(pending),
+            "ran": len(pending),
+            "agents": sorted(results),
+        }
+
+def main(argv=None):
+    """Command line interface for the train entry point"""
+    
+    parser = argparse.ArgumentParser(
+        prog="train",
+        description="Train the crew, running iterations in parallel and resuming an interrupted run.",
+    )
+    parser.add_argument("n_iterations", type=int, help="Training iterations")
+    parser.add_argument("filename", help="Output file for the trained agent data (.pkl)")
+    parser.add_argument("-j", "--workers", type=int, default=2, help="Iterations to run at once (default: 2)")
+    parser.add_argument("--seed", type=int, default=42, help="Base seed for per-iteration sampling seeds (default: 42)")
+    parser.add_argument("--state-dir", default=None,
+                        help="Where finished iterations are kept for resuming (default: <filename>.iterations)")
+    parser.add_argument("--fresh", action="store_true", help="Discard finished iterations and start over")
+    parser.add_argument("--topic", default="AI LLMs", help="Value for {topic} (default: AI LLMs)")
+    parser.add_argument("--year", default=None, help="Value for {current_year} (default: this year)")
+    args = parser.parse_args(argv)
+    
+    if args.n_iterations < 1:
+        parser.error("n_iterations must be at least 1")
+    
+    inputs = {"topic": args.topic, "current_year": args.year or str(datetime.now().year)}
+    trainer = ParallelTrainer(args.n_iterations, args.filename, inputs, args.workers, args.seed, state_dir=args.state_dir)
+    if args.fresh and trainer.state_dir.exists():
+        for path in trainer.state_dir.glob("*.json"):
+            path.unlink()
+    
+    def on_iteration(iteration: int, error: Optional[Exception]):
+        if error is None:
+            print(f"+ Iteration {iteration + 1}/{args.n_iterations} done")
+        else:
+            print(f"* ERROR: Iteration {iteration + 1}/{args.n_iterations} failed: {error}", file=sys.stderr)
+    
+    summary = trainer.run(on_iteration)
+    if summary["resumed"]:
+        print(f"- Resumed: {summary['resumed']} iterations were already done")
+    print(f"+ Trained {', '.join(summary['agents']) or 'no agents'} -> {args.filename}")
+    return summary
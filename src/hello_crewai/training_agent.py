@@ -0,0 +1,89 @@
+"""
+Training agents: record training feedback per iteration instead of in crewAI's shared file
+"""
+import threading
+from typing import List, Optional
+
+from crewai import Agent
+from crewai.agents.crew_agent_executor import CrewAgentExecutor
+from crewai.tools import BaseTool
+from crewai.utilities.agent_utils import get_tool_names, parse_tools, render_text_description_and_args
+from crewai.utilities.prompts import Prompts
+from crewai.utilities.token_counter_callback import TokenCalcHandler
+from pydantic import PrivateAttr
+
+from .training import IterationRecorder
+
+# Concurrent iterations take turns at the feedback prompt
+_prompt_lock = threading.Lock()
+
+class TrainingAgentExecutor(CrewAgentExecutor):
+    """Executor whose training feedback goes to the agent's IterationRecorder"""
+    
+    def _ask_human_input(self, final_answer: str) -> str:
+        recorder = self.agent._training_recorder
+        if recorder.feedback is not None:
+            return recorder.feedback(recorder.iteration, self.agent.role, final_answer)
+        with _prompt_lock:
+            print(f"\n# Training iteration {recorder.iteration + 1}: {self.agent.role}")
+            return super()._ask_human_input(final_answer)
+    
+    def _handle_crew_training_output(self, result, human_feedback: Optional[str] = None) -> None:
+        self.agent._training_recorder.record(self.agent.role, result.output, human_feedback)
+
+class TrainingAgent(Agent):
+    """Agent that can record training feedback for its own iteration
+    
+    crewAI keeps training data in one pickle file in the working directory,
+    which concurrent iterations would overwrite. With a recorder attached, the
+    agent's executor records into it instead and earlier feedback is not added
+    to the prompt, so each iteration runs on its own. Without one it behaves
+    like Agent.
+    """
+    
+    _training_recorder: Optional[IterationRecorder] = PrivateAttr(default=None)
+    
+    def create_agent_executor(self, tools: Optional[List[BaseTool]] = None, task=None) -> None:
+        if self._training_recorder is None:
+            return super().create_agent_executor(tools=tools, task=task)
+    
+        # Agent.create_agent_executor, building a TrainingAgentExecutor instead
+        raw_tools: List[BaseTool] = tools or self.tools or []
+        parsed_tools = parse_tools(raw_tools)
+        prompt = Prompts(
+            agent=self,
+            has_tools=len(raw_tools) > 0,
+            i18n=self.i18n,
+            use_system_prompt=self.use_system_prompt,
+            system_template=self.system_template,
+            prompt_template=self.prompt_template,
+            response_template=self.response_template,
+        ).task_execution()
+        stop_words = [self.i18n.slice("observation")]
+        if self.response_template:
+            stop_words.append(self.response_template.split("{{ .Response }}")[1].strip())
+    
+        self.agent_executor = TrainingAgentExecutor(
+            llm=self.llm,
+            task=task,
+            agent=self,
+            crew=self.crew,
+            tools=parsed_tools,
+            prompt=prompt,
+            original_tools=raw_tools,
+            stop_words=stop_words,
+            max_iter=self.max_iter,
+            tools_handler=self.tools_handler,
+            tools_names=get_tool_names(parsed_tools),
+            tools_description=render_text_description_and_args(parsed_tools),
+            step_callback=self.step_callback,
+            function_calling_llm=self.function_calling_llm,
+            respect_context_window=self.respect_context_window,
+            request_within_rpm_limit=self._rpm_controller.check_or_wait if self._rpm_controller else None,
+            callbacks=[TokenCalcHandler(self._token_process)],
+        )
+    
+    def _training_handler(self, task_prompt: str) -> str:
+        if self._training_recorder is not None:
+            return task_prompt
+        return super()._training_handler(task_prompt)
@@ -0,0 +1,189 @@
+"""
+Shared HTTP transport for all LM Studio traffic: pooled keep-alive connections per endpoint
+"""
+import socket
+import threading
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+class _AbortableBackend(httpcore.SyncBackend):
+    """Network backend that remembers its sockets, so a blocked read can be interrupted"""
+    
+    def __init__(self):
+        self.sockets: List[socket.socket] = []
+    
+    def connect_tcp(self, *args, **kwargs):
+        stream = super().connect_tcp(*args, **kwargs)
+        self.sockets = [sock for sock in self.sockets if sock.fileno() != -1]
+        self.sockets.append(stream.get_extra_info("socket"))
+        return stream
+    
+    def abort(self):
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+class DedicatedClient(httpx.Client):
+    """httpx client whose request in flight can be aborted from another thread"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # httpx takes no network backend, so it is set on the transport's connection pool
+        self._backend = _AbortableBackend()
+        self._transport._pool._network_backend = self._backend
+    
+    def abort(self):
+        """Drop the connection and close the client
+    
+        Closing alone doesn't wake a thread blocked reading the response; shutting
+        the socket down does, and LM Studio sees the disconnect and stops generating.
+        """
+    
+        self._backend.abort()
+        self.close()
+
+class Transport:
+    """Keep-alive httpx clients, one per endpoint, shared by the crew LLM and the scripts
+    
+    Up to `pool_size` idle connections are kept open per endpoint, and
+    `max_connections` (unlimited by default) caps concurrent ones. Every request
+    uses `connect_timeout` to connect; completions use the model's `timeout` for
+    reads and other requests (model lists, health checks) use `read_timeout`.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_connections: Optional[int] = None,
+        http2: bool = False,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        keepalive_expiry: float = 30.0,
+    ):
+        self.pool_size = pool_size
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._openai_clients: Dict[Tuple[str, str], Any] = {}
+        self._dedicated: Dict[Tuple[str, str], List[Tuple[Any, httpx.Client]]] = {}
+        
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                warnings.warn("HTTP/2 needs the 'h2' package (pip install httpx[http2]); using HTTP/1.1")
+                self.http2 = False
+    
+    def timeout(self, read_timeout: Optional[float] = None) -> httpx.Timeout:
+        """Timeout with the shared connect limit and the given (or default) read limit"""
+        
+        return httpx.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+    
+    def client(self, base_url: str) -> httpx.Client:
+        """The pooled client for an endpoint"""
+        
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            if base_url not in self._clients:
+                self._clients[base_url] = httpx.Client(
+                    http2=self.http2,
+                    timeout=self.timeout(),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.pool_size,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ),
+                )
+            return self._clients[base_url]
+    
+    def openai_client(self, base_url: str, api_key: str):
+        """OpenAI SDK client for an endpoint, sending requests over its pooled connections"""
+        
+        from openai import OpenAI
+        
+        base_url = base_url.rstrip("/")
+        client = self.client(base_url)
+        with self._lock:
+            key = (base_url, api_key)
+            if key not in self._openai_clients:
+                self._openai_clients[key] = OpenAI(base_url=base_url, api_key=api_key, http_client=client)
+            return self._openai_clients[key]
+    
+    def dedicated_openai_client(self, base_url: str, api_key: str):
+        """OpenAI SDK client on a connection of its own, plus its httpx client
+        
+        For requests that may be abandoned: aborting the httpx client drops the
+        connection, so LM Studio stops generating, without touching the pool.
+        A client handed back open with release_dedicated() is reused, so these
+        requests still get a warm connection.
+        """
+        
+        from openai import OpenAI
+        
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            idle = self._dedicated.get((base_url, api_key), [])
+            while idle:
+                openai_client, client = idle.pop()
+                if not client.is_closed:
+                    return openai_client, client
+        client = DedicatedClient(
+            http2=self.http2,
+            timeout=self.timeout(),
+            limits=httpx.Limits(max_connections=1, keepalive_expiry=self.keepalive_expiry),
+        )
+        return OpenAI(base_url=base_url, api_key=api_key, http_client=client), client
+    
+    def release_dedicated(self, base_url: str, api_key: str, openai_client: Any, client: httpx.Client):
+        """Keep a dedicated client for reuse (up to `pool_size` per endpoint) unless it was closed"""
+    
+        if client.is_closed:
+            return
+        with self._lock:
+            idle = self._dedicated.setdefault((base_url.rstrip("/"), api_key), [])
+            if len(idle) < self.pool_size:
+                idle.append((openai_client, client))
+                return
+        client.close()
+    
+    def close(self):
+        """Close every pooled connection"""
+        
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            for idle in self._dedicated.values():
+                for _, client in idle:
+                    client.close()
+            self._clients.clear()
+            self._openai_clients.clear()
+            self._dedicated.clear()
+
+_transports: Dict[tuple, Transport] = {}
+_transports_lock = threading.Lock()
+
+def get_transport(http_config: Optional[Dict[str, Any]] = None) -> Transport:
+    """Return the shared transport described by an [http] config table"""
+    
+    http_config = http_config or {}
+    key = tuple(sorted(http_config.items()))
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = Transport(
+                pool_size=http_config.get("pool_size", 10),
+                max_connections=http_config.get("max_connections"),
+                http2=http_config.get("http2", False),
+                connect_timeout=http_config.get("connect_timeout", 5.0),
+                read_timeout=http_config.get("read_timeout", 30.0),
+                keepalive_expiry=http_config.get("keepalive_expiry", 30.0),
+            )
+        return _transports[key]
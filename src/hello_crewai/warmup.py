@@ -0,0 +1,141 @@
+"""
+Model warm-up: tiny completions that make LM Studio load models before the crew needs them
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+WARMUP_MESSAGES = [{"role": "user", "content": "Hi"}]
+
+_first_calls = set()
+_first_calls_lock = threading.Lock()
+
+def claim_first_call(base_url: str, model_name: str) -> bool:
+    """True the first time this process calls a model on an endpoint (a cold start)"""
+    
+    key = (base_url.rstrip("/"), model_name)
+    with _first_calls_lock:
+        if key in _first_calls:
+            return False
+        _first_calls.add(key)
+        return True
+
+def release_first_call(base_url: str, model_name: str):
+    """Undo claim_first_call() after a failed call, so the next call still counts as cold"""
+    
+    with _first_calls_lock:
+        _first_calls.discard((base_url.rstrip("/"), model_name))
+
+def warm_model(model_name: str, base_url: str, api_key: str, transport, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one single-token completion and report how long it took"""
+    
+    cold = claim_first_call(base_url, model_name)
+    start = time.perf_counter()
+    error = None
+    try:
+        response = transport.client(base_url).post(
+            f"{base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {api_key}"},
+            json={"model": model_name, "messages": WARMUP_MESSAGES, "max_tokens": 1, "temperature": 0},
+            timeout=transport.timeout(timeout),
+        )
+        if response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    if error is not None and cold:
+        # The model may not have loaded, so the first real call keeps the cold start treatment
+        release_first_call(base_url, model_name)
+    
+    return {
+        "model": model_name,
+        "base_url": base_url,
+        "ok": error is None,
+        "cold": cold,
+        "latency_s": round(time.perf_counter() - start, 4),
+        "error": error,
+    }
+
+def warmup_targets(models: Dict[str, Dict[str, Any]], endpoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Every (model, endpoint) pair to warm: each model on each endpoint that serves it
+    
+    `models` maps model keys to get_model_config() entries and `endpoints` comes
+    from get_endpoints(); endpoints without a `models` list are assumed to serve all.
+    """
+    
+    targets = []
+    for model_key, model_config in models.items():
+        name = model_config["name"]
+        for endpoint in endpoints:
+            served = endpoint.get("models")
+            if served and name not in served and name.split("/", 1)[-1] not in served:
+                continue
+            targets.append({
+                "model_key": model_key,
+                "model_name": name,
+                "base_url": endpoint["base_url"],
+                "api_key": endpoint["api_key"],
+                "timeout": model_config.get("timeout"),
+            })
+    return targets
+
+class Warmup:
+    """Warm several models in background threads while the caller carries on"""
+    
+    def __init__(
+        self,
+        targets: List[Dict[str, Any]],
+        transport,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        preload: Optional[Callable[[], None]] = None,
+    ):
+        self.targets = targets
+        self.transport = transport
+        self.on_result = on_result
+        self.preload = preload
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+    
+    def start(self) -> "Warmup":
+        if self.preload is not None:
+            thread = threading.Thread(target=self.preload, name="lm-studio-preload", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        for target in self.targets:
+            thread = threading.Thread(target=self._warm, args=(target,), name="lm-studio-warmup", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+    
+    def _warm(self, target: Dict[str, Any]):
+        result = warm_model(
+            target["model_name"], target["base_url"], target["api_key"], self.transport, target["timeout"]
+        )
+        result["model_key"] = target["model_key"]
+        with self._lock:
+            self.results.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds for all warm-ups; True if they all finished"""
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.done
+    
+    @property
+    def done(self) -> bool:
+        return not any(thread.is_alive() for thread in self._threads)
+
+def print_warmup(result: Dict[str, Any]):
+    """Print the outcome of one warm-up completion"""
+    
+    label = result.get("model_key") or result["model"]
+    if result["ok"]:
+        kind = "cold start" if result["cold"] else "already warm"
+        print(f"+ Warmed up {label} on {result['base_url']}: {result['latency_s']:.2f}s ({kind})")
+    else:
+        print(f"- Warm-up failed for {label} on {result['base_url']}: {result['error']}")
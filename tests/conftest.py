@@ -0,0 +1,7 @@
+"""
+Shared pytest setup: keep crew runs against the local stub offline
+"""
+import os
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Adaptive Timeout Test
+
+This test verifies that:
+1. Latency histograms report bucketed percentiles and fade old samples
+2. Deadlines scale with max_tokens, stay within the floor and the static ceiling, and persist across runs
+3. A completion that hangs on a model with recorded history is cut off at its adaptive deadline
+
+Usage:
+    python -m pytest tests/test_adaptive_timeouts.py
+
+No LM Studio instance is required; completions come from a local stub.
+"""
+import sys
+import os
+import time
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.timeouts import AdaptiveTimeouts, LatencyHistogram
+
+CONFIG = """[settings]
+default_model = "local"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[http]
+enabled = true
+
+[adaptive_timeouts]
+enabled = true
+path = "{path}"
+min_samples = 3
+margin = 2.0
+min_timeout_s = 0.5
+
+[models.local]
+name = "stub-model"
+timeout = 30
+"""
+
+def test_histogram():
+    histogram = LatencyHistogram(max_count=100)
+    for value in range(1, 101):
+        histogram.add(value / 100)
+    # Buckets are about 10% wide and percentiles report their upper bound
+    assert 0.5 <= histogram.quantile(50) <= 0.55
+    assert 0.99 <= histogram.quantile(99) <= 1.1
+    assert LatencyHistogram().quantile(99) is None
+    
+    histogram.add(1.0)
+    assert histogram.total <= 60
+
+def test_deadlines(tmp_path):
+    path = str(tmp_path / "histograms.json")
+    timeouts = AdaptiveTimeouts(path=path, min_samples=5, margin=2.0, min_timeout=1.0)
+    assert timeouts.deadline("model", 120) == 120
+    
+    for _ in range(5):
+        timeouts.record("model", 2.0, 100)
+    per_token = timeouts.summary("model")["seconds_per_token"]
+    assert 0.02 <= per_token <= 0.022
+    # The usual output length when no max_tokens is given, the requested one otherwise
+    assert timeouts.deadline("model", 120) == pytest.approx(2 * per_token * timeouts.summary("model")["output_tokens"])
+    assert timeouts.deadline("model", 120, max_tokens=1000) == pytest.approx(2 * per_token * 1000)
+    assert timeouts.deadline("model", 10, max_tokens=1000) == 10
+    assert timeouts.deadline("model", 120, max_tokens=1) == 1.0
+    
+    timeouts.record_timeout("model", 5.0, 100)
+    timeouts.save()
+    reloaded = AdaptiveTimeouts(path=path, min_samples=5)
+    assert reloaded.summary("model")["samples"] == 6 and reloaded.summary("model")["timeouts"] == 1
+
+def test_hung_completion_cut_off(tmp_path):
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    with StubLMStudio(models=["stub-model"], latency=0.05) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url, path=tmp_path / "histograms.json"))
+        llm = build_llm(get_model_config("local", str(config_path)), str(config_path), "local")
+        
+        # The first call is a cold start and is not sampled
+        for _ in range(4):
+            assert llm.call("Say hello")
+        assert llm.adaptive_timeouts.summary("local")["samples"] == 3
+        
+        stub.latency = 4.0
+        start = time.perf_counter()
+        with pytest.raises(Exception):
+            llm.call("Say hello again")
+        assert time.perf_counter() - start < 2.0
+        assert llm.adaptive_timeouts.summary("local")["timeouts"] == 1
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Batch Kickoff Test
+
+This test verifies that:
+1. Topics are read from a file-like object, skipping blanks and comments
+2. Results are emitted in input order (or as they finish when unordered)
+3. A failing topic is reported without stopping the rest of the batch
+4. No more than `concurrency` crews run at the same time
+
+Usage:
+    python -m pytest tests/test_batch.py
+
+No LM Studio instance is required; crews are replaced with a stub.
+"""
+import asyncio
+import io
+import json
+import threading
+import time
+
+from hello_crewai import batch
+
+class FakeOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+class FakeCrew:
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    
+    def kickoff(self, inputs):
+        with self.lock:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+        try:
+            # Later topics finish first, so ordering has to be restored
+            time.sleep(0.05 / (1 + int(inputs["topic"].split()[-1])))
+            if inputs["topic"].endswith(" 2"):
+                raise RuntimeError("model crashed")
+            return FakeOutput(f"report on {inputs['topic']} ({inputs['current_year']})")
+        finally:
+            with self.lock:
+                self.state["active"] -= 1
+    
+    async def kickoff_async(self, inputs):
+        return await asyncio.to_thread(self.kickoff, inputs)
+
+def run_batch(topics, **kwargs):
+    FakeCrew.state.update(active=0, peak=0)
+    results = []
+    summary = asyncio.run(batch.run_topics(topics, results.append, crew_factory=FakeCrew, current_year="2026", **kwargs))
+    return results, summary
+
+def test_read_topics():
+    stream = io.StringIO("AI LLMs\n\n# comment\n  Robotics  \n")
+    assert list(batch.read_topics(stream)) == ["AI LLMs", "Robotics"]
+
+def test_ordered_output_with_error_isolation():
+    topics = [f"topic {i}" for i in range(6)]
+    results, summary = run_batch(topics, concurrency=3)
+    
+    assert [r["index"] for r in results] == list(range(6))
+    assert results[0]["output"] == "report on topic 0 (2026)"
+    assert results[2]["status"] == "error" and "model crashed" in results[2]["error"]
+    assert summary == {"total": 6, "ok": 5, "error": 1}
+    assert FakeCrew.state["peak"] <= 3
+    json.dumps(results)
+
+def test_unordered_output():
+    topics = [f"topic {i}" for i in range(6)]
+    results, summary = run_batch(topics, concurrency=6, ordered=False)
+    
+    assert sorted(r["index"] for r in results) == list(range(6))
+    assert [r["index"] for r in results] != list(range(6))
+    assert summary["total"] == 6
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Task Checkpoint Test
+
+This test verifies that:
+1. A second run with the same inputs reuses every task's output without calling the model
+2. Editing only reporting_task re-runs just that task
+3. Changing the inputs re-runs research_task and, through its output, reporting_task
+
+Usage:
+    python -m pytest tests/test_checkpoints.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[checkpoints]
+enabled = true
+directory = "{directory}"
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+"""
+
+def test_checkpointed_runs(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(latency=0, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url, directory=tmp_path / "checkpoints"))
+        
+        def run(topic="AI LLMs", reporting_suffix=""):
+            crew_base = HelloCrewai(config_path=str(config_path))
+            crew_base.tasks_config["reporting_task"]["description"] += reporting_suffix
+            before = stub.stats["completions"]
+            output = crew_base.crew().kickoff(inputs={"topic": topic, "current_year": "2026"})
+            return output, stub.stats["completions"] - before
+        
+        first, calls = run()
+        assert calls == 2
+        
+        second, calls = run()
+        assert calls == 0
+        assert second.raw == first.raw
+        assert [task.raw for task in second.tasks_output] == [task.raw for task in first.tasks_output]
+        assert (tmp_path / "report.md").read_text() == first.raw
+        
+        _, calls = run(reporting_suffix=" Add a title.")
+        assert calls == 1
+        
+        _, calls = run(topic="Vector databases")
+        assert calls == 2
+    
+    assert len(list((tmp_path / "checkpoints").glob("*.json"))) == 5
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Config Loader Cache Test
+
+This test verifies that:
+1. .env.toml is parsed once and reused while the file is unchanged
+2. The file is re-parsed when it changes on disk
+3. Snapshots are read-only while load_config() still returns a mutable copy
+
+Usage:
+    python -m pytest tests/test_config_loader.py
+"""
+import sys
+import os
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path to import config_loader
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'hello_crewai'))
+
+import config_loader
+
+CONFIG = """
+[settings]
+default_model = "phi3-mini"
+
+[lm_studio]
+base_url = "http://localhost:1234/v1"
+api_key = "lm-studio"
+
+[models.phi3-mini]
+name = "openai/phi-3-mini-4k-instruct"
+timeout = 120
+description = "Fast"
+"""
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / ".env.toml"
+    path.write_text(CONFIG)
+    yield str(path)
+    config_loader.invalidate_config_cache()
+
+def test_snapshot_is_cached(config_file, monkeypatch):
+    first = config_loader.load_config_snapshot(config_file)
+    
+    calls = []
+    monkeypatch.setattr(config_loader.toml, "load", lambda *a, **k: calls.append(a))
+    
+    assert config_loader.load_config_snapshot(config_file) is first
+    assert config_loader.get_current_model(config_file) == "phi3-mini"
+    assert config_loader.get_model_config(config_path=config_file)["timeout"] == 120
+    assert calls == []
+
+def test_reloads_when_file_changes(config_file):
+    assert config_loader.get_current_model(config_file) == "phi3-mini"
+    
+    path = Path(config_file)
+    path.write_text(CONFIG.replace('default_model = "phi3-mini"', 'default_model = "other"'))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    
+    assert config_loader.get_current_model(config_file) == "other"
+
+def test_snapshot_is_read_only(config_file):
+    snapshot = config_loader.load_config_snapshot(config_file)
+    with pytest.raises(TypeError):
+        snapshot["settings"]["default_model"] = "changed"
+    
+    config = config_loader.load_config(config_file)
+    config["settings"]["default_model"] = "changed"
+    model_config = config_loader.get_model_config(config_path=config_file)
+    model_config["timeout"] = 1
+    
+    assert config_loader.get_current_model(config_file) == "phi3-mini"
+    assert config_loader.get_model_config(config_path=config_file)["timeout"] == 120
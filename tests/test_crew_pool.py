@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Crew Pool Test
+
+This test verifies that:
+1. A template finds the inputs its YAML needs and rejects kickoffs missing any of them
+2. Clones keep each task on its routed model without sharing agents with the template
+3. Pooled kickoffs against the stub reuse crews and don't carry state between runs
+4. Growing a pool lets more crews run at once
+
+Usage:
+    python -m pytest tests/test_crew_pool.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+import threading
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+
+CONFIG = """[settings]
+default_model = "small"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[routing.agents]
+researcher = "large"
+reporting_analyst = "large"
+
+[routing.tasks]
+research_task = "small"
+
+[models.small]
+name = "stub-small"
+timeout = 30
+
+[models.large]
+name = "stub-large"
+timeout = 30
+"""
+
+INPUTS = {"topic": "AI LLMs", "current_year": "2026"}
+
+@pytest.fixture
+def template(tmp_path, monkeypatch):
+    from hello_crewai.crew_pool import CrewTemplate
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(models=["stub-small", "stub-large"], latency=0, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        yield CrewTemplate(config_path=str(config_path))
+
+def test_template_inputs_and_clone(template):
+    assert template.required_inputs == {"topic"}
+    template.validate_inputs(INPUTS)
+    with pytest.raises(ValueError, match="topic"):
+        template.validate_inputs({"current_year": "2026"})
+    
+    clone = template.clone()
+    models = {task.name: task.agent.llm.model for task in clone.tasks}
+    assert models == {"research_task": "openai/stub-small", "reporting_task": "openai/stub-large"}
+    for original, copied in zip(template.crew.tasks, clone.tasks):
+        assert copied is not original
+        assert copied.agent is not original.agent
+    # Agent copies share the template's connection pool rather than opening new ones
+    assert clone.tasks[1].agent.llm.transport is template.crew.tasks[1].agent.llm.transport
+
+def test_pooled_kickoffs(template):
+    from hello_crewai.crew_pool import CrewPool
+    
+    pool = CrewPool(template, size=1)
+    first = pool.kickoff(INPUTS)
+    second = pool.kickoff(INPUTS)
+    
+    assert pool.created == 1 and pool.reused == 1
+    assert first.raw and second.raw
+    # Token usage is per kickoff, not accumulated on the reused agents
+    assert first.token_usage.total_tokens > 0
+    assert second.token_usage.total_tokens == first.token_usage.total_tokens
+    
+    with pool.crew() as crew:
+        assert all(task.output is None for task in crew.tasks)
+    
+    with pytest.raises(ValueError):
+        pool.kickoff({"current_year": "2026"})
+    # The template itself never runs
+    assert all(task.output is None for task in template.crew.tasks)
+
+def test_pool_grows(template):
+    from hello_crewai.crew_pool import CrewPool
+    
+    pool = CrewPool(template, size=1)
+    pool.grow(2)
+    pool.grow(1)
+    assert pool.size == 2
+    
+    second_checked_out = threading.Event()
+    
+    def check_out():
+        with pool.crew():
+            second_checked_out.set()
+    
+    with pool.crew():
+        # With only one crew allowed this would wait for the first to come back
+        threading.Thread(target=check_out, daemon=True).start()
+        assert second_checked_out.wait(timeout=5)
+    assert pool.created == 2
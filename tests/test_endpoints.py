@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Multi-Endpoint Load Balancing Test
+
+This test verifies that:
+1. Requests go to the endpoint with the fewest outstanding requests that serves the model
+2. Endpoints are ejected after repeated failures and restored by a passing health check
+3. A crew run fails over transparently when one configured endpoint is down
+4. Throughput scales with the number of endpoints when each host serves one request at a time
+5. A stream that breaks before its first chunk fails over, one that breaks later is not restarted
+
+Usage:
+    python -m pytest tests/test_endpoints.py
+
+No LM Studio instance is required; the crew runs against local stubs.
+"""
+import sys
+import os
+import time
+
+import pytest
+from crewai.utilities.events import crewai_event_bus
+
+# Add scripts directory to path to import the stub and benchmark
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+import benchmark
+from hello_crewai.endpoints import Endpoint, EndpointPool
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+api_key = "stub"
+health_check_interval = 0
+
+[[lm_studio.endpoints]]
+base_url = "{dead_url}"
+
+[[lm_studio.endpoints]]
+base_url = "{live_url}"
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+"""
+
+def test_least_outstanding_and_model_filter():
+    a = Endpoint("http://a/v1", "key")
+    b = Endpoint("http://b/v1", "key")
+    c = Endpoint("http://c/v1", "key", models=["other-model"])
+    pool = EndpointPool([a, b, c], health_check_interval=0)
+    
+    first = pool.acquire("stub-model")
+    second = pool.acquire("stub-model")
+    assert {first, second} == {a, b}
+    
+    pool.release(first)
+    assert pool.acquire("stub-model") is first
+    assert pool.acquire("openai/other-model") is c
+    assert pool.acquire("missing", exclude=[a, b]) is None
+
+def test_ejection_and_health_check():
+    with StubLMStudio(models=["stub-model"]) as stub:
+        live = Endpoint(stub.base_url, "key")
+        dead = Endpoint("http://127.0.0.1:9/v1", "key")
+        pool = EndpointPool([dead, live], max_failures=2, eject_seconds=60, health_check_interval=0)
+        
+        for _ in range(2):
+            endpoint = pool.acquire("stub-model", exclude=[live])
+            pool.release(endpoint, ok=False)
+        assert dead.is_ejected(time.monotonic())
+        assert [pool.acquire("stub-model") for _ in range(3)] == [live] * 3
+        
+        pool.check_health()
+        assert live.discovered == {"stub-model"}
+        assert not live.serves("other-model")
+        assert dead.is_ejected(time.monotonic())
+        
+        # With every endpoint ejected, requests still go somewhere
+        live.ejected_until = time.monotonic() + 60
+        assert pool.acquire("stub-model") is not None
+
+def test_crew_fails_over_to_live_endpoint(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(latency=0, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(dead_url="http://127.0.0.1:9/v1", live_url=stub.base_url))
+        
+        crew_base = HelloCrewai(config_path=str(config_path))
+        result = crew_base.crew().kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+        
+        assert result.raw
+        assert stub.stats["completions"] == 2
+    
+    endpoints = {e["base_url"]: e for e in crew_base.llm_config.endpoint_pool.stats()}
+    assert endpoints["http://127.0.0.1:9/v1"]["failures"] >= 1
+    assert endpoints[stub.base_url]["outstanding"] == 0
+
+def test_throughput_scales_with_endpoints():
+    kwargs = dict(latency=0.2, tokens_per_sec=0, completion_tokens=10, failure_rate=0, slots=1)
+    one = benchmark.run_benchmark(levels=[4], runs_per_level=4, endpoints=1, **kwargs)
+    two = benchmark.run_benchmark(levels=[4], runs_per_level=4, endpoints=2, **kwargs)
+    
+    assert one["levels"][0]["errors"] == 0 and two["levels"][0]["errors"] == 0
+    assert [r["completions"] for r in two["stub"]["requests"]] == [4, 4]
+    assert two["levels"][0]["throughput_crews_per_s"] > one["levels"][0]["throughput_crews_per_s"] * 1.5
+
+def test_stream_fails_over_only_before_first_chunk(tmp_path, monkeypatch):
+    from crewai import LLM
+    from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+    from hello_crewai import streaming
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    # Chunks to stream before the next call's connection drops ("" = drop before any)
+    drops = []
+    stream_handler = LLM._handle_streaming_response
+    
+    def dropping_stream(self, params, callbacks=None, available_functions=None):
+        if drops:
+            chunk = drops.pop()
+            if chunk:
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=chunk))
+            raise ConnectionError("Stream dropped")
+        return stream_handler(self, params, callbacks, available_functions)
+    
+    monkeypatch.setattr(LLM, "_handle_streaming_response", dropping_stream)
+    monkeypatch.setattr(streaming, "_monitor", None)
+    with crewai_event_bus.scoped_handlers(), StubLMStudio() as first, StubLMStudio() as second:
+        config_path = tmp_path / ".env.toml"
+        config = CONFIG.format(dead_url=first.base_url, live_url=second.base_url)
+        config_path.write_text(config + "\n[streaming]\nenabled = true\n")
+        llm = build_llm(get_model_config("stub", str(config_path)), str(config_path), "stub")
+        
+        drops.append("")
+        assert llm.call("Say hello")
+        assert first.stats["completions"] + second.stats["completions"] == 1
+        
+        # The "\n" already reached stream listeners; a retry would stream the answer after it
+        drops.append("\n")
+        with pytest.raises(ConnectionError):
+            llm.call("Say hello again")
+        assert first.stats["completions"] + second.stats["completions"] == 1
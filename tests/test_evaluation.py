@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Parallel Evaluation Test
+
+This test verifies that:
+1. Evaluator replies are parsed into scores and numbers are summarised into distributions
+2. Iterations of several models run concurrently across endpoints with paired seeds
+3. The report aggregates latencies, token usage and scores per model
+
+Usage:
+    python -m pytest tests/test_evaluation.py
+
+No LM Studio instance is required; the crew runs against local stubs.
+"""
+import sys
+import os
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.evaluation import Evaluation, distribution, iteration_seed, parse_score
+
+CONFIG = """[settings]
+default_model = "small"
+
+[lm_studio]
+endpoints = [{{ base_url = "{first}" }}, {{ base_url = "{second}" }}]
+api_key = "stub"
+
+[models.small]
+name = "stub-small"
+timeout = 30
+
+[models.large]
+name = "stub-large"
+timeout = 30
+"""
+
+INPUTS = {"topic": "AI LLMs", "current_year": "2026"}
+
+class FakeEvaluator:
+    def __init__(self):
+        self.prompts = []
+    
+    def call(self, messages):
+        self.prompts.append(messages[0]["content"])
+        return '{"quality": 8}' if "researcher" in messages[0]["content"].lower() else "I'd give it a 6 out of 10"
+
+def test_scores_and_distributions():
+    assert parse_score('{"quality": 7.5}') == 7.5
+    assert parse_score("Score: 9/10") == 9.0
+    assert parse_score("no idea") is None
+    assert iteration_seed(42, 1) == iteration_seed(42, 1) != iteration_seed(42, 2)
+    
+    stats = distribution([1.0, 2.0, 3.0, None])
+    assert stats["count"] == 3 and stats["mean"] == 2.0 and stats["p50"] == 2.0 and stats["max"] == 3.0
+    assert distribution([]) == {"count": 0}
+
+def test_parallel_evaluation_of_two_models(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    models = ["stub-small", "stub-large"]
+    with StubLMStudio(models=models, latency=0.1, completion_tokens=10) as first, \
+            StubLMStudio(models=models, latency=0.1, completion_tokens=10) as second:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(first=first.base_url, second=second.base_url))
+        
+        evaluator = FakeEvaluator()
+        evaluation = Evaluation(["small", "large"], 3, evaluator, INPUTS, workers=4, config_path=str(config_path))
+        report = evaluation.run()
+        
+        # Concurrent iterations are balanced over both endpoints
+        assert first.stats["completions"] > 0 and second.stats["completions"] > 0
+        assert first.stats["peak_active"] + second.stats["peak_active"] > 2
+    
+    assert set(report["models"]) == {"small", "large"}
+    for stats in report["models"].values():
+        assert stats["ok"] == 3 and stats["errors"] == 0
+        assert stats["latency_s"]["count"] == 3
+        assert stats["tokens"]["total_tokens"] > 0 and stats["tokens_per_iteration"]["count"] == 3
+        assert set(stats["task_latency_s"]) == {"research_task", "reporting_task"}
+        assert stats["scores"]["research_task"]["mean"] == 8.0
+        assert stats["scores"]["reporting_task"]["mean"] == 6.0
+        assert stats["crew_score"]["mean"] == 7.0
+    
+    # Both models ran every iteration with the same seed
+    seeds = {(run["model"], run["iteration"]): run["seed"] for run in report["runs"]}
+    assert all(seeds[("small", i)] == seeds[("large", i)] for i in range(1, 4))
+    assert len(evaluator.prompts) == 12
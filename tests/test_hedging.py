@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Hedged Request Test
+
+This test verifies that:
+1. The hedge delay follows the recorded latency percentile, with a floor and a fallback delay
+2. A slow completion is raced on another endpoint and the fast answer wins; the losing
+   request's connection is closed, the winner's is kept for reuse
+3. A slow model is raced against the configured fallback model
+4. The hedge rate cap limits how many requests are duplicated
+
+Usage:
+    python -m pytest tests/test_hedging.py
+
+No LM Studio instance is required; completions come from local stubs.
+"""
+import sys
+import os
+import time
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.hedging import Hedger
+from hello_crewai.model_stats import ModelStats
+
+CONFIG = """[settings]
+default_model = "slow"
+
+[lm_studio]
+{endpoints}
+api_key = "stub"
+
+[hedging]
+enabled = true
+delay_s = 0.3
+min_delay_s = 0.1
+max_rate = {max_rate}
+{fallback}
+
+[models.slow]
+name = "slow-model"
+timeout = 30
+
+[models.fast]
+name = "fast-model"
+timeout = 30
+"""
+
+def build(tmp_path, endpoints, max_rate=1.0, fallback=""):
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    config_path = tmp_path / ".env.toml"
+    config_path.write_text(CONFIG.format(endpoints=endpoints, max_rate=max_rate, fallback=fallback))
+    return build_llm(get_model_config("slow", str(config_path)), str(config_path), "slow")
+
+def track_dedicated_clients(llm):
+    """Record the httpx clients leased for hedged requests, in order"""
+    
+    clients = []
+    open_client = llm.transport.dedicated_openai_client
+    
+    def dedicated_openai_client(base_url, api_key):
+        openai_client, http_client = open_client(base_url, api_key)
+        clients.append(http_client)
+        return openai_client, http_client
+    
+    llm.transport.dedicated_openai_client = dedicated_openai_client
+    return clients
+
+def timed_call(llm):
+    start = time.perf_counter()
+    response = llm.call("Say hello")
+    return response, time.perf_counter() - start
+
+def test_hedge_delay(tmp_path):
+    stats = ModelStats(path=str(tmp_path / "stats.json"))
+    hedger = Hedger(stats, percentile=80, min_samples=10, min_delay=0.5)
+    assert hedger.delay_for("model") is None
+    
+    for latency in range(1, 11):
+        stats.record("model", float(latency))
+    assert hedger.delay_for("model") == 8.0
+    assert Hedger(stats, min_delay=20, min_samples=10).delay_for("model") == 20
+    assert Hedger(stats, min_samples=50, delay=2.0, min_delay=0.5).delay_for("model") == 2.0
+
+def test_hedge_to_other_endpoint(tmp_path):
+    models = ["slow-model"]
+    with StubLMStudio(models=models, latency=3.0) as slow, StubLMStudio(models=models, latency=0.05) as fast:
+        endpoints = f'endpoints = [{{ base_url = "{slow.base_url}" }}, {{ base_url = "{fast.base_url}" }}]'
+        llm = build(tmp_path, endpoints)
+        llm.endpoint_pool.check_health()
+        clients = track_dedicated_clients(llm)
+        
+        response, elapsed = timed_call(llm)
+        assert response and elapsed < 1.5
+        assert llm.hedger.stats()["hedge_wins"] == 1
+        assert slow.stats["completions"] == 1 and fast.stats["completions"] == 1
+        # The abandoned request is not held against the slow endpoint
+        assert all(endpoint.failures == 0 for endpoint in llm.endpoint_pool.endpoints)
+        # The stalled primary's connection was closed, the hedge's kept for the next request
+        assert len(clients) == 2 and clients[0].is_closed and not clients[1].is_closed
+
+def test_hedge_to_fallback_model_with_rate_cap(tmp_path):
+    with StubLMStudio(models=["slow-model", "fast-model"], model_latency={"slow-model": 1.5, "fast-model": 0.05}) as stub:
+        llm = build(tmp_path, f'base_url = "{stub.base_url}"', max_rate=0.5, fallback='fallback_model = "fast"')
+        clients = track_dedicated_clients(llm)
+        
+        results = [timed_call(llm) for _ in range(4)]
+        stats = llm.hedger.stats()
+        assert stats["requests"] == 4 and stats["hedged"] == 2 and stats["hedge_wins"] == 2
+        # Hedged requests return in about the delay, the others take the slow model's full latency
+        assert sorted(elapsed < 1.0 for _, elapsed in results) == [False, False, True, True]
+        # Each hedged request lost its primary's connection; the others went back to the transport
+        assert len(clients) == 6 and len({id(client) for client in clients if client.is_closed}) == 2
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Knowledge Index Test
+
+This test verifies that:
+1. Text is chunked by paragraph, and long paragraphs into overlapping windows
+2. The index persists, and a sync only embeds chunks whose content changed; each save
+   writes a new index file that the manifest names, replacing the old one
+3. Search returns the most relevant chunk, with the LM Studio embedder as well
+4. A crew with [knowledge] enabled gives its agents the search tool
+
+Usage:
+    python -m pytest tests/test_knowledge.py
+
+No LM Studio instance is required; embeddings come from the local stub.
+"""
+import sys
+import os
+import json
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.knowledge import HashEmbedder, KnowledgeIndex, LMStudioEmbedder, chunk_text
+from hello_crewai.transport import Transport
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self):
+        super().__init__(256)
+        self.embedded = 0
+    
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return super().embed(texts)
+
+def write_knowledge(directory):
+    directory.mkdir(exist_ok=True)
+    (directory / "user.txt").write_text("User name is John Doe.\n\nUser is based in San Francisco, California.\n")
+    (directory / "notes.md").write_text("The team ships a release every Friday.\n")
+
+def test_chunk_text():
+    assert chunk_text("one two\n\nthree\n\n\nfour", chunk_chars=100) == ["one two\n\nthree\n\nfour"]
+    assert chunk_text("alpha\n\nbeta", chunk_chars=8) == ["alpha", "beta"]
+    
+    long = " ".join(f"word{i}" for i in range(50))
+    chunks = chunk_text(long, chunk_chars=60, overlap=15)
+    assert len(chunks) > 1 and all(len(chunk) <= 60 for chunk in chunks)
+    # Consecutive windows share their boundary words
+    for before, after in zip(chunks, chunks[1:]):
+        assert before.split()[-1] in after.split()
+
+def test_incremental_sync(tmp_path):
+    knowledge = tmp_path / "knowledge"
+    write_knowledge(knowledge)
+    index_dir = tmp_path / "index"
+    
+    embedder = CountingEmbedder()
+    index = KnowledgeIndex(knowledge, index_dir, embedder, chunk_chars=50)
+    assert index.sync() == {"chunks": 3, "embedded": 3, "removed": 0, "unchanged": 0}
+    assert index.search("where is the user based?", k=1)[0]["text"] == "User is based in San Francisco, California."
+    
+    # A new process loads the saved index and embeds nothing
+    embedder = CountingEmbedder()
+    index = KnowledgeIndex(knowledge, index_dir, embedder, chunk_chars=50)
+    assert len(index) == 3
+    assert index.sync()["embedded"] == 0 and embedder.embedded == 0
+    
+    (knowledge / "notes.md").write_text("The team ships a release every Monday.\n")
+    assert index.sync() == {"chunks": 3, "embedded": 1, "removed": 1, "unchanged": 2}
+    assert embedder.embedded == 1
+    top = index.search("when does the team ship a release", k=2)
+    assert top[0]["source"] == "notes.md" and "Monday" in top[0]["text"]
+    
+    (knowledge / "user.txt").unlink()
+    assert index.sync()["removed"] == 2
+    assert [result["source"] for result in index.search("user name", k=4)] == ["notes.md"]
+    
+    # Another embedder means another vector space, so everything is embedded again
+    index = KnowledgeIndex(knowledge, index_dir, HashEmbedder(32), chunk_chars=50)
+    assert index.sync()["embedded"] == 1
+
+    # Each save writes a new index generation named in the manifest and drops the old one
+    manifest = json.loads((index_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(path.name for path in index_dir.iterdir()) == sorted(["manifest.json", manifest["index_file"]])
+
+def test_lm_studio_embedder_and_crew_tool(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    write_knowledge(tmp_path / "knowledge")
+    with StubLMStudio() as stub:
+        embedder = LMStudioEmbedder("stub-embed", stub.base_url, "stub", Transport(), batch_size=2)
+        index = KnowledgeIndex(tmp_path / "knowledge", tmp_path / "lm_index", embedder, chunk_chars=50)
+        assert index.sync()["embedded"] == 3
+        assert stub.stats["embeddings"] == 3
+        # The stub's vectors are per exact text, so an exact chunk is its own best match
+        assert index.search("The team ships a release every Friday.", k=1)[0]["score"] > 0.99
+        
+        (tmp_path / ".env.toml").write_text(
+            f'[lm_studio]\nbase_url = "{stub.base_url}"\n\n'
+            '[models.stub]\nname = "stub-model"\ntimeout = 30\n\n'
+            '[settings]\ndefault_model = "stub"\n\n'
+            '[knowledge]\nenabled = true\nindex_dir = "crew_index"\n'
+        )
+        crew = HelloCrewai(config_path=str(tmp_path / ".env.toml")).crew()
+    
+    for agent in crew.agents:
+        assert [tool.name for tool in agent.tools] == ["Search knowledge base"]
+    assert "San Francisco" in crew.agents[0].tools[0].run(query="Where is the user based?")
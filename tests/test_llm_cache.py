@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Test
+
+This test verifies that:
+1. Equivalent prompts map to the same cache key, different sampling params do not
+2. The cache evicts least recently used entries and expired entries
+3. The crew LLM serves repeated completions from the cache without calling LM Studio
+
+Usage:
+    python -m pytest tests/test_llm_cache.py
+"""
+import time
+
+from crewai import LLM
+
+from hello_crewai.llm import LMStudioLLM
+from hello_crewai.llm_cache import ResponseCache, make_cache_key
+
+MESSAGES = [{"role": "user", "content": "Summarize AI LLMs  \r\n"}]
+
+def test_cache_key_normalization():
+    key = make_cache_key("openai/phi", MESSAGES, {"temperature": 0})
+    
+    assert key == make_cache_key("openai/phi", [{"role": "user", "content": "Summarize AI LLMs"}], {"temperature": 0})
+    assert key == make_cache_key("openai/phi", "Summarize AI LLMs", {"temperature": 0, "stop": []})
+    assert key != make_cache_key("openai/phi", MESSAGES, {"temperature": 0.7})
+    assert key != make_cache_key("openai/gemma", MESSAGES, {"temperature": 0})
+
+def test_lru_and_age_eviction(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("a", "m", "A")
+    time.sleep(0.01)
+    cache.put("b", "m", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # "a" is now more recently used than "b"
+    cache.put("c", "m", "C")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    
+    cache.max_age_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+def test_bypass_skips_reads(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), bypass=True)
+    cache.put("a", "m", "A")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 1
+
+def test_llm_serves_repeats_from_cache(tmp_path, monkeypatch):
+    calls = []
+    
+    def fake_completion(self, params, callbacks=None, available_functions=None):
+        calls.append(params)
+        return "fresh answer"
+    
+    monkeypatch.setattr(LLM, "_handle_non_streaming_response", fake_completion)
+    
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    llm = LMStudioLLM(model="openai/phi", base_url="http://stub/v1", api_key="key", temperature=0, response_cache=cache)
+    
+    assert llm.call(MESSAGES) == "fresh answer"
+    assert llm.call(MESSAGES) == "fresh answer"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
@@ -15,14 +15,14 @@ The test uses the model configured in .env.toml under [settings.default_model].
 
 import sys
 import os
-import requests
 import json
 
 # Add src directory to path to import config_loader
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'hello_crewai'))
 
 try:
-    from config_loader import get_model_config, get_current_model
+    from config_loader import get_model_config, get_current_model, get_config_section
+    from transport import get_transport
 except ImportError:
     print("* ERROR: Could not import config_loader. Make sure config_loader.py exists in src/hello_crewai/")
     sys.exit(1)
@@ -48,9 +48,11 @@ def test_lm_studio():
         return False
     
     try:
-        # Test if LM Studio is running
+        # Test if LM Studio is running (over the same pooled connection as the completion)
+        transport = get_transport(get_config_section("http"))
+        client = transport.client(base_url)
         health_url = f"{base_url}/models"
-        response = requests.get(health_url, timeout=5)
+        response = client.get(health_url, timeout=transport.timeout(5))
         
         if response.status_code == 200:
             models = response.json()
@@ -69,11 +71,11 @@ def test_lm_studio():
             }
             
             print(f"\n- Testing chat completion with {model_name}...")
-            completion_response = requests.post(
+            completion_response = client.post(
                 completion_url,
                 headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=timeout
+                content=json.dumps(payload),
+                timeout=transport.timeout(timeout)
             )
             
             if completion_response.status_code == 200:
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Model Routing Test
+
+This test verifies that:
+1. Task routes win over agent routes, which win over the automatic router
+2. The automatic router picks the cheapest model meeting the latency and quality targets
+3. A crew run against the stub uses the routed model for each task and records its latency
+4. Recorded latency percentiles use the nearest rank, also for even-length samples
+
+Usage:
+    python -m pytest tests/test_routing.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.model_stats import ModelStats, percentile
+from hello_crewai.routing import ModelRouter
+
+MODELS = {
+    "small": {"name": "small", "quality": 1},
+    "medium": {"name": "medium", "quality": 2, "cost": 5},
+    "large": {"name": "large", "quality": 3},
+}
+
+CONFIG = """[settings]
+default_model = "small"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[model_stats]
+enabled = true
+path = "{stats_path}"
+
+[routing.agents]
+researcher = "large"
+reporting_analyst = "large"
+
+[routing.tasks]
+research_task = "small"
+
+[models.small]
+name = "stub-small"
+timeout = 30
+
+[models.large]
+name = "stub-large"
+timeout = 30
+"""
+
+def make_stats(tmp_path, samples):
+    stats = ModelStats(path=str(tmp_path / "stats.json"))
+    for model_key, latency in samples.items():
+        for _ in range(5):
+            stats.record(model_key, latency)
+    return stats
+
+def test_percentile_nearest_rank():
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile(list(range(1, 21)), 100) == 20
+    assert percentile([3.0, 1.0], 50) == 1.0
+    assert percentile([7.0], 1) == 7.0
+    assert percentile([], 50) is None
+
+def test_explicit_routes_take_precedence(tmp_path):
+    stats = make_stats(tmp_path, {"small": 1.0, "medium": 1.0, "large": 1.0})
+    router = ModelRouter(
+        {"agents": {"researcher": "large"}, "tasks": {"summary_task": "medium"}, "auto": {"enabled": True}},
+        MODELS, "small", stats,
+    )
+    
+    assert router.model_for_agent("researcher") == "large"
+    assert router.model_for_agent("reporting_analyst") == "small"
+    assert router.model_for_task("summary_task", "researcher") == ("medium", "routing.tasks")
+    assert router.model_for_task("research_task", "researcher") == ("large", "routing.agents")
+    assert router.model_for_task("reporting_task", "reporting_analyst")[1] == "auto"
+    
+    with pytest.raises(ValueError):
+        ModelRouter({"tasks": {"research_task": "missing"}}, MODELS, "small")
+
+def test_auto_router_targets(tmp_path):
+    stats = make_stats(tmp_path, {"small": 0.5, "medium": 2.0, "large": 8.0})
+    auto = {
+        "enabled": True,
+        "max_latency_s": 10,
+        "tasks": {"reporting_task": {"min_quality": 2}, "research_task": {"min_quality": 3, "max_latency_s": 4}},
+    }
+    router = ModelRouter({"auto": auto}, MODELS, "small", stats)
+    
+    # Explicit cost (5) beats large's p50 (8) once small is excluded by quality
+    assert router.model_for_task("reporting_task", None) == ("medium", "auto")
+    assert router.model_for_task("other_task", None) == ("small", "auto")
+    # No model meets both targets, so the default is used
+    assert router.model_for_task("research_task", None) == ("small", "default")
+    
+    # Without samples the automatic router stays out of the way
+    empty = ModelRouter({"auto": auto}, MODELS, "small", ModelStats(path=str(tmp_path / "empty.json")))
+    assert empty.model_for_task("reporting_task", None) == ("small", "default")
+
+def test_routed_crew_run(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    stats_path = tmp_path / "model_stats.json"
+    with StubLMStudio(models=["stub-small", "stub-large"], latency=0, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url, stats_path=stats_path))
+        
+        crew_base = HelloCrewai(config_path=str(config_path))
+        crew = crew_base.crew()
+        crew.kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+    
+    models = {t.name: t.agent.llm.model for t in crew.tasks}
+    assert models == {"research_task": "openai/stub-small", "reporting_task": "openai/stub-large"}
+    # The research task runs on a copy of the researcher; the crew's agent keeps its model
+    assert crew.tasks[0].agent is not crew_base.researcher()
+    assert crew_base.researcher().llm.model == "openai/stub-large"
+    
+    stats = crew_base.router.stats
+    for model_key in ("large", "small"):
+        summary = stats.summary(model_key)
+        assert summary["samples"] + summary["cold_samples"] >= 1
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+DAG Scheduler Test
+
+This test verifies that:
+1. Dependencies come from explicit `context`, defaulting to all earlier tasks; cycles are rejected
+2. The critical path is the longest chain of dependent task durations
+3. Independent branches run concurrently against the stub, unless endpoint capacity forbids it
+4. The project's crew runs through the scheduler when [scheduler] is enabled
+5. Parallelism and endpoint capacity below one are rejected when the crew is built
+
+Usage:
+    python -m pytest tests/test_scheduler.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+
+import pytest
+from crewai import Agent, Process, Task
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.scheduler import DagCrew, build_dag, critical_path
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[scheduler]
+enabled = true
+max_parallel = 4
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+"""
+
+def make_task(name, context=None, agent=None):
+    kwargs = {} if context is None else {"context": context}
+    return Task(name=name, description=f"Write about {name}", expected_output="A sentence", agent=agent, **kwargs)
+
+def test_build_dag_and_critical_path():
+    a = make_task("a", [])
+    b = make_task("b", [])
+    c = make_task("c", [a, b])
+    d = make_task("d")
+    assert build_dag([a, b, c, d]) == [set(), set(), {0, 1}, {0, 1, 2}]
+    
+    assert critical_path([set(), set(), {0, 1}], [1.0, 3.0, 0.5]) == (3.5, [1, 2])
+    assert critical_path([], []) == (0.0, [])
+    
+    a.context = [b]
+    b.context = [a]
+    with pytest.raises(ValueError, match="cycle"):
+        build_dag([a, b])
+
+def branching_crew(config_path, **kwargs):
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    llm = build_llm(get_model_config(config_path=config_path), config_path, "stub")
+    agent = Agent(role="Researcher", goal="Research", backstory="Researcher", llm=llm)
+    first = make_task("branch_one", [], agent)
+    second = make_task("branch_two", [], agent)
+    merge = make_task("merge", [first, second], agent)
+    return DagCrew(agents=[agent], tasks=[first, second, merge], process=Process.sequential, **kwargs)
+
+def test_limits_must_allow_a_task(tmp_path):
+    with StubLMStudio() as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        
+        with pytest.raises(ValueError, match="endpoint_capacity must be at least 1"):
+            branching_crew(str(config_path), endpoint_capacity=0)
+        with pytest.raises(ValueError, match="max_parallel must be at least 1"):
+            branching_crew(str(config_path), max_parallel=-1)
+
+def test_branches_run_concurrently(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(latency=0.4, completion_tokens=5) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        
+        crew = branching_crew(str(config_path))
+        output = crew.kickoff()
+        schedule = crew.schedule
+        assert [task.name for task in output.tasks_output] == ["branch_one", "branch_two", "merge"]
+        assert schedule["peak_parallel"] == 2
+        assert schedule["critical_path"][-1] == "merge" and len(schedule["critical_path"]) == 2
+        assert schedule["wall_s"] < schedule["serial_s"] - 0.25
+        
+        # One task per endpoint at a time: the branches queue behind each other
+        limited = branching_crew(str(config_path), endpoint_capacity=1)
+        limited.kickoff()
+        assert limited.schedule["peak_parallel"] == 1
+        assert limited.schedule["wall_s"] >= limited.schedule["serial_s"] - 0.05
+        
+        # The copy used by the crew pool keeps the scheduler
+        assert isinstance(limited.copy(), DagCrew) and limited.copy().endpoint_capacity == 1
+        
+        project = HelloCrewai(config_path=str(config_path)).crew()
+        assert isinstance(project, DagCrew)
+        project.kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+        assert project.schedule["critical_path"] == ["research_task", "reporting_task"]
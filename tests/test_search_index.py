@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Document Search Test
+
+This test verifies that:
+1. BM25 ranks rarer and more frequent query terms higher
+2. The index persists with memory-mapped postings and only re-reads changed files; postings
+   that don't match the manifest are rebuilt instead of read
+3. Lookups on a few thousand documents take well under a millisecond on average
+4. The search tool formats results for agents
+
+Usage:
+    python -m pytest tests/test_search_index.py
+"""
+import json
+import random
+import time
+
+import numpy as np
+
+from hello_crewai.search_index import SearchIndex, tokenize
+from hello_crewai.tools.custom_tool import DocumentSearchTool
+
+def write_docs(directory):
+    directory.mkdir(exist_ok=True)
+    (directory / "gpu.txt").write_text("GPU inference on local hardware.\n\nQuantized GPU models run on a laptop GPU.\n")
+    (directory / "agents.md").write_text("Agents call tools to ground their answers.\n")
+    (directory / "skip.json").write_text('{"not": "indexed"}')
+
+def test_bm25_ranking(tmp_path):
+    write_docs(tmp_path / "docs")
+    index = SearchIndex(tmp_path / "docs", tmp_path / "index", chunk_chars=50)
+    assert index.sync() == {"documents": 3, "files_indexed": 2, "files_removed": 0}
+    
+    assert tokenize("The Agents and the tools") == ["agents", "tools"]
+    results = index.search("gpu models")
+    assert [r["text"] for r in results] == [
+        "Quantized GPU models run on a laptop GPU.",
+        "GPU inference on local hardware.",
+    ]
+    assert results[0]["score"] > results[1]["score"] > 0
+    assert index.search("agents")[0]["source"] == "agents.md"
+    assert index.search("unknown words") == [] and index.search("the") == []
+
+def test_incremental_and_persistent(tmp_path):
+    docs = tmp_path / "docs"
+    write_docs(docs)
+    SearchIndex(docs, tmp_path / "index", chunk_chars=50).sync()
+    
+    index = SearchIndex(docs, tmp_path / "index", chunk_chars=50)
+    assert isinstance(index._postings, np.memmap)
+    assert index.sync()["files_indexed"] == 0
+    assert index.search("laptop")[0]["source"] == "gpu.txt"
+    
+    (docs / "agents.md").write_text("Agents delegate work to a laptop.\n")
+    assert index.sync() == {"documents": 3, "files_indexed": 1, "files_removed": 0}
+    assert {r["source"] for r in index.search("laptop")} == {"gpu.txt", "agents.md"}
+    assert index.search("ground") == []
+    
+    (docs / "gpu.txt").unlink()
+    assert index.sync() == {"documents": 1, "files_indexed": 0, "files_removed": 1}
+    assert index.search("gpu") == []
+    
+    reloaded = SearchIndex(docs, tmp_path / "index", chunk_chars=50)
+    assert len(reloaded) == 1 and reloaded.search("delegate")[0]["source"] == "agents.md"
+
+    # Only the postings file the manifest names is kept, and a damaged one means a full re-index
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(path.name for path in (tmp_path / "index").iterdir()) == sorted(["manifest.json", manifest["postings_file"]])
+    with open(tmp_path / "index" / manifest["postings_file"], "ab") as f:
+        f.write(b"\0" * 8)
+    damaged = SearchIndex(docs, tmp_path / "index", chunk_chars=50)
+    assert len(damaged) == 0 and damaged.sync()["files_indexed"] == 1
+    assert damaged.search("delegate")[0]["source"] == "agents.md"
+
+def test_lookup_speed_and_tool(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    for f in range(40):
+        paragraphs = [" ".join(rng.choices(vocabulary, k=40)) for _ in range(100)]
+        (docs / f"doc{f}.txt").write_text("\n\n".join(paragraphs))
+    index = SearchIndex(docs, tmp_path / "index", chunk_chars=400)
+    assert index.sync()["documents"] == 4000
+    
+    queries = [" ".join(rng.choices(vocabulary, k=3)) for _ in range(200)]
+    start = time.perf_counter()
+    for query in queries:
+        assert index.search(query, k=5)
+    assert (time.perf_counter() - start) / len(queries) < 0.001
+    
+    tool = DocumentSearchTool(index=index, top_k=2)
+    output = tool.run(query=queries[0])
+    assert output.count("[doc") == 2
+    assert DocumentSearchTool(index=index).run(query="nothing here") == "No matching passages found."
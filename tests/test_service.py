@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Crew Service Test
+
+This test verifies that:
+1. Jobs are accepted with 202, run by priority, and their status and output can be polled
+2. A full queue answers 429 with Retry-After, and bad requests (including a bad Content-Length) answer 400/404
+3. The service runs real jobs on warm pooled crews against the stub
+
+Usage:
+    python -m pytest tests/test_service.py
+
+No LM Studio instance is required; crews are replaced with a stub or run against the local stub.
+"""
+import asyncio
+import sys
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.service import CrewService
+
+class FakeOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+class FakePool:
+    def __init__(self):
+        self.gate = threading.Event()
+        self.order = []
+    
+    def kickoff(self, inputs):
+        self.gate.wait(5)
+        self.order.append(inputs["topic"])
+        if inputs["topic"] == "broken":
+            raise RuntimeError("model crashed")
+        return FakeOutput(f"report on {inputs['topic']}")
+
+@contextmanager
+def running(service):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(service.start("127.0.0.1", 0), loop).result(60)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{service.port}", timeout=10) as client:
+            yield client
+    finally:
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+def wait_done(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_priority_queue_and_backpressure():
+    pool = FakePool()
+    with running(CrewService(crew_pool=pool, workers=1, max_queue=3)) as client:
+        first = client.post("/jobs", json={"topic": "first"})
+        assert first.status_code == 202 and first.headers["Location"] == f"/jobs/{first.json()['id']}"
+        # Wait until the worker holds the first job, so the rest queue up
+        while client.get("/health").json()["running"] == 0:
+            time.sleep(0.01)
+        
+        low = client.post("/jobs", json={"topic": "low", "priority": -1}).json()["id"]
+        broken = client.post("/jobs", json={"topic": "broken"}).json()["id"]
+        high = client.post("/jobs", json={"topic": "high", "priority": 5, "current_year": 2030}).json()["id"]
+        
+        full = client.post("/jobs", json={"topic": "one too many"})
+        assert full.status_code == 429 and int(full.headers["Retry-After"]) >= 1
+        assert client.get("/health").json()["queued"] == 3
+        
+        assert client.post("/jobs", json={"title": "no topic"}).status_code == 400
+        assert client.post("/jobs", content=b"not json").status_code == 400
+        assert client.get("/jobs/unknown").status_code == 404
+        assert client.get("/jobs").status_code == 405
+        
+        pool.gate.set()
+        done = wait_done(client, high)
+        assert done["output"] == "report on high" and done["inputs"]["current_year"] == "2030"
+        assert done["queue_wait_s"] >= 0 and done["run_s"] >= 0
+        assert wait_done(client, broken)["error"] == "RuntimeError: model crashed"
+        wait_done(client, low)
+        assert pool.order == ["first", "high", "broken", "low"]
+        
+        health = client.get("/health").json()
+        assert health["completed"] == 3 and health["failed"] == 1 and health["rejected"] == 1
+
+CONFIG = """[settings]
+default_model = "local"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[models.local]
+name = "stub-model"
+timeout = 30
+"""
+
+def raw_request(port, request):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(request)
+        return sock.makefile("rb").readline()
+
+def test_invalid_content_length_and_queue_size():
+    service = CrewService(crew_pool=FakePool(), workers=1)
+    with running(service) as client:
+        for length in (b"abc", b"-5"):
+            status = raw_request(service.port, b"POST /jobs HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            assert status.startswith(b"HTTP/1.1 400")
+        # The server keeps serving after a bad request
+        assert client.get("/health").status_code == 200
+    
+    with pytest.raises(ValueError, match="max_queue"):
+        CrewService(max_queue=0)
+
+def test_jobs_on_warm_crews(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(models=["stub-model"], latency=0, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        service = CrewService(workers=2, config_path=str(config_path))
+        with running(service) as client:
+            ids = [client.post("/jobs", json={"topic": f"topic {i}"}).json()["id"] for i in range(4)]
+            jobs = [wait_done(client, job_id) for job_id in ids]
+        
+        assert all(job["status"] == "done" and job["output"] for job in jobs)
+        # Four jobs, at most two crews built
+        assert service.crew_pool.created <= 2 and service.crew_pool.reused >= 2
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Request Coalescing Test
+
+This test verifies that:
+1. Concurrent identical calls run once and share the result (or the error)
+2. Identical pooled kickoffs running at once share one crew run, including inputs that differ only in whitespace
+3. Identical concurrent LLM completions send one request to LM Studio
+
+Usage:
+    python -m pytest tests/test_single_flight.py
+
+No LM Studio instance is required; completions come from the local stub.
+"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.single_flight import SingleFlight, get_single_flight
+
+CONFIG = """[settings]
+default_model = "small"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[coalescing]
+enabled = true
+
+[models.small]
+name = "stub-small"
+timeout = 30
+"""
+
+def run_together(n, call):
+    """Run call(i) on n threads released at the same moment"""
+    
+    barrier = threading.Barrier(n)
+    
+    def run(i):
+        barrier.wait()
+        return call(i)
+    
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return list(executor.map(run, range(n)))
+
+def test_single_flight():
+    flight = SingleFlight("test")
+    executions = []
+    
+    def slow(value):
+        executions.append(value)
+        time.sleep(0.3)
+        return value
+    
+    results = run_together(4, lambda i: flight.do("key", lambda: slow(i)))
+    assert len(executions) == 1 and results == [executions[0]] * 4
+    stats = flight.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 3 and stats["in_flight"] == 0
+    assert stats["saved_seconds"] >= 0.9
+    
+    # Sequential calls don't share anything
+    assert flight.do("key", lambda: "again") == "again"
+    
+    def failing():
+        time.sleep(0.3)
+        raise RuntimeError("boom")
+    
+    errors = []
+    
+    def call(i):
+        try:
+            flight.do("error", failing)
+        except RuntimeError as e:
+            errors.append(e)
+    
+    run_together(3, call)
+    assert len(errors) == 3 and len({id(e) for e in errors}) == 1
+    
+    assert get_single_flight("crews", {"enabled": False}) is None
+    assert get_single_flight("crews", {"enabled": True, "crews": False}) is None
+
+def test_coalesced_kickoffs(tmp_path, monkeypatch):
+    from hello_crewai.crew_pool import CrewPool, CrewTemplate
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(models=["stub-small"], latency=0.3, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        template = CrewTemplate(config_path=str(config_path))
+        # LLM coalescing is left out so only kickoffs are shared
+        for task in template.crew.tasks:
+            task.agent.llm.single_flight = None
+        pool = CrewPool(template, size=3, single_flight=SingleFlight("crews"))
+        
+        topics = ["AI LLMs", "  AI   LLMs ", "AI LLMs"]
+        outputs = run_together(3, lambda i: pool.kickoff({"topic": topics[i], "current_year": "2026"}))
+        assert len({id(output) for output in outputs}) == 1
+        assert pool.single_flight.stats()["coalesced"] == 2
+        # One crew ran: one completion per task
+        assert stub.stats["completions"] == len(template.crew.tasks)
+        
+        assert template.kickoff_key({"topic": "AI LLMs"}) != template.kickoff_key({"topic": "AI"})
+
+def test_coalesced_llm_calls(tmp_path):
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    with StubLMStudio(models=["stub-small"], latency=0.3) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        llm = build_llm(get_model_config("small", str(config_path)), str(config_path), "small")
+        llm.single_flight = SingleFlight("llm")
+        
+        responses = run_together(3, lambda i: llm.call("Say hello"))
+        assert len(set(responses)) == 1 and responses[0]
+        assert stub.stats["completions"] == 1
+        assert llm.single_flight.stats()["coalesced"] == 2
+        
+        llm.call("Say something else")
+        assert stub.stats["completions"] == 2
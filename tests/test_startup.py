@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Test
+
+This test verifies that:
+1. --help, config and model switching commands never import crewAI or litellm
+2. Importing hello_crewai.main doesn't pull in the crew
+3. Those commands start within a generous cold-start budget
+
+Usage:
+    python -m pytest tests/test_startup.py
+
+For detailed timings run: python scripts/startup_benchmark.py
+"""
+import sys
+import os
+
+# Add scripts directory to path to import the startup benchmark
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import startup_benchmark
+
+def test_light_commands_skip_heavy_imports():
+    results, failures = startup_benchmark.run_checks(repeat=1, budget_ms=3000)
+    
+    assert failures == []
+    assert set(results) == {name for name, _ in startup_benchmark.LIGHT_COMMANDS}
+    for result in results.values():
+        assert result["heavy_modules"] == []
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Streaming Mode Test
+
+This test verifies that:
+1. Only the agent's final answer is streamed into the output file, not its reasoning
+2. The output file is moved into place atomically with the final task output
+3. A streaming crew run against the stub records time-to-first-token for every task
+
+Usage:
+    python -m pytest tests/test_streaming.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.streaming import TaskStream
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[streaming]
+enabled = true
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+description = "Local stub"
+"""
+
+def test_task_stream_writes_only_final_answer(tmp_path):
+    target = tmp_path / "report.md"
+    finished = []
+    stream = TaskStream("reporting_task", str(target), finished.append)
+    
+    stream.on_task_started(0.0)
+    stream.on_call_started(0.0)
+    for i, chunk in enumerate(["Thought: I now", " can answer\nFinal ", "Answer: - point", " one", "\n- point two"]):
+        stream.on_chunk(chunk, 0.5 + i * 0.1)
+    
+    assert not target.exists()
+    assert stream.writer.tmp_path.read_text() == "- point one\n- point two"
+    
+    stream.finish("- point one\n- point two", 1.0)
+    assert target.read_text() == "- point one\n- point two"
+    assert not stream.writer.tmp_path.exists()
+    
+    metrics = finished[0]
+    assert metrics["ttft_s"] == 0.5
+    assert metrics["tokens"] == 5
+    assert round(metrics["tokens_per_sec"], 3) == 10.0
+
+def test_streaming_crew_run(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(latency=0.05, tokens_per_sec=500, completion_tokens=20) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        
+        crew_base = HelloCrewai(config_path=str(config_path))
+        result = crew_base.crew().kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+    
+    report = (tmp_path / "report.md").read_text()
+    assert report == result.raw
+    assert not list(tmp_path.glob(".report.md.*.partial"))
+    
+    assert [m["task"] for m in crew_base.stream_metrics] == ["research_task", "reporting_task"]
+    for metrics in crew_base.stream_metrics:
+        assert metrics["ttft_s"] is not None and metrics["ttft_s"] >= 0.05
+        assert metrics["tokens"] > 1
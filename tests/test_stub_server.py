@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Stub LM Studio + Benchmark Test
+
+This test verifies that:
+1. The stub serves /v1/models and /v1/chat/completions like LM Studio
+2. Streaming completions and injected failures behave as configured
+3. The real HelloCrewai crew runs end to end against the stub in the benchmark harness
+
+Usage:
+    python -m pytest tests/test_stub_server.py
+
+No LM Studio instance is required.
+"""
+import sys
+import os
+import json
+
+import requests
+
+# Add scripts directory to path to import the stub and benchmark
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio, ANSWER_PREFIX
+import benchmark
+
+def test_models_and_completions():
+    with StubLMStudio(models=["stub-model"], latency=0, completion_tokens=5) as stub:
+        models = requests.get(f"{stub.base_url}/models", timeout=5).json()
+        assert [m["id"] for m in models["data"]] == ["stub-model"]
+        
+        payload = {"model": "stub-model", "messages": [{"role": "user", "content": "Hello"}]}
+        response = requests.post(f"{stub.base_url}/chat/completions", json=payload, timeout=5)
+        assert response.status_code == 200
+        content = response.json()["choices"][0]["message"]["content"]
+        assert content.startswith(ANSWER_PREFIX)
+        assert response.json()["usage"]["completion_tokens"] == len(content.split(" "))
+        
+        missing = requests.post(f"{stub.base_url}/chat/completions", json={"model": "nope"}, timeout=5)
+        assert missing.status_code == 404
+
+def test_streaming_and_failures():
+    with StubLMStudio(latency=0, completion_tokens=5, tokens_per_sec=0) as stub:
+        payload = {"model": "stub-model", "messages": [{"role": "user", "content": "Hi"}], "stream": True}
+        response = requests.post(f"{stub.base_url}/chat/completions", json=payload, stream=True, timeout=5)
+        chunks = [line[6:] for line in response.iter_lines(decode_unicode=True) if line.startswith("data: ")]
+        assert chunks[-1] == "[DONE]"
+        text = "".join(json.loads(c)["choices"][0]["delta"].get("content", "") for c in chunks[:-1])
+        assert text == stub.completion_text(payload["messages"])
+    
+    with StubLMStudio(latency=0, failure_rate=1.0) as stub:
+        payload = {"model": "stub-model", "messages": [{"role": "user", "content": "Hi"}]}
+        response = requests.post(f"{stub.base_url}/chat/completions", json=payload, timeout=5)
+        assert response.status_code == 500
+        assert stub.stats["failures"] == 1
+
+def test_benchmark_runs_real_crew():
+    report = benchmark.run_benchmark(
+        levels=[1, 2], runs_per_level=2, latency=0, tokens_per_sec=0, completion_tokens=10, failure_rate=0
+    )
+    
+    assert [level["concurrency"] for level in report["levels"]] == [1, 2]
+    for level in report["levels"]:
+        assert level["errors"] == 0, level["error_samples"]
+        assert level["crew_latency_s"]["count"] == 2
+        assert set(level["task_latency_s"]) == {"research_task", "reporting_task"}
+    assert report["stub"]["requests"]["completions"] >= 8
+    json.dumps(report)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Model Sync Test
+
+This test verifies that:
+1. Concurrent validation returns the same results as the sequential path
+2. Validation runs in parallel when a concurrency limit is given
+3. The sync options (-j/--concurrency, --reprofile) are parsed correctly
+4. Profiling measures load time, time-to-first-token and tokens/sec and derives the timeout
+5. `switch_model.py list` sorts and filters models by their measured speed
+
+Usage:
+    python -m pytest tests/test_sync_models.py
+
+No LM Studio instance is required; model validation is replaced with a stub.
+"""
+import itertools
+import sys
+import os
+import subprocess
+import time
+import threading
+
+import pytest
+
+# Add scripts directory to path to import sync_models
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import sync_models
+from stub_lm_studio import StubLMStudio
+
+MODEL_IDS = [f"model-{i}" for i in range(8)]
+
+@pytest.fixture
+def slow_validate(monkeypatch):
+    """Replace validate_model with a slow stub that tracks parallelism"""
+    
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    
+    def fake_validate(model_id, base_url, api_key, session=None):
+        assert session is not None
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return not model_id.endswith("3")
+    
+    monkeypatch.setattr(sync_models, "validate_model", fake_validate)
+    return state
+
+def test_concurrent_matches_sequential(slow_validate):
+    sequential = sync_models.validate_models(MODEL_IDS, "http://stub/v1", "key", concurrency=1)
+    assert slow_validate["peak"] == 1
+    
+    concurrent = sync_models.validate_models(MODEL_IDS, "http://stub/v1", "key", concurrency=4)
+    assert slow_validate["peak"] == 4
+    
+    assert {k: v[0] for k, v in sequential.items()} == {k: v[0] for k, v in concurrent.items()}
+    assert concurrent["model-3"][0] is False
+    assert all(latency >= 0.05 for _, latency in concurrent.values())
+
+def test_parse_sync_options():
+    assert sync_models.parse_sync_options([]) == (1, False)
+    assert sync_models.parse_sync_options(["-j", "8"]) == (8, False)
+    assert sync_models.parse_sync_options(["--concurrency=3", "--reprofile"]) == (3, True)
+    
+    with pytest.raises(ValueError):
+        sync_models.parse_sync_options(["-j", "0"])
+    with pytest.raises(ValueError):
+        sync_models.parse_sync_options(["--bogus"])
+
+def fake_clock():
+    """Validation takes 0.5s, the stream's first token 0.2s, then one token every 10ms"""
+    
+    times = itertools.chain([0.0, 0.5, 1.0], (1.2 + 0.01 * i for i in itertools.count()))
+    return lambda: next(times)
+
+def test_profile_model_and_timeout():
+    with StubLMStudio(latency=0, tokens_per_sec=0, completion_tokens=30) as stub:
+        profile = sync_models.profile_model("stub-model", stub.base_url, "key", clock=fake_clock())
+        missing = sync_models.profile_model("missing", stub.base_url, "key")
+    
+    assert profile["passed"] and not missing["passed"]
+    assert profile["load_s"] == 0.3
+    assert profile["ttft_s"] == 0.2
+    assert profile["tokens_per_sec"] == 100.0
+    
+    model_config = sync_models.apply_profile({"name": "stub-model", "timeout": 300}, profile)
+    assert model_config["ttft_s"] == profile["ttft_s"]
+    # 2048 tokens at 100 tok/s, doubled
+    assert 40 <= model_config["timeout"] <= 80
+    
+    assert sync_models.derive_timeout({"ttft_s": 1.0, "tokens_per_sec": None}) == sync_models.DEFAULT_TIMEOUT
+    assert sync_models.derive_timeout({"load_s": 0, "ttft_s": 0.01, "tokens_per_sec": 10000}) == sync_models.MIN_TIMEOUT
+    assert sync_models.derive_timeout({"load_s": 600, "ttft_s": 1, "tokens_per_sec": 1}) == sync_models.MAX_TIMEOUT
+
+def test_switch_model_list_by_speed(tmp_path):
+    (tmp_path / ".env.toml").write_text("""[settings]
+default_model = "slow"
+
+[models.slow]
+name = "slow"
+tokens_per_sec = 5.0
+ttft_s = 2.0
+
+[models.unprofiled]
+name = "unprofiled"
+
+[models.fast]
+name = "fast"
+tokens_per_sec = 50.0
+ttft_s = 0.5
+""")
+    script = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'switch_model.py')
+    
+    def listed(*args):
+        output = subprocess.run(
+            [sys.executable, script, "list", *args], cwd=tmp_path, capture_output=True, text=True, timeout=30
+        ).stdout
+        return [line.split(". ")[1].split(":")[0] for line in output.splitlines() if ". " in line]
+    
+    assert listed() == ["slow", "unprofiled", "fast"]
+    assert listed("--sort", "tps") == ["fast", "slow", "unprofiled"]
+    assert listed("--max-ttft", "1") == ["fast"]
+    assert listed("--sort", "ttft", "--min-tps", "1") == ["fast", "slow"]
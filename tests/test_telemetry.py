@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Telemetry Exporter Test
+
+This test verifies that:
+1. A crew run records one span per task with LLM call counts, tokens and latency split
+2. Spans are labelled with the agent's YAML key
+3. The Prometheus snapshot contains per-agent counters
+4. Sampling can switch recording off
+5. Hedged calls, which run on another thread, still record tokens and the queue/network split
+
+Usage:
+    python -m pytest tests/test_telemetry.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+import json
+
+from crewai.utilities.events import crewai_event_bus
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai import telemetry
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[telemetry]
+enabled = true
+
+{extra}
+[models.stub]
+name = "stub-model"
+timeout = 30
+description = "Local stub"
+"""
+
+def run_crew(tmp_path, monkeypatch, sample_rate, extra=""):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with crewai_event_bus.scoped_handlers():
+        collector = telemetry.TelemetryCollector(
+            spans_file=str(tmp_path / "spans.jsonl"),
+            metrics_file=str(tmp_path / "metrics.prom"),
+            sample_rate=sample_rate,
+        )
+        monkeypatch.setattr(telemetry, "_collector", collector)
+        
+        with StubLMStudio(latency=0.02, tokens_per_sec=0, completion_tokens=10) as stub:
+            config_path = tmp_path / ".env.toml"
+            config_path.write_text(CONFIG.format(base_url=stub.base_url, extra=extra))
+            HelloCrewai(config_path=str(config_path)).crew().kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+    return collector
+
+def test_spans_and_metrics(tmp_path, monkeypatch):
+    collector = run_crew(tmp_path, monkeypatch, sample_rate=1.0)
+    
+    spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    tasks = {span["task"]: span for span in spans if span["kind"] == "task"}
+    assert set(tasks) == {"research_task", "reporting_task"}
+    assert tasks["research_task"]["agent"] == "researcher"
+    assert tasks["reporting_task"]["agent"] == "reporting_analyst"
+    
+    for span in tasks.values():
+        assert span["status"] == "ok"
+        assert span["llm_calls"] >= 1
+        assert span["prompt_tokens"] > 0 and span["completion_tokens"] > 0
+        assert span["network_seconds"] >= 0.02
+        assert span["retries"] == 0
+    
+    calls = [span for span in spans if span["kind"] == "llm_call"]
+    assert {call["parent_id"] for call in calls} == {span["span_id"] for span in tasks.values()}
+    
+    metrics = (tmp_path / "metrics.prom").read_text()
+    assert 'hello_crewai_llm_calls_total{agent="researcher",task="research_task"' in metrics
+    assert "hello_crewai_task_duration_seconds_count" in metrics
+    assert collector.tasks_sampled == 2
+
+def test_sampling_off(tmp_path, monkeypatch):
+    collector = run_crew(tmp_path, monkeypatch, sample_rate=0.0)
+    
+    assert collector.tasks_seen == 2
+    assert collector.tasks_sampled == 0
+    assert not (tmp_path / "spans.jsonl").exists()
+
+def test_hedged_calls(tmp_path, monkeypatch):
+    # Every call goes through the hedger, with a delay no stub call reaches
+    run_crew(tmp_path, monkeypatch, sample_rate=1.0, extra="[hedging]\nenabled = true\ndelay_s = 30\nmin_samples = 1000\n")
+    
+    spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    calls = [span for span in spans if span["kind"] == "llm_call"]
+    assert calls
+    for call in calls:
+        assert call["prompt_tokens"] > 0 and call["completion_tokens"] > 0
+        # The dispatch was marked, so the wait before it is split from the network time
+        assert call["queue_wait_s"] > 0 and call["network_s"] >= 0.02
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tool Cache Test
+
+This test verifies that:
+1. Results are served from memory until their (per-tool) TTL expires, with LRU eviction
+2. The SQLite tier serves results to a new cache instance
+3. Concurrent identical calls run the tool once, through the shared single-flight coalescer
+4. cached_run keys on validated arguments and the tool's cache_version
+
+Usage:
+    python -m pytest tests/test_tool_cache.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from crewai.tools import BaseTool
+from typing import Any, Type
+from pydantic import BaseModel, Field
+
+from hello_crewai.tools.tool_cache import ToolCache, cached_run
+
+class Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+    
+    def __call__(self, value="result"):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return value
+
+class EchoInput(BaseModel):
+    text: str = Field(...)
+    times: int = Field(default=1)
+
+class EchoTool(BaseTool):
+    name: str = "Echo"
+    description: str = "Repeat text"
+    args_schema: Type[BaseModel] = EchoInput
+    cache: Any = Field(default=None, exclude=True)
+    cache_version: int = 1
+    calls: int = 0
+
+    @cached_run(ttl=60)
+    def _run(self, text: str, times: int = 1) -> str:
+        self.calls += 1
+        if text == "fail":
+            raise RuntimeError("tool failed")
+        return text * times
+
+def test_memory_ttl_and_lru():
+    cache = ToolCache(max_entries=2, ttl=0.2, ttls={"Uncached": 0})
+    tool = Counter()
+    
+    assert cache.get_or_call("Search", {"q": "a"}, tool) == "result"
+    assert cache.get_or_call("Search", {"q": "a"}, tool) == "result"
+    assert tool.calls == 1
+    
+    time.sleep(0.25)
+    cache.get_or_call("Search", {"q": "a"}, tool)
+    assert tool.calls == 2
+    
+    cache.get_or_call("Search", {"q": "b"}, tool)
+    cache.get_or_call("Search", {"q": "c"}, tool)
+    cache.get_or_call("Search", {"q": "a"}, tool)
+    assert tool.calls == 5 and cache.stats()["evictions"] == 2
+    
+    cache.get_or_call("Uncached", {}, tool)
+    cache.get_or_call("Uncached", {}, tool)
+    assert tool.calls == 7
+    
+    stats = cache.stats()
+    assert stats["tools"]["Search"]["hits"] == 1 and stats["tools"]["Search"]["misses"] == 5
+    assert stats["hit_rate"] == pytest.approx(1 / 6)
+
+def test_disk_tier(tmp_path):
+    path = str(tmp_path / "tools.sqlite")
+    tool = Counter()
+    ToolCache(path=path).get_or_call("Search", {"q": "a"}, lambda: tool({"rows": [1, 2]}))
+    
+    cache = ToolCache(path=path)
+    assert cache.get_or_call("Search", {"q": "a"}, tool) == {"rows": [1, 2]}
+    assert tool.calls == 1 and cache.stats()["disk_hits"] == 1
+    
+    expired = ToolCache(path=path, ttl=0.01)
+    expired.get_or_call("Other", {}, tool)
+    time.sleep(0.02)
+    ToolCache(path=path).get_or_call("Other", {}, tool, ttl=0.01)
+    assert tool.calls == 3
+
+def test_concurrent_calls_run_once():
+    cache = ToolCache()
+    tool = Counter(delay=0.2)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: cache.get_or_call("Slow", {"q": "x"}, tool), range(8)))
+    
+    assert results == ["result"] * 8
+    assert tool.calls == 1
+    assert cache.stats()["coalesced"] == 7
+    assert cache.single_flight.stats()["executions"] == 1 and cache.single_flight.stats()["coalesced"] == 7
+
+def test_cached_run_decorator():
+    tool = EchoTool(cache=ToolCache())
+    assert tool.run(text="ab", times=2) == "abab"
+    assert tool._run("ab", 2) == "abab"
+    assert tool.to_structured_tool().invoke({"text": "ab", "times": 2}) == "abab"
+    assert tool.calls == 1
+    
+    # The default is filled in by the args schema, so both calls share a key
+    tool._run("x")
+    tool._run(text="x", times=1)
+    assert tool.calls == 2
+    
+    tool.cache_version = 2
+    tool._run("ab", 2)
+    assert tool.calls == 3
+    
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            tool._run("fail")
+    assert tool.calls == 5
+    
+    uncached = EchoTool()
+    uncached._run("ab")
+    uncached._run("ab")
+    assert uncached.calls == 2
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Parallel Training Test
+
+This test verifies that:
+1. Concurrent iterations each record initial output, feedback and improved output per agent
+2. Feedback is merged in iteration order and saved to the output file in crewAI's format
+3. An interrupted run resumes with only the missing iterations, and refuses other inputs
+
+Usage:
+    python -m pytest tests/test_training.py
+
+No LM Studio instance is required; the crew runs against the local stub.
+"""
+import sys
+import os
+import pickle
+import threading
+
+import pytest
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+
+CONFIG = """[settings]
+default_model = "local"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[models.local]
+name = "stub-model"
+timeout = 30
+"""
+
+INPUTS = {"topic": "AI LLMs", "current_year": "2026"}
+
+class Feedback:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+    
+    def __call__(self, iteration, role, output):
+        with self.lock:
+            self.calls.append((iteration, role))
+        return f"Be more specific (iteration {iteration})"
+
+def evaluate(agent, training_data, role):
+    return {"suggestions": [data["human_feedback"] for data in training_data[role].values()], "quality": 8.0}
+
+def test_parallel_training_and_resume(tmp_path, monkeypatch):
+    from hello_crewai.crew_pool import CrewTemplate
+    from hello_crewai.training import ParallelTrainer
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(models=["stub-model"], latency=0.1, completion_tokens=10) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        template = CrewTemplate(str(config_path))
+        
+        def trainer(feedback, **kwargs):
+            return ParallelTrainer(3, "trained.pkl", INPUTS, workers=3, template=template, feedback=feedback, evaluate=evaluate, **kwargs)
+        
+        feedback = Feedback()
+        summary = trainer(feedback).run()
+        assert summary["ran"] == 3 and summary["resumed"] == 0
+        assert len(summary["agents"]) == 2
+        assert sorted({iteration for iteration, _ in feedback.calls}) == [0, 1, 2]
+        assert stub.stats["peak_active"] > 1
+        
+        with open("trained.pkl", "rb") as f:
+            trained = pickle.load(f)
+        assert sorted(trained) == summary["agents"]
+        for result in trained.values():
+            assert result["suggestions"] == [f"Be more specific (iteration {i})" for i in range(3)]
+        
+        first = (tmp_path / "trained.pkl.iterations" / "iteration-0001.json").read_text()
+        assert "improved_output" in first and "initial_output" in first
+        
+        # An interrupted run redoes only the iteration that didn't finish
+        os.remove(tmp_path / "trained.pkl.iterations" / "iteration-0001.json")
+        feedback = Feedback()
+        summary = trainer(feedback).run()
+        assert summary["ran"] == 1 and summary["resumed"] == 2
+        assert {iteration for iteration, _ in feedback.calls} == {1}
+        
+        with pytest.raises(ValueError, match="other inputs"):
+            trainer(feedback, seed=7).run()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Transport Test
+
+This test verifies that:
+1. Completions from the crew LLM reuse one keep-alive connection per endpoint
+2. Connect and read timeouts are set separately from the model timeout
+3. Building a crew no longer changes OPENAI_* environment variables
+
+Usage:
+    python -m pytest tests/test_transport.py
+
+No LM Studio instance is required; requests go to the local stub.
+"""
+import sys
+import os
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.transport import Transport, get_transport
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[http]
+pool_size = 4
+connect_timeout = 2
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+"""
+
+def test_llm_reuses_pooled_connection(tmp_path):
+    from hello_crewai.config_loader import get_model_config
+    from hello_crewai.llm import build_llm
+    
+    with StubLMStudio(latency=0, completion_tokens=5) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url))
+        
+        llm = build_llm(get_model_config(config_path=str(config_path)), str(config_path))
+        for i in range(5):
+            assert llm.call(f"Question {i}")
+        
+        assert stub.stats["completions"] == 5
+        assert stub.stats["connections"] == 1
+        assert llm.transport is get_transport({"pool_size": 4, "connect_timeout": 2})
+
+def test_timeouts_and_clients():
+    transport = Transport(connect_timeout=2, read_timeout=10)
+    
+    timeout = transport.timeout(120)
+    assert (timeout.connect, timeout.read) == (2, 120)
+    assert transport.timeout().read == 10
+    
+    assert transport.client("http://a/v1/") is transport.client("http://a/v1")
+    assert transport.client("http://a/v1") is not transport.client("http://b/v1")
+    assert transport.openai_client("http://a/v1", "key") is transport.openai_client("http://a/v1", "key")
+    transport.close()
+
+def test_crew_leaves_environment_alone(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    config_path = tmp_path / ".env.toml"
+    config_path.write_text(CONFIG.format(base_url="http://127.0.0.1:9/v1"))
+    
+    HelloCrewai(config_path=str(config_path))
+    assert "OPENAI_BASE_URL" not in os.environ
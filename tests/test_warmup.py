@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Model Warm-up Test
+
+This test verifies that:
+1. Warm-up targets every configured endpoint that serves a model
+2. A crew with warm-up enabled absorbs the model load before its first task
+3. Cold start latency is recorded separately from steady-state latency
+4. A failed warm-up leaves the model cold, so the first real call keeps the cold start treatment
+5. `switch_model.py warm` preloads the current model and reports both latencies
+
+Usage:
+    python -m pytest tests/test_warmup.py
+
+No LM Studio instance is required; the stub simulates the model load time.
+"""
+import sys
+import os
+import subprocess
+
+# Add scripts directory to path to import the stub
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from stub_lm_studio import StubLMStudio
+from hello_crewai.transport import Transport
+from hello_crewai.warmup import claim_first_call, warm_model, warmup_targets
+
+LOAD_LATENCY = 0.5
+
+CONFIG = """[settings]
+default_model = "stub"
+
+[lm_studio]
+base_url = "{base_url}"
+api_key = "stub"
+
+[warmup]
+enabled = true
+
+[model_stats]
+enabled = true
+path = "{stats_path}"
+
+[models.stub]
+name = "stub-model"
+timeout = 30
+"""
+
+def test_warmup_targets():
+    endpoints = [
+        {"base_url": "http://a/v1", "api_key": "k", "models": []},
+        {"base_url": "http://b/v1", "api_key": "k", "models": ["other"]},
+        {"base_url": "http://c/v1", "api_key": "k", "models": ["stub-model"]},
+    ]
+    targets = warmup_targets({"stub": {"name": "stub-model", "timeout": 30}}, endpoints)
+    assert [t["base_url"] for t in targets] == ["http://a/v1", "http://c/v1"]
+
+def test_crew_warmup_separates_cold_start(tmp_path, monkeypatch):
+    from hello_crewai.crew import HelloCrewai
+    
+    monkeypatch.chdir(tmp_path)
+    with StubLMStudio(latency=0, completion_tokens=10, load_latency=LOAD_LATENCY) as stub:
+        config_path = tmp_path / ".env.toml"
+        config_path.write_text(CONFIG.format(base_url=stub.base_url, stats_path=tmp_path / "stats.json"))
+        
+        crew_base = HelloCrewai(config_path=str(config_path))
+        crew = crew_base.crew()
+        crew.kickoff(inputs={"topic": "AI LLMs", "current_year": "2026"})
+    
+    [result] = crew_base.warmup.results
+    assert result["ok"] and result["cold"]
+    assert result["latency_s"] >= LOAD_LATENCY
+    
+    # The model load landed in warm-up, not in the first task
+    assert all(task.execution_duration < LOAD_LATENCY for task in crew.tasks)
+    
+    summary = crew_base.router.stats.summary("stub")
+    assert summary["cold_samples"] == 1 and summary["cold_start_p50"] >= LOAD_LATENCY
+    assert summary["samples"] == 2 and summary["p95"] < LOAD_LATENCY
+
+def test_failed_warmup_stays_cold():
+    with StubLMStudio(models=["other-model"]) as stub:
+        result = warm_model("missing-model", stub.base_url, "stub", Transport())
+    
+    assert not result["ok"] and result["cold"]
+    assert claim_first_call(stub.base_url, "missing-model")
+
+def test_switch_model_warm_command(tmp_path):
+    script = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'switch_model.py')
+    with StubLMStudio(latency=0, load_latency=LOAD_LATENCY) as stub:
+        # switch_model reads .env.toml from the working directory first
+        (tmp_path / ".env.toml").write_text(CONFIG.format(base_url=stub.base_url, stats_path=tmp_path / "stats.json"))
+        output = subprocess.run(
+            [sys.executable, script, "warm"], cwd=tmp_path, capture_output=True, text=True, timeout=60
+        ).stdout
+    
+    assert "Cold start" in output and "Steady state" in output
+    cold = float(output.split("Cold start: ")[1].split("s")[0])
+    steady = float(output.split("Steady state: ")[1].split("s")[0])
+    assert cold >= LOAD_LATENCY > steady
+    assert stub.stats["completions"] == 4